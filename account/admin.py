@@ -1,6 +1,7 @@
 from django.contrib import admin
 from .models import *
 from account.models import *
+from shop.utils.ledger import rebuild_ledger
 
 # Register your models here.
 @admin.register(Account)
@@ -37,6 +38,19 @@ class AccountAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "user__email", "name", "phone", "account_number")
     ordering = ("-created_at",)
 
+    # 계좌를 지우면 거래내역/월별 집계가 CASCADE로 지워지므로 해당 사용자 누적 집계를 재계산
+    # (마이페이지 AccountDeleteView와 같은 처리)
+    def delete_model(self, request, obj):
+        user = obj.user
+        super().delete_model(request, obj)
+        rebuild_ledger(user)
+
+    def delete_queryset(self, request, queryset):
+        users = {acc.user for acc in queryset.select_related("user")}
+        super().delete_queryset(request, queryset)
+        for user in users:
+            rebuild_ledger(user)
+
     @admin.display(description="계좌번호(마스킹)")
     def masked_account_number_admin(self, obj: Account):
         return obj.masked_account_number()
@@ -57,3 +71,12 @@ class AddressAdmin(admin.ModelAdmin):
     list_display_links = ("alias", "user", "address")
     list_filter = ("is_default", "user")
     search_fields = ("user__username", "address", "detail_address", "alias")
+
+
+@admin.register(ReceiptJob)
+class ReceiptJobAdmin(admin.ModelAdmin):
+    list_display = ("transaction", "status", "attempts", "created_at", "updated_at")
+    list_filter = ("status",)
+    search_fields = ("transaction__id", "transaction__user__username")
+    readonly_fields = ("fingerprint", "attempts", "error", "locked_at", "created_at", "updated_at")
+    ordering = ("-created_at",)
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AccountConfig(AppConfig):
     name = "account"
+
+    def ready(self):
+        # gunicorn --preload 등으로 마스터에서 미리 올려 두고 싶을 때만 (기본은 첫 영수증 요청 때 한 번 등록)
+        if getattr(settings, "RECEIPT_WARM_FONTS", False):
+            from account.utils.receipt import get_receipt_fonts
+
+            get_receipt_fonts()
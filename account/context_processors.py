@@ -1,8 +1,13 @@
 # “로그인한 사용자의 공통 데이터(예: 잔고)를
 # 모든 템플릿에서 자동으로 쓸 수 있게 해주는 역할”
-from account.utils.setdefault import get_default_account
+from account.utils.setdefault import get_cached_default_account
+from shop.utils.idempotency import new_idempotency_key
 
 def inject_account(request):
     if request.user.is_authenticated:
-        return {"account": get_default_account(request.user)}
+        return {
+            "account": get_cached_default_account(request.user),
+            # base.html 충전 모달의 중복 제출 방지 키
+            "charge_idempotency_key": new_idempotency_key(),
+        }
     return {"account": None}
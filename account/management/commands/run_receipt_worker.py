@@ -0,0 +1,59 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from account.models import ReceiptJob
+from account.utils.receipt_jobs import claim_jobs, render_job, worker_init
+
+
+class Command(BaseCommand):
+    help = (
+        "결제 후 쌓인 영수증 생성 작업(ReceiptJob)을 로컬 프로세스 풀에서 처리합니다. "
+        "웹(gunicorn) 워커와 별도 프로세스로 띄우세요. (settings.RECEIPT_BACKGROUND_RENDER = True)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=2, help="렌더링 프로세스 수 (0이면 풀 없이 현재 프로세스에서 처리)"
+        )
+        parser.add_argument("--batch", type=int, default=20, help="한 번에 가져올 작업 수")
+        parser.add_argument("--poll", type=float, default=1.0, help="작업이 없을 때 대기(초)")
+        parser.add_argument("--once", action="store_true", help="대기열을 한 번 비우고 종료")
+
+    def handle(self, *args, **options):
+        if options["processes"] > 0:
+            # 자식은 spawn으로 새로 띄워서 부모의 DB 연결을 물려받지 않게 한다
+            pool = ProcessPoolExecutor(
+                max_workers=options["processes"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=worker_init,
+            )
+            run = pool.map
+        else:
+            pool = None
+            run = map
+
+        done = failed = 0
+        try:
+            while True:
+                job_ids = claim_jobs(options["batch"])
+                if not job_ids:
+                    if options["once"]:
+                        break
+                    connections.close_all()
+                    time.sleep(options["poll"])
+                    continue
+
+                for status in run(render_job, job_ids):
+                    if status == ReceiptJob.DONE:
+                        done += 1
+                    else:
+                        failed += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f"영수증 {done}건 생성, {failed}건 실패/재시도 대기"))
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_address_receiver_name'),
+        ('shop', '0007_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceiptJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', '대기'), ('running', '생성 중'), ('done', '완료'), ('failed', '실패')], default='queued', max_length=10)),
+                ('fingerprint', models.CharField(blank=True, max_length=64)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='receipt_job', to='shop.transaction')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='receiptjob_status_created_idx')],
+            },
+        ),
+    ]
@@ -88,4 +88,36 @@ class Address(models.Model):
     receiver_name = models.CharField(max_length=20, blank=True, null=True, verbose_name="수령인")    
 
     def __str__(self):
-        return f"[{self.zip_code}] {self.address}"
\ No newline at end of file
+        return f"[{self.zip_code}] {self.address}"
+
+class ReceiptJob(models.Model):
+    """
+    영수증 PDF 사전 생성 작업 큐 (DB 기반, 외부 브로커 없음).
+    - 결제 커밋 직후(transaction.on_commit) 거래별로 QUEUED 행을 만들고
+    - run_receipt_worker 커맨드의 프로세스 풀이 가져가서 렌더링 -> 영수증 캐시에 저장
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "대기"), (RUNNING, "생성 중"), (DONE, "완료"), (FAILED, "실패")]
+
+    transaction = models.OneToOneField(
+        "shop.Transaction", on_delete=models.CASCADE, related_name="receipt_job"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # 생성에 사용한 영수증 내용 해시 (receipt_cache의 파일 이름)
+    fingerprint = models.CharField(max_length=64, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)  # RUNNING으로 가져간 시각 (죽은 작업 회수용)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="receiptjob_status_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"receipt #{self.transaction_id} ({self.status})"
@@ -1,16 +1,37 @@
 from __future__ import annotations
 
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from datetime import timedelta
 from decimal import Decimal
+from unittest import mock
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
-from django.test import TestCase
+from django.db import IntegrityError, connection
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
-from account.models import Account, Address, Bank
-from account.utils.setdefault import get_default_account, set_default_account
+from account.models import Account, Address, Bank, ReceiptJob
+from account.utils import receipt as receipt_utils
+from account.utils.receipt import render_receipt_pdf
+from account.utils.receipt_cache import receipt_path
+from account.utils.receipt_jobs import claim_jobs, enqueue_receipts, enqueue_receipts_on_commit, render_job
+from account.utils.setdefault import (
+    get_cached_default_account,
+    get_default_account,
+    set_default_account,
+)
 from shop.models import Transaction
 
 
@@ -208,3 +229,312 @@ class TransactionValidationTests(TestCase):
         )
         with self.assertRaises(ValidationError):
             tx.full_clean()
+
+
+class DefaultAccountRequestCacheTests(TestCase):
+    """기본 계좌 조회가 요청당 한 번만 일어나는지(context processor + 뷰) 확인"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="u1", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="a1",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="1111",
+            balance=Decimal("1000"),
+            is_default=True,
+        )
+        self.client.login(username="u1", password="pass12345")
+
+    def _account_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return [q["sql"] for q in ctx.captured_queries if 'FROM "account_account"' in q["sql"]]
+
+    def test_product_list_hits_account_table_once(self):
+        self.assertEqual(len(self._account_queries(reverse("product_list"))), 1)
+
+    def test_mypage_resolves_default_account_once(self):
+        queries = self._account_queries(reverse("mypage"))
+        default_lookups = [sql for sql in queries if '"account_account"."is_default" AND' in sql]
+        self.assertEqual(len(default_lookups), 1)
+
+    def test_set_default_account_invalidates_cache(self):
+        other = Account.objects.create(
+            user=self.user,
+            name="a2",
+            phone="01012345679",
+            bank=self.bank,
+            account_number="2222",
+        )
+        self.assertEqual(get_cached_default_account(self.user).id, self.account.id)
+        set_default_account(self.user, other.id)
+        self.assertEqual(get_cached_default_account(self.user).id, other.id)
+
+
+class ReceiptPDFCacheTests(TestCase):
+    """영수증 PDF: 한 번 렌더링 후 파일 재사용, ETag 304, 내용이 바뀌면 새로 생성"""
+
+    def setUp(self):
+        # 테스트마다 빈 캐시 디렉터리 (거래 id가 테스트 간에 재사용될 수 있으므로)
+        cache_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_root, ignore_errors=True)
+        self.enterContext(override_settings(RECEIPT_CACHE_ROOT=cache_root))
+
+        self.user = User.objects.create_user(username="u1", password="pass12345")
+        bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="a1",
+            phone="01012345678",
+            bank=bank,
+            account_number="12345678",
+            is_default=True,
+        )
+        self.tx = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type=Transaction.OUT,
+            amount=Decimal("11000"),
+            occurred_at=timezone.now(),
+            product_name="사과",
+            shipping_address="서울시",
+        )
+        self.url = reverse("receipt_pdf", args=[self.tx.id])
+        self.client.login(username="u1", password="pass12345")
+
+    def _get(self, **headers):
+        resp = self.client.get(self.url, **headers)
+        if resp.status_code == 200:
+            resp.content_bytes = b"".join(resp.streaming_content)
+        return resp
+
+    def test_second_download_reuses_rendered_file(self):
+        with mock.patch(
+            "account.utils.receipt_cache.render_receipt_pdf", wraps=render_receipt_pdf
+        ) as render:
+            first = self._get()
+            second = self._get()
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.content_bytes.startswith(b"%PDF"))
+        self.assertEqual(first.content_bytes, second.content_bytes)
+        self.assertEqual(first["ETag"], second["ETag"])
+        self.assertIn("private", first["Cache-Control"])
+
+    def test_if_none_match_returns_304(self):
+        etag = self._get()["ETag"]
+        resp = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], etag)
+
+    def test_changed_transaction_gets_new_etag_and_old_file_is_removed(self):
+        old_etag = self._get()["ETag"]
+        old_file = os.path.join(settings.RECEIPT_CACHE_ROOT, receipt_path(self.tx.id, old_etag.strip('"')))
+        self.assertTrue(os.path.exists(old_file))
+
+        Transaction.objects.filter(pk=self.tx.pk).update(memo="메모 수정")
+        resp = self._get(HTTP_IF_NONE_MATCH=old_etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], old_etag)
+        self.assertFalse(os.path.exists(old_file))
+
+    def test_hidden_receipt_purges_cached_file(self):
+        self._get()
+        tx_dir = os.path.join(settings.RECEIPT_CACHE_ROOT, "receipts", str(self.tx.id))
+        self.assertTrue(os.listdir(tx_dir))
+        self.client.post(reverse("receipt_hide", args=[self.tx.id]))
+        self.assertEqual(os.listdir(tx_dir), [])
+        self.assertEqual(self._get().status_code, 404)
+
+    def test_fonts_are_parsed_once_per_process(self):
+        from reportlab.pdfbase import ttfonts
+
+        with mock.patch.object(receipt_utils, "_fonts", None), mock.patch.object(
+            ttfonts, "TTFont", wraps=ttfonts.TTFont
+        ) as ttfont:
+            fonts = receipt_utils.get_receipt_fonts()
+            for _ in range(3):
+                self.assertEqual(receipt_utils.register_korean_font(), fonts["regular"])
+                render_receipt_pdf(receipt_utils.receipt_fields(self.tx))
+
+        self.assertEqual(ttfont.call_count, 3)  # Regular / Bold / ExtraBold 한 번씩
+        self.assertEqual(fonts["bold"], "NanumGothic-Bold")
+        self.assertEqual(fonts["extrabold"], "NanumGothic-ExtraBold")
+
+
+@override_settings(RECEIPT_BACKGROUND_RENDER=True)
+class ReceiptBackgroundRenderTests(TestCase):
+    """결제 커밋 후 영수증 작업 등록 -> 워커가 미리 렌더링, 다운로드는 캐시 파일만 읽음"""
+
+    def setUp(self):
+        cache_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_root, ignore_errors=True)
+        self.enterContext(override_settings(RECEIPT_CACHE_ROOT=cache_root))
+
+        self.user = User.objects.create_user(username="u1", password="pass12345")
+        bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        account = Account.objects.create(
+            user=self.user, name="a1", phone="01012345678", bank=bank, account_number="12345678", is_default=True
+        )
+        self.tx = Transaction.objects.create(
+            user=self.user,
+            account=account,
+            tx_type=Transaction.OUT,
+            amount=Decimal("11000"),
+            occurred_at=timezone.now(),
+            product_name="사과",
+            shipping_address="서울시",
+        )
+        self.url = reverse("receipt_pdf", args=[self.tx.id])
+        self.client.login(username="u1", password="pass12345")
+
+    def _run_worker(self):
+        call_command("run_receipt_worker", "--processes", "0", "--once", stdout=io.StringIO())
+
+    def test_enqueue_waits_for_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            enqueue_receipts_on_commit([self.tx.id])
+        self.assertFalse(ReceiptJob.objects.exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(ReceiptJob.objects.get().status, ReceiptJob.QUEUED)
+
+        with override_settings(RECEIPT_BACKGROUND_RENDER=False), self.captureOnCommitCallbacks() as callbacks:
+            enqueue_receipts_on_commit([self.tx.id])
+        self.assertEqual(callbacks, [])
+
+    def test_download_is_pending_until_worker_renders(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp["Retry-After"], "2")
+        self.assertEqual(ReceiptJob.objects.get(transaction=self.tx).status, ReceiptJob.QUEUED)
+
+        self._run_worker()
+        job = ReceiptJob.objects.get(transaction=self.tx)
+        self.assertEqual(job.status, ReceiptJob.DONE)
+        self.assertEqual(job.attempts, 1)
+
+        with mock.patch("account.utils.receipt_cache.render_receipt_pdf") as render:
+            resp = self.client.get(self.url)
+            body = b"".join(resp.streaming_content)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["ETag"], f'"{job.fingerprint}"')
+        self.assertTrue(body.startswith(b"%PDF"))
+        render.assert_not_called()
+
+    def test_failed_job_is_retried_then_rendered_inline(self):
+        enqueue_receipts([self.tx.id])
+        with mock.patch("account.utils.receipt_cache.render_receipt_pdf", side_effect=RuntimeError("boom")):
+            self._run_worker()
+
+        job = ReceiptJob.objects.get(transaction=self.tx)
+        self.assertEqual(job.status, ReceiptJob.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIn("boom", job.error)
+
+        # 워커가 포기한 건은 다운로드 요청에서 직접 렌더링
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_claim_skips_running_jobs_until_stale(self):
+        enqueue_receipts([self.tx.id])
+        self.assertEqual(claim_jobs(10), [ReceiptJob.objects.get().id])
+        self.assertEqual(claim_jobs(10), [])
+        self.assertEqual(len(claim_jobs(10, stale_after=timedelta(0))), 1)
+        self.assertEqual(render_job(ReceiptJob.objects.get().id), ReceiptJob.DONE)
+
+
+class ReceiptLazyImportTests(TestCase):
+    def test_url_loading_does_not_import_reportlab_or_receipt_views(self):
+        # 새 프로세스에서 URLconf 전체를 불러온 뒤 무거운 모듈이 올라왔는지 확인 (콜드 스타트 회귀 방지)
+        code = (
+            "import sys, django; django.setup();"
+            "from django.urls import get_resolver; get_resolver().url_patterns;"
+            "print(sorted(m for m in ('reportlab', 'account.views.receipt') if m in sys.modules))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "accountbook.settings"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(out.stdout.strip(), "[]")
+
+    def test_lazy_receipt_view_resolves_on_first_request(self):
+        user = User.objects.create_user(username="u1", password="pass12345")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse("receipt_pdf", args=[999])).status_code, 404)
+
+
+class ReceiptExportTests(TestCase):
+    """영수증 탭 필터 그대로 여러 건을 PDF 1개 / ZIP으로 스트리밍"""
+
+    def setUp(self):
+        cache_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_root, ignore_errors=True)
+        self.enterContext(override_settings(RECEIPT_CACHE_ROOT=cache_root))
+
+        self.user = User.objects.create_user(username="u1", password="pass12345")
+        bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        account = Account.objects.create(
+            user=self.user, name="a1", phone="01012345678", bank=bank, account_number="12345678", is_default=True
+        )
+        now = timezone.now()
+        self.txs = [
+            Transaction.objects.create(
+                user=self.user,
+                account=account,
+                tx_type=Transaction.OUT,
+                amount=Decimal(1000 * (i + 1)),
+                occurred_at=now - timedelta(days=i * 40),
+                product_name=f"상품{i}",
+            )
+            for i in range(3)
+        ]
+        Transaction.objects.filter(pk=self.txs[2].pk).update(receipt_hidden=True)
+        self.client.login(username="u1", password="pass12345")
+
+    def _export(self, **params):
+        resp = self.client.get(reverse("receipt_export"), params)
+        self.assertTrue(resp.streaming)
+        return resp, b"".join(resp.streaming_content)
+
+    def test_zip_contains_one_pdf_per_visible_receipt(self):
+        resp, body = self._export(format="zip", rc_sort="price_low")
+        self.assertEqual(resp["Content-Type"], "application/zip")
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            names = zf.namelist()
+            self.assertEqual(names, [f"receipt_{self.txs[0].id}.pdf", f"receipt_{self.txs[1].id}.pdf"])
+            self.assertTrue(zf.read(names[0]).startswith(b"%PDF"))
+
+    def test_pdf_has_one_page_per_receipt_and_honours_date_filter(self):
+        start = timezone.localtime(self.txs[0].occurred_at).date().isoformat()
+        resp, body = self._export(format="pdf", rc_start=start)
+        self.assertEqual(resp["Content-Type"], "application/pdf")
+        self.assertTrue(body.startswith(b"%PDF"))
+        self.assertEqual(len(re.findall(rb"/Type /Page\b", body)), 1)
+
+        _, body = self._export(format="pdf")
+        self.assertEqual(len(re.findall(rb"/Type /Page\b", body)), 2)
+
+    def test_empty_or_oversized_export_redirects(self):
+        resp = self.client.get(reverse("receipt_export"), {"rc_start": "2000-01-01", "rc_end": "2000-01-02"})
+        self.assertEqual(resp.status_code, 302)
+        with override_settings(RECEIPT_EXPORT_MAX=1):
+            resp = self.client.get(reverse("receipt_export"), {"format": "pdf"}, follow=True)
+        self.assertRedirects(resp, f"{reverse('mypage')}?tab=receipt")
+        self.assertIn("ZIP으로 받거나", str(list(resp.context["messages"])[-1]))
+
+    def test_zip_export_is_not_capped(self):
+        with override_settings(RECEIPT_EXPORT_MAX=1):
+            _, body = self._export(format="zip")
+        with zipfile.ZipFile(io.BytesIO(body)) as zf:
+            self.assertEqual(len(zf.namelist()), 2)
@@ -1,6 +1,7 @@
 from django.contrib.auth.views import LoginView, LogoutView
 from django.urls import path
 
+from accountbook.lazy_views import lazy_view
 from account.views import *
 
 urlpatterns = [
@@ -45,10 +46,13 @@ urlpatterns = [
     path("address/delete/<int:address_id>/", AddressDeleteView.as_view(), name="address_delete"),
 
     # 거래 내역 영수증 PDF 보기/다운로드
-    path("receipts/<int:tx_id>.pdf", ReceiptPDFView.as_view(), name="receipt_pdf"),
+    path("receipts/<int:tx_id>.pdf", lazy_view("account.views.receipt.ReceiptPDFView"), name="receipt_pdf"),
+
+    # 영수증 일괄 내보내기 (영수증 탭 필터 그대로, PDF 1개 또는 ZIP)
+    path("receipts/export/", lazy_view("account.views.receipt.ReceiptExportView"), name="receipt_export"),
 
     # 영수증 "삭제"(숨김) - Transaction은 유지
-    path("receipts/<int:tx_id>/hide/", ReceiptHideView.as_view(), name="receipt_hide"),
+    path("receipts/<int:tx_id>/hide/", lazy_view("account.views.receipt.ReceiptHideView"), name="receipt_hide"),
 
     # 계좌 추가 (다계좌 구조)
     path("accounts/add/", AccountAddView.as_view(), name="account_add"),
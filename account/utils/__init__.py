@@ -1,9 +1,15 @@
 # account/utils/__init__.py
-from .setdefault import get_default_account, set_default_account
-from .receipt import calc_vat, money_int, register_korean_font
+from .setdefault import (
+    get_cached_default_account,
+    get_default_account,
+    invalidate_default_account,
+    set_default_account,
+)
+from .receipt import calc_vat, get_receipt_fonts, money_int, register_korean_font
 from .forms import SignUpForm, SetPasswordForm, AccountAddForm, FindIDForm, MypageUpdateForm, PasswordResetVerifyForm, PasswordVerifyForm
 
 __all__ = [
     "get_default_account", "set_default_account",
-    "register_korean_font", "money_int", "calc_vat",
+    "get_cached_default_account", "invalidate_default_account",
+    "register_korean_font", "get_receipt_fonts", "money_int", "calc_vat",
 ]
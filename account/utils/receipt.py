@@ -1,23 +1,85 @@
+import io
 import os
+import threading
 
 from django.conf import settings
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+
+# ReportLab은 무거워서(import만 수십 ms) 실제로 PDF를 그리는 함수 안에서만 import 한다.
+# -> 영수증을 만들지 않는 웹 워커/관리 명령은 ReportLab을 아예 올리지 않음
+
+# 영수증 용지 크기 (80mm 감열지, 단위: pt = reportlab.lib.units.mm 와 같은 값)
+mm = 72 / 25.4
+RECEIPT_PAGE_W = 80 * mm
+RECEIPT_PAGE_H = 110 * mm
+RECEIPT_PAGESIZE = (RECEIPT_PAGE_W, RECEIPT_PAGE_H)
+
+
+# 한글 폰트 패밀리 (static/fonts/NanumGothic-*.ttf)
+KOREAN_FONT_FAMILY = "NanumGothic"
+_FONT_FILES = {
+    "regular": "NanumGothic-Regular",
+    "bold": "NanumGothic-Bold",
+    "extrabold": "NanumGothic-ExtraBold",
+}
+_FALLBACK_FONTS = {"regular": "Helvetica", "bold": "Helvetica-Bold", "extrabold": "Helvetica-Bold"}
+
+# 프로세스당 한 번만 등록 (TTF 파싱 비용이 커서 요청마다 하면 안 됨)
+_fonts = None
+_fonts_lock = threading.Lock()
+
+
+def _register_fonts() -> dict:
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    font_dir = os.path.join(settings.BASE_DIR, "static", "fonts")
+    regular_path = os.path.join(font_dir, f"{_FONT_FILES['regular']}.ttf")
+    if not os.path.exists(regular_path):
+        return dict(_FALLBACK_FONTS)
+
+    fonts = {}
+    try:
+        for weight, name in _FONT_FILES.items():
+            path = os.path.join(font_dir, f"{name}.ttf")
+            if os.path.exists(path):
+                pdfmetrics.registerFont(TTFont(name, path))
+                fonts[weight] = name
+            else:
+                fonts[weight] = fonts.get("bold", _FONT_FILES["regular"])
+    except Exception:
+        return dict(_FALLBACK_FONTS)
+
+    # <b> 태그 / Paragraph에서 굵게 쓸 수 있도록 패밀리로 묶음 (ExtraBold는 이름으로 직접 사용)
+    pdfmetrics.registerFontFamily(
+        KOREAN_FONT_FAMILY,
+        normal=fonts["regular"],
+        bold=fonts["bold"],
+        italic=fonts["regular"],
+        boldItalic=fonts["bold"],
+    )
+    return fonts
+
+
+def get_receipt_fonts() -> dict:
+    """
+    {"regular": ..., "bold": ..., "extrabold": ...} 폰트 이름.
+    처음 부를 때 한 번만 TTF를 파싱/등록하고 이후에는 등록된 이름만 돌려준다(스레드 안전).
+    """
+    global _fonts
+    if _fonts is None:
+        with _fonts_lock:
+            if _fonts is None:
+                _fonts = _register_fonts()
+    return _fonts
 
 
 def register_korean_font() -> str:
     """
     static/fonts/NanumGothic-Regular.ttf 가 있으면 등록 -> 한글 PDF 가능
     없으면 Helvetica로 fallback
+    (등록은 프로세스당 한 번, 이후 호출은 이름만 반환)
     """
-    font_path = os.path.join(settings.BASE_DIR, "static", "fonts", "NanumGothic-Regular.ttf")
-    if os.path.exists(font_path):
-        try:
-            pdfmetrics.registerFont(TTFont("NanumGothic-Regular", font_path))
-            return "NanumGothic-Regular"
-        except Exception:
-            return "Helvetica"
-    return "Helvetica"
+    return get_receipt_fonts()["regular"]
 
 
 def money_int(v) -> int:
@@ -41,3 +103,160 @@ def calc_vat(amount_won: int) -> tuple[int, int, int]:
     vat = amount_won - supply
     fee = 0
     return supply, vat, fee
+
+
+def receipt_address_text(tx, default_addr=None) -> str:
+    """배송지: 결제 시 Transaction에 저장된 값이 있으면 그걸 우선, 없으면 기본 배송지"""
+    if tx.shipping_address:
+        zip_code = tx.shipping_zip_code or ""
+        detail = tx.shipping_detail_address or ""
+        return f"({zip_code}) {tx.shipping_address} {detail}".strip()
+    if default_addr:
+        return f"({default_addr.zip_code}) {default_addr.address} {default_addr.detail_address}"
+    return "-"
+
+
+def receipt_fields(tx, default_addr=None) -> dict:
+    """
+    영수증에 찍히는 값만 모은 dict.
+    - draw_receipt는 이 값만 사용하므로, 캐시 키(해시)도 이 dict로 만든다.
+    - tx는 account__bank, used_coupon__coupon 을 select_related 해서 넘기면 추가 쿼리가 없다.
+    """
+    account = tx.account
+    amount = money_int(tx.amount)
+    discount = money_int(tx.discount_amount)
+
+    coupon_name = "-"
+    if tx.used_coupon and getattr(tx.used_coupon, "coupon", None):
+        coupon_name = tx.used_coupon.coupon.name or "-"
+
+    original_total = money_int(tx.total_price_at_pay)
+    if original_total <= 0:
+        # 할인 전 금액이 저장되지 않았다면 최종 + 할인으로 역산
+        original_total = amount + discount
+
+    # 계좌 출력 (마스킹)
+    last4 = str(account.account_number)[-4:] if account.account_number else "----"
+    masked = f"****{last4}" if last4 != "----" else "----"
+
+    return {
+        "tx_id": tx.id,
+        "merchant": tx.merchant or "ACCOUNT BOOK",
+        "amount": amount,
+        "occurred": tx.occurred_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "account": f"{account.bank} ({masked})",
+        "tx_type": "출금" if tx.tx_type == "OUT" else "입금",
+        "has_coupon": bool(tx.used_coupon_id) or discount > 0,
+        "coupon_name": coupon_name,
+        "discount": discount,
+        "discounted_total": max(original_total - discount, 0),
+        "product_name": tx.product_name or (tx.product.name if tx.product else "상품"),
+        "quantity": tx.quantity or 1,
+        "memo": tx.memo or "-",
+        "address": receipt_address_text(tx, default_addr),
+    }
+
+
+def draw_receipt(canv, fields: dict, font_name: str) -> None:
+    """receipt_fields() 값을 canvas에 영수증 한 장(page)으로 그린다."""
+    page_w = RECEIPT_PAGE_W
+    x = 6 * mm
+    y = RECEIPT_PAGE_H - 10 * mm
+
+    def line():
+        nonlocal y
+        canv.line(x, y, page_w - x, y)
+        y -= 8
+
+    def kv(label, value, size=8):
+        nonlocal y
+        canv.setFont(font_name, size)
+        canv.drawString(x, y, str(label))
+        canv.drawRightString(page_w - x, y, str(value))
+        y -= size + 5
+
+    def kv_multiline(label, value, size=7, max_chars=24):
+        """
+        주소처럼 긴 텍스트를 여러 줄로 출력 (오른쪽 정렬 유지)
+        """
+        nonlocal y
+        canv.setFont(font_name, size)
+        canv.drawString(x, y, str(label))
+
+        text = str(value) if value is not None else "-"
+        if not text:
+            text = "-"
+
+        lines = [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+        canv.drawRightString(page_w - x, y, lines[0])
+        y -= size + 4
+
+        for t in lines[1:]:
+            canv.drawRightString(page_w - x, y, t)
+            y -= size + 4
+
+    amount = fields["amount"]
+
+    canv.setFont(font_name, 12)
+    canv.drawString(x, y, fields["merchant"])
+    y -= 18
+
+    canv.setFont(font_name, 24)
+    canv.drawString(x, y, f"{amount:,}원")
+    y -= 20
+
+    canv.setFont(font_name, 10)
+    canv.drawString(x, y, fields["account"])
+    y -= 12
+
+    line()
+
+    kv("승인일시", fields["occurred"])
+    kv("거래구분", fields["tx_type"])
+
+    # =========================
+    # 쿠폰/할인 내역을 PDF에 출력 (요구사항 포맷)
+    # =========================
+    if fields["has_coupon"]:
+        kv("쿠폰 이름", fields["coupon_name"])
+        kv("할인 가격", f"{fields['discount']:,}원")
+        kv("할인 된 가격", f"{fields['discounted_total']:,}원")
+        line()
+        kv("최종 가격", f"{amount:,}원")
+    else:
+        kv("최종 가격", f"{amount:,}원")
+
+    line()
+
+    supply, vat, fee = calc_vat(amount)
+    kv("공급가액", f"{supply:,}원")
+    kv("부가세", f"{vat:,}원")
+    kv("봉사료", f"{fee:,}원")
+
+    line()
+
+    kv("상품명", f"{fields['product_name']} ({fields['quantity']}개)")
+    kv("메모", fields["memo"])
+
+    line()
+
+    kv_multiline("배송지", fields["address"], size=7, max_chars=24)
+
+    line()
+
+    canv.setFont(font_name, 7)
+    canv.drawString(x, 12 * mm, "※ 본 영수증은 시스템에서 생성된 증빙용 문서입니다.")
+    canv.showPage()
+
+
+def render_receipt_pdf(fields: dict) -> bytes:
+    """영수증 1장짜리 PDF를 bytes로 생성"""
+    from reportlab.pdfgen import canvas
+
+    buf = io.BytesIO()
+    filename = f"receipt_{fields['tx_id']}.pdf"
+    canv = canvas.Canvas(buf, pagesize=RECEIPT_PAGESIZE)
+    canv.setTitle(filename)
+    draw_receipt(canv, fields, register_korean_font())
+    canv.save()
+    return buf.getvalue()
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from account.utils.receipt import render_receipt_pdf
+
+# 영수증 레이아웃(draw_receipt)을 바꾸면 올려서 기존 캐시 파일을 모두 무효화
+RECEIPT_LAYOUT_VERSION = 1
+
+
+def receipt_storage() -> FileSystemStorage:
+    """
+    생성된 영수증 PDF 저장소.
+    - 기본: BASE_DIR/receipt_cache (MEDIA와 분리 -> 웹에서 직접 접근 불가)
+    - settings.RECEIPT_CACHE_ROOT 로 위치 변경 가능
+    """
+    root = getattr(settings, "RECEIPT_CACHE_ROOT", os.path.join(settings.BASE_DIR, "receipt_cache"))
+    return FileSystemStorage(location=root)
+
+
+def receipt_fingerprint(fields: dict) -> str:
+    """영수증에 찍히는 값(receipt_fields) + 레이아웃 버전의 해시 = 캐시 키 겸 ETag"""
+    raw = json.dumps(
+        {"v": RECEIPT_LAYOUT_VERSION, "fields": fields},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _tx_dir(tx_id) -> str:
+    return f"receipts/{tx_id}"
+
+
+def receipt_path(tx_id, fingerprint: str) -> str:
+    """거래 id + 내용 해시로 파일 위치가 정해진다 (내용이 바뀌면 경로도 바뀜)"""
+    return f"{_tx_dir(tx_id)}/{fingerprint}.pdf"
+
+
+def is_receipt_cached(tx_id, fingerprint: str) -> bool:
+    return receipt_storage().exists(receipt_path(tx_id, fingerprint))
+
+
+def get_or_render_receipt(fields: dict, fingerprint: str = None):
+    """
+    캐시된 영수증 PDF 파일을 연 채로 반환(없으면 렌더링해서 저장 후 반환).
+    호출하는 쪽(FileResponse 등)에서 닫는다.
+    """
+    fingerprint = fingerprint or receipt_fingerprint(fields)
+    path = receipt_path(fields["tx_id"], fingerprint)
+    storage = receipt_storage()
+    if not storage.exists(path):
+        store_receipt(fields["tx_id"], fingerprint, render_receipt_pdf(fields))
+    return storage.open(path, "rb")
+
+
+def store_receipt(tx_id, fingerprint: str, pdf_bytes: bytes) -> str:
+    """
+    PDF를 content-addressed 경로에 저장하고,
+    같은 거래의 예전 버전(내용이 바뀌기 전 해시) 파일은 지운다.
+    """
+    path = receipt_path(tx_id, fingerprint)
+    storage = receipt_storage()
+    if not storage.exists(path):
+        # FileSystemStorage.save는 이미 있으면 다른 이름을 붙이므로, 동시에 만든 경우 결과 이름을 확인
+        saved = storage.save(path, ContentFile(pdf_bytes))
+        if saved != path:
+            storage.delete(saved)
+    _delete_other_versions(tx_id, keep=f"{fingerprint}.pdf")
+    return path
+
+
+def _delete_other_versions(tx_id, keep=None) -> None:
+    storage = receipt_storage()
+    directory = _tx_dir(tx_id)
+    try:
+        _, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        if name != keep:
+            storage.delete(f"{directory}/{name}")
+
+
+def purge_receipt(tx_id) -> None:
+    """거래의 캐시된 영수증 파일을 모두 삭제 (영수증 숨김/거래 수정 시)"""
+    _delete_other_versions(tx_id)
@@ -0,0 +1,67 @@
+import tempfile
+import zipfile
+
+from django.conf import settings
+
+from account.utils.receipt import RECEIPT_PAGESIZE, draw_receipt, receipt_fields, register_korean_font
+from account.utils.receipt_cache import get_or_render_receipt, receipt_fingerprint
+from accountbook.streaming import ChunkBuffer
+
+# 스트리밍 청크 크기
+CHUNK_SIZE = 64 * 1024
+
+
+def export_limit() -> int:
+    """
+    PDF 한 파일로 내보낼 수 있는 영수증 최대 건수 (settings.RECEIPT_EXPORT_MAX)
+    ZIP은 영수증마다 따로 흘려보내므로 상한이 없다.
+    """
+    return getattr(settings, "RECEIPT_EXPORT_MAX", 1000)
+
+
+def iter_receipts_zip(txs, default_addr=None):
+    """
+    거래들을 receipt_<id>.pdf 로 묶은 ZIP을 조각(bytes)으로 yield.
+    - 각 PDF는 영수증 캐시(receipt_cache)에서 가져오고 없을 때만 렌더링
+    - PDF는 이미 압축되어 있으므로 ZIP_STORED
+    """
+    buf = ChunkBuffer()
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        for tx in txs:
+            fields = receipt_fields(tx, default_addr)
+            with get_or_render_receipt(fields, receipt_fingerprint(fields)) as pdf, zf.open(
+                f"receipt_{tx.id}.pdf", mode="w", force_zip64=True
+            ) as entry:
+                for chunk in iter(lambda: pdf.read(CHUNK_SIZE), b""):
+                    entry.write(chunk)
+                    data = buf.take()
+                    if data:
+                        yield data
+            data = buf.take()
+            if data:
+                yield data
+    data = buf.take()
+    if data:
+        yield data
+
+
+def iter_receipts_pdf(txs, default_addr=None, title="receipts"):
+    """
+    거래마다 한 페이지씩 그린 PDF 한 파일을 조각(bytes)으로 yield.
+    ReportLab은 save() 시점에 파일 전체를 쓰므로 첫 바이트는 모든 페이지를 그린 뒤에 나간다.
+    (임시 파일은 일정 크기 이상이면 디스크로 넘어가지만 페이지 객체는 save() 전까지 메모리에 남으므로,
+    호출하는 쪽에서 export_limit()을 넘는 요청은 거절하고 ZIP으로 안내한다)
+    """
+    from reportlab.pdfgen import canvas
+
+    font_name = register_korean_font()
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as out:
+        canv = canvas.Canvas(out, pagesize=RECEIPT_PAGESIZE)
+        canv.setTitle(title)
+        for tx in txs:
+            draw_receipt(canv, receipt_fields(tx, default_addr), font_name)
+        canv.save()
+
+        out.seek(0)
+        for chunk in iter(lambda: out.read(CHUNK_SIZE), b""):
+            yield chunk
@@ -0,0 +1,124 @@
+import os
+from datetime import timedelta
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from account.models import Address, ReceiptJob
+
+# 실패한 작업 최대 재시도 횟수
+MAX_ATTEMPTS = 3
+
+
+def background_enabled() -> bool:
+    """
+    settings.RECEIPT_BACKGROUND_RENDER = True 일 때만 결제 후 사전 생성 + 다운로드 202 응답.
+    (run_receipt_worker를 띄우지 않는 로컬/테스트 환경에서는 기존처럼 요청 안에서 렌더링)
+    """
+    return getattr(settings, "RECEIPT_BACKGROUND_RENDER", False)
+
+
+def enqueue_receipts(tx_ids: Iterable[int]) -> None:
+    """거래들의 영수증 생성 작업을 QUEUED로 넣는다 (이미 있으면 다시 대기열로)"""
+    tx_ids = list(tx_ids)
+    if not tx_ids:
+        return
+    ReceiptJob.objects.bulk_create(
+        [ReceiptJob(transaction_id=tx_id) for tx_id in tx_ids],
+        update_conflicts=True,
+        unique_fields=["transaction"],
+        update_fields=["status", "attempts", "error", "locked_at"],
+    )
+
+
+def enqueue_receipts_on_commit(tx_ids: Iterable[int]) -> None:
+    """
+    결제 뷰의 transaction.atomic() 안에서 호출 -> 커밋이 끝난 뒤에만 작업을 넣는다.
+    (롤백된 결제의 영수증은 만들지 않고, 워커가 아직 커밋 안 된 거래를 읽는 일도 없음)
+    """
+    if not background_enabled():
+        return
+    tx_ids = list(tx_ids)
+    transaction.on_commit(lambda: enqueue_receipts(tx_ids))
+
+
+def claim_jobs(limit: int, stale_after: timedelta = timedelta(minutes=5)) -> List[int]:
+    """
+    대기 중인 작업을 최대 limit개 RUNNING으로 가져온다.
+    - 워커 여러 개가 동시에 돌아도 SKIP LOCKED로 같은 작업을 중복으로 가져가지 않음 (PostgreSQL)
+    - RUNNING인 채로 stale_after 이상 지난 작업(워커가 죽은 경우)은 다시 가져간다
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        qs = (
+            ReceiptJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ReceiptJob.QUEUED)
+            .order_by("created_at", "id")
+        )
+        ids = list(qs.values_list("id", flat=True)[:limit])
+        if len(ids) < limit:
+            stale = (
+                ReceiptJob.objects.select_for_update(skip_locked=True)
+                .filter(status=ReceiptJob.RUNNING, locked_at__lt=now - stale_after)
+                .order_by("locked_at", "id")
+            )
+            ids += list(stale.values_list("id", flat=True)[: limit - len(ids)])
+        if ids:
+            ReceiptJob.objects.filter(id__in=ids).update(
+                status=ReceiptJob.RUNNING, locked_at=now, attempts=F("attempts") + 1
+            )
+    return ids
+
+
+def render_job(job_id: int) -> str:
+    """
+    작업 1건 실행: 거래 -> 영수증 필드 -> 캐시에 PDF 저장. 워커 프로세스 안에서 호출된다.
+    성공하면 DONE + fingerprint, 실패하면 재시도 횟수에 따라 QUEUED/FAILED.
+    """
+    # 무거운 ReportLab import는 워커 프로세스에서만
+    from account.utils.receipt import receipt_fields
+    from account.utils.receipt_cache import get_or_render_receipt, receipt_fingerprint
+
+    job = (
+        ReceiptJob.objects.select_related(
+            "transaction",
+            "transaction__account",
+            "transaction__account__bank",
+            "transaction__product",
+            "transaction__used_coupon",
+            "transaction__used_coupon__coupon",
+        )
+        .filter(pk=job_id)
+        .first()
+    )
+    if job is None:  # 그 사이 거래가 삭제됨
+        return ReceiptJob.FAILED
+    tx = job.transaction
+    try:
+        default_addr = None
+        if not tx.shipping_address:
+            default_addr = Address.objects.filter(user_id=tx.user_id).order_by("-is_default", "id").first()
+        fields = receipt_fields(tx, default_addr)
+        fingerprint = receipt_fingerprint(fields)
+        get_or_render_receipt(fields, fingerprint).close()
+    except Exception as e:
+        status = ReceiptJob.FAILED if job.attempts >= MAX_ATTEMPTS else ReceiptJob.QUEUED
+        ReceiptJob.objects.filter(pk=job.pk).update(status=status, error=repr(e)[:2000], locked_at=None)
+        return status
+
+    ReceiptJob.objects.filter(pk=job.pk).update(
+        status=ReceiptJob.DONE, fingerprint=fingerprint, error="", locked_at=None
+    )
+    return ReceiptJob.DONE
+
+
+def worker_init() -> None:
+    """ProcessPoolExecutor initializer: spawn된 자식 프로세스에서 Django 초기화"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "accountbook.settings")
+    import django
+
+    django.setup()
+
@@ -0,0 +1,44 @@
+from shop.models import Transaction
+from shop.utils.tx_summary import day_range, filter_occurred_range
+
+# 영수증 탭 정렬 옵션 -> ORDER BY (마지막 id는 커서 페이지네이션/동점 정렬용)
+RECEIPT_ORDERINGS = {
+    "newest": ["-occurred_at", "-id"],
+    "price_high": ["-amount", "-occurred_at", "-id"],
+    "price_low": ["amount", "-occurred_at", "-id"],
+}
+
+
+def receipt_filters(params) -> dict:
+    """GET 파라미터(rc_start, rc_end, rc_category, rc_sort)를 정리해서 dict로"""
+    rc_sort = (params.get("rc_sort") or "newest").strip()  # newest | price_high | price_low
+    return {
+        "rc_start": (params.get("rc_start") or "").strip(),  # YYYY-MM-DD
+        "rc_end": (params.get("rc_end") or "").strip(),  # YYYY-MM-DD
+        "rc_category": (params.get("rc_category") or "").strip(),  # category_id
+        "rc_sort": rc_sort,
+    }
+
+
+def receipt_ordering(rc_sort: str) -> list:
+    return RECEIPT_ORDERINGS.get(rc_sort, RECEIPT_ORDERINGS["newest"])
+
+
+def receipt_queryset(user, filters: dict):
+    """
+    마이페이지 영수증 탭과 영수증 일괄 내보내기가 같이 쓰는 queryset.
+    영수증 "삭제"는 Transaction을 지우지 않고 receipt_hidden=True로 숨김 처리하므로 제외.
+    """
+    qs = Transaction.objects.filter(
+        user=user,
+        tx_type=Transaction.OUT,
+        receipt_hidden=False,
+    )
+    # 날짜 필터는 [start, end) datetime 범위로 (영수증 부분 인덱스 사용)
+    qs = filter_occurred_range(qs, *day_range(filters["rc_start"], filters["rc_end"]))
+
+    # 카테고리 필터
+    if filters["rc_category"].isdigit():
+        qs = qs.filter(category_id=int(filters["rc_category"]))
+
+    return qs.order_by(*receipt_ordering(filters["rc_sort"]))
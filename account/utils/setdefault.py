@@ -2,6 +2,10 @@ from django.db import transaction
 from account.models import Account,Bank
 
 
+# 요청(=request.user 객체) 단위로 기본 계좌를 기억해 두는 속성 이름
+_DEFAULT_ACCOUNT_CACHE_ATTR = "_default_account_cache"
+
+
 def get_default_account(user):
     acc = (
         Account.objects.filter(user=user, is_default=True).first()
@@ -24,6 +28,27 @@ def get_default_account(user):
         is_default=True,
     )
 
+
+def get_cached_default_account(user):
+    """
+    get_default_account 결과를 user 객체에 캐시해서 반환.
+    - request.user는 요청마다 새로 만들어지므로 캐시 수명 = 요청 1회
+    - context processor / 뷰에서 여러 번 불러도 DB 조회는 한 번만 발생
+    """
+    if hasattr(user, _DEFAULT_ACCOUNT_CACHE_ATTR):
+        return getattr(user, _DEFAULT_ACCOUNT_CACHE_ATTR)
+
+    acc = get_default_account(user)
+    setattr(user, _DEFAULT_ACCOUNT_CACHE_ATTR, acc)
+    return acc
+
+
+def invalidate_default_account(user):
+    """기본 계좌/잔액이 바뀐 뒤 같은 요청 안에서 다시 조회되도록 캐시 제거"""
+    if hasattr(user, _DEFAULT_ACCOUNT_CACHE_ATTR):
+        delattr(user, _DEFAULT_ACCOUNT_CACHE_ATTR)
+
+
 @transaction.atomic
 def set_default_account(user, account_id: int):
     """
@@ -43,4 +68,4 @@ def set_default_account(user, account_id: int):
     Account.objects.filter(user=user, is_default=True).update(is_default=False)
     # 새 기본계좌 지정
     Account.objects.filter(user=user, id=account_id).update(is_default=True)
-    
\ No newline at end of file
+    invalidate_default_account(user)
@@ -14,10 +14,12 @@ from .password import (
     PasswordResetView,
     PasswordVerifyView,
 )
-from .receipt import ReceiptHideView, ReceiptPDFView
 from .wallet import charge_balance
 from .fixer import csrf_failure
 
+# 영수증 뷰(account.views.receipt)는 PDF 렌더링 모듈을 끌고 오므로 여기서 import 하지 않는다.
+# URL은 accountbook.lazy_views.lazy_view로 첫 요청 때 불러온다 (account/urls.py)
+
 __all__ = [
     "SignUpView", "FindAccountView",
     "MypageView", "MypageUpdateView",
@@ -25,7 +27,6 @@ __all__ = [
     "AddressDeleteView", "SetDefaultAddressView",
     "PasswordResetView", "PasswordResetVerifyView", "PasswordResetSetView",
     "PasswordVerifyView", "PasswordChangeAfterVerifyView",
-    "ReceiptPDFView", "ReceiptHideView",
     "charge_balance",
     "csrf_failure",
 ]
@@ -10,6 +10,7 @@ from django.views.decorators.cache import never_cache
 from account.models import Account, Address
 from account.utils.forms import FindIDForm, PasswordVerifyForm, SignUpForm
 from shop.models import Transaction
+from shop.utils.ledger import apply_ledger_entry
 
 User = get_user_model()
 
@@ -45,7 +46,7 @@ class SignUpView(View):
                 # [핵심]회원가입 초기 충전도 입금(Transaction)으로 기록
                 init_amount = int(form.cleaned_data.get("balance") or 0)
                 if init_amount > 0:
-                    Transaction.objects.create(
+                    tx = Transaction.objects.create(
                         user=user,
                         account=account,
                         category=None,
@@ -58,6 +59,7 @@ class SignUpView(View):
                         merchant="내 지갑",
                         memo="회원가입 시 초기 충전",
                     )
+                    apply_ledger_entry(tx)
                     
                 Address.objects.create(
                     user=user,
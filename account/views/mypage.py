@@ -4,7 +4,6 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
 from django.db import IntegrityError, transaction
-from django.db.models import Sum
 from django.shortcuts import redirect, render
 from django.utils import timezone
 from django.utils.decorators import method_decorator
@@ -12,11 +11,18 @@ from django.views import View
 from django.views.decorators.cache import never_cache
 
 from account.models import Account, Address, Bank
-from shop.models import Transaction, Category
+from shop.models import Category
+from shop.utils.ledger import get_ledger_summary, rebuild_ledger
+from shop.utils.cursor import paginate_by_cursor
 from account.utils.forms import MypageUpdateForm, AccountAddForm
+from account.utils.receipt_query import receipt_filters, receipt_ordering, receipt_queryset
 
 # 잔액 이관 포함 set_default_account 사용
-from account.utils.setdefault import get_default_account, set_default_account
+from account.utils.setdefault import (
+    get_cached_default_account,
+    invalidate_default_account,
+    set_default_account,
+)
 
 
 #내 정보 뷰(Main)
@@ -70,7 +76,8 @@ class MypageView(LoginRequiredMixin, View):
         edit_addresses_page = edit_addr_paginator.get_page(edit_addr_page_num) 
 
         # “현재 선택 계좌(=기본계좌)”를 프로젝트 전체 정책과 동일하게 통일
-        account = get_default_account(request.user)
+        # (context processor의 account와 같은 요청 캐시를 공유)
+        account = get_cached_default_account(request.user)
         default_account = account
         
         formatted_phone = ""
@@ -80,56 +87,36 @@ class MypageView(LoginRequiredMixin, View):
         # ==========================
         # 영수증 탭: 페이지네이션 + 필터 + 정렬
         # ==========================
-        rc_category = (request.GET.get("rc_category") or "").strip()  # category_id
-        rc_sort = (request.GET.get("rc_sort") or "newest").strip()    # newest | price_high | price_low
+        filters = receipt_filters(request.GET)
+        rc_category = filters["rc_category"]
+        rc_sort = filters["rc_sort"]
         rc_page = request.GET.get("rc_page") or "1"
-        rc_start = (request.GET.get("rc_start") or "").strip()  # YYYY-MM-DD
-        rc_end = (request.GET.get("rc_end") or "").strip()      # YYYY-MM-DD
-
-
-        # 영수증 "삭제"는 Transaction을 지우지 않고 receipt_hidden=True로 숨김 처리
-        receipts_qs = Transaction.objects.filter(
-            user=request.user,
-            tx_type=Transaction.OUT,
-            receipt_hidden=False,
-        )
-        if rc_start:
-            receipts_qs = receipts_qs.filter(occurred_at__date__gte=rc_start)
-        if rc_end:
-            receipts_qs = receipts_qs.filter(occurred_at__date__lte=rc_end)
-
-        # 카테고리 필터
-        if rc_category.isdigit():
-            receipts_qs = receipts_qs.filter(category_id=int(rc_category))
-
-        # 정렬
-        if rc_sort == "price_high":
-            receipts_qs = receipts_qs.order_by("-amount", "-occurred_at", "-id")
-        elif rc_sort == "price_low":
-            receipts_qs = receipts_qs.order_by("amount", "-occurred_at", "-id")
+        rc_start = filters["rc_start"]
+        rc_end = filters["rc_end"]
+        # ?rc_paging=cursor 이면 OFFSET/COUNT 대신 keyset(커서) 페이지네이션
+        rc_cursor_mode = request.GET.get("rc_paging") == "cursor"
+        rc_cursor = request.GET.get("rc_cursor") or ""
+
+        # 필터/정렬은 영수증 일괄 내보내기(ReceiptExportView)와 같은 규칙
+        receipts_qs = receipt_queryset(request.user, filters)
+        rc_ordering = receipt_ordering(rc_sort)
+
+        if rc_cursor_mode:
+            receipts_page = paginate_by_cursor(receipts_qs, rc_ordering, rc_cursor, 10)
         else:
-            receipts_qs = receipts_qs.order_by("-occurred_at", "-id")
-
-        paginator = Paginator(receipts_qs, 10)
-        receipts_page = paginator.get_page(rc_page)
+            paginator = Paginator(receipts_qs, 10)
+            receipts_page = paginator.get_page(rc_page)
 
         receipt_categories = Category.objects.all().order_by("name")
 
         # ==========================
         # 요약 통계 탭: 누적 전체 지출/수익 합계
+        # - 거래내역 전체 Sum() 대신 집계 테이블(UserLedgerSummary) 1행 조회
+        # - 거래내역 요약 탭과 같은 기준이라 예전 income/buy 거래도 입금/지출에 포함된다
         # ==========================
-        total_out = (
-            Transaction.objects.filter(user=request.user, tx_type=Transaction.OUT)
-            .aggregate(s=Sum("amount"))
-            .get("s")
-            or 0
-        )
-        total_in = (
-            Transaction.objects.filter(user=request.user, tx_type=Transaction.IN)
-            .aggregate(s=Sum("amount"))
-            .get("s")
-            or 0
-        )
+        ledger = get_ledger_summary(request.user)
+        total_out = ledger.total_out
+        total_in = ledger.total_in
         net_total = total_in - total_out
 
         # 기존 기능을 해치지 않게: 폼은 그대로 두되, 템플릿에서 쓰는 경우만 사용
@@ -158,6 +145,7 @@ class MypageView(LoginRequiredMixin, View):
                 "rc_sort": rc_sort,
                 "rc_start": rc_start,
                 "rc_end": rc_end,
+                "rc_cursor_mode": rc_cursor_mode,
 
                 # 요약 통계 탭
                 "total_out": total_out,
@@ -282,7 +270,7 @@ class AccountAddView(LoginRequiredMixin, View):
         # 새 계좌를 추가할 때 잔액을 0으로 만들면,
         # 기본계좌를 새 계좌로 바꾸는 순간 잔액이 0처럼 보여서 "balance가 무쓸모"가 된다.
         # 따라서 현재 기본계좌 잔액을 복사해둔다.
-        base = get_default_account(request.user)
+        base = get_cached_default_account(request.user)
         base_name = (base.name if base else request.user.username)
         base_phone = (base.phone if base else "")
 
@@ -301,6 +289,7 @@ class AccountAddView(LoginRequiredMixin, View):
                     is_active=True,
                     is_default=(not has_default),
                 )
+            invalidate_default_account(request.user)
             messages.success(request, "계좌가 추가되었습니다.")
         except IntegrityError:
             messages.warning(request, "이미 등록된 계좌입니다.")
@@ -319,6 +308,9 @@ class AccountDeleteView(LoginRequiredMixin, View):
             messages.warning(request, "기본 계좌는 삭제할 수 없습니다.")
             return redirect("/accounts/mypage/?tab=profile")
 
-        acc.delete()
+        with transaction.atomic():
+            acc.delete()
+            # 계좌 삭제 시 거래내역도 CASCADE로 지워지므로 누적 집계를 다시 계산
+            rebuild_ledger(request.user)
         messages.success(request, "계좌가 삭제되었습니다.")
         return redirect("/accounts/mypage/?tab=profile")
@@ -1,24 +1,31 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404, HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.cache import never_cache
 
-from reportlab.lib.pagesizes import portrait
-from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
-
 from shop.models import Transaction
-from account.models import Address
-from account.utils.receipt import calc_vat, money_int, register_korean_font
-
-# 다계좌: 기본계좌 우선
-from account.utils.setdefault import get_default_account
+from account.models import Address, ReceiptJob
+from account.utils.receipt import receipt_fields
+from account.utils.receipt_cache import (
+    get_or_render_receipt,
+    is_receipt_cached,
+    purge_receipt,
+    receipt_fingerprint,
+)
+from account.utils.receipt_export import export_limit, iter_receipts_pdf, iter_receipts_zip
+from account.utils.receipt_jobs import background_enabled, enqueue_receipts
+from account.utils.receipt_query import receipt_filters, receipt_queryset
+
+# 백그라운드 생성 대기 중일 때 브라우저가 알아서 다시 요청하는 간격(초)
+RECEIPT_RETRY_AFTER = 2
 
 
-@method_decorator(never_cache, name="dispatch")
 class ReceiptPDFView(LoginRequiredMixin, View):
     """
     /accounts/receipts/<tx_id>.pdf
@@ -30,6 +37,12 @@ class ReceiptPDFView(LoginRequiredMixin, View):
         할인 된 가격 : ---
         -----------------------------
         최종 가격 : ---
+
+    캐시: 영수증에 찍히는 값의 해시(= ETag)로 저장된 PDF를 재사용
+    - If-None-Match가 같으면 304 (파일도 읽지 않음)
+    - 캐시 파일이 있으면 파일 읽기 1번, 없을 때만 ReportLab 렌더링
+    - RECEIPT_BACKGROUND_RENDER가 켜져 있으면 렌더링은 run_receipt_worker가 하고,
+      아직 안 만들어졌으면 202 + 자동 새로고침 (백그라운드 작업이 실패한 건만 요청 안에서 렌더링)
     """
     login_url = "login"
 
@@ -38,152 +51,107 @@ class ReceiptPDFView(LoginRequiredMixin, View):
             Transaction.objects
             # 영수증 "삭제"(숨김)된 건은 PDF 접근도 막음
             .filter(id=tx_id, user=request.user, receipt_hidden=False)
-            .select_related("account", "account__bank", "used_coupon", "used_coupon__coupon")
+            .select_related("account", "account__bank", "product", "used_coupon", "used_coupon__coupon")
             .first()
         )
         if not tx:
             raise Http404("영수증을 찾을 수 없습니다.")
 
-        account = tx.account
-        if not account:
+        if not tx.account:
             raise Http404("결제 계좌 정보가 없습니다.")
 
-        # 기본배송지 fallback (결제 시 저장된 주소가 없을 때만 사용)
-        default_addr = Address.objects.filter(user=request.user, is_default=True).first()
-        if not default_addr:
-            default_addr = Address.objects.filter(user=request.user).first()
-
-        page_w = 80 * mm
-        page_h = 110 * mm
-        pagesize = portrait((page_w, page_h))
-
-        font_name = register_korean_font()
+        # 기본배송지 fallback (결제 시 저장된 주소가 없을 때만 조회/사용)
+        default_addr = None
+        if not tx.shipping_address:
+            default_addr = (
+                Address.objects.filter(user=request.user).order_by("-is_default", "id").first()
+            )
+
+        fields = receipt_fields(tx, default_addr)
+        fingerprint = receipt_fingerprint(fields)
+        etag = f'"{fingerprint}"'
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            patch_cache_control(not_modified, private=True, no_cache=True)
+            return not_modified
+
+        if background_enabled() and not is_receipt_cached(tx.id, fingerprint):
+            job = ReceiptJob.objects.filter(transaction=tx).only("status").first()
+            if job is None or job.status != ReceiptJob.FAILED:
+                if job is None or job.status == ReceiptJob.DONE:
+                    # 작업이 없거나, 만든 뒤 거래 내용이 바뀐 경우 다시 대기열로
+                    enqueue_receipts([tx.id])
+                return self._pending_response()
 
         filename = f"receipt_{tx.id}.pdf"
-        resp = HttpResponse(content_type="application/pdf")
+        resp = FileResponse(get_or_render_receipt(fields, fingerprint), content_type="application/pdf")
         resp["Content-Disposition"] = f'inline; filename="{filename}"'
+        resp["ETag"] = etag
+        # 로그인 사용자 전용 문서: 공유 캐시 금지, 브라우저는 매번 ETag로 재검증
+        patch_cache_control(resp, private=True, no_cache=True)
+        return resp
 
-        canv = canvas.Canvas(resp, pagesize=pagesize)
-        canv.setTitle(filename)
-
-        x = 6 * mm
-        y = page_h - 10 * mm
-
-        def line():
-            nonlocal y
-            canv.line(x, y, page_w - x, y)
-            y -= 8
-
-        def kv(label, value, size=8):
-            nonlocal y
-            canv.setFont(font_name, size)
-            canv.drawString(x, y, str(label))
-            canv.drawRightString(page_w - x, y, str(value))
-            y -= size + 5
-
-        def kv_multiline(label, value, size=7, max_chars=24):
-            """
-            주소처럼 긴 텍스트를 여러 줄로 출력 (오른쪽 정렬 유지)
-            """
-            nonlocal y
-            canv.setFont(font_name, size)
-            canv.drawString(x, y, str(label))
-
-            text = str(value) if value is not None else "-"
-            if not text:
-                text = "-"
-
-            lines = [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
-            canv.drawRightString(page_w - x, y, lines[0])
-            y -= size + 4
-
-            for t in lines[1:]:
-                canv.drawRightString(page_w - x, y, t)
-                y -= size + 4
-
-        merchant = tx.merchant or "ACCOUNT BOOK"
-        amount = money_int(tx.amount)
-        occurred = tx.occurred_at.strftime("%Y-%m-%d %H:%M:%S")
-
-        canv.setFont(font_name, 12)
-        canv.drawString(x, y, merchant)
-        y -= 18
-
-        canv.setFont(font_name, 24)
-        canv.drawString(x, y, f"{amount:,}원")
-        y -= 20
-
-        # 계좌 출력 (마스킹)
-        last4 = str(account.account_number)[-4:] if account.account_number else "----"
-        masked = f"****{last4}" if last4 != "----" else "----"
-        canv.setFont(font_name, 10)
-        canv.drawString(x, y, f"{account.bank} ({masked})")
-        y -= 12
-
-        line()
-
-        kv("승인일시", occurred)
-        kv("거래구분", "출금" if tx.tx_type == Transaction.OUT else "입금")
-
-        # =========================
-        # 쿠폰/할인 내역을 PDF에 출력 (요구사항 포맷)
-        # =========================
-        discount = money_int(tx.discount_amount)
-        coupon_name = "-"
-        if tx.used_coupon and getattr(tx.used_coupon, "coupon", None):
-            coupon_name = tx.used_coupon.coupon.name or "-"
-
-        original_total = money_int(tx.total_price_at_pay)
-        if original_total <= 0:
-            # 할인 전 금액이 저장되지 않았다면 최종 + 할인으로 역산
-            original_total = amount + discount
-
-        discounted_total = max(original_total - discount, 0)
-
-        if tx.used_coupon or discount > 0:
-            kv("쿠폰 이름", coupon_name)
-            kv("할인 가격", f"{discount:,}원")
-            kv("할인 된 가격", f"{discounted_total:,}원")
-            line()
-            kv("최종 가격", f"{amount:,}원")
-        else:
-            kv("최종 가격", f"{amount:,}원")
+    def _pending_response(self):
+        resp = HttpResponse(
+            f'<meta http-equiv="refresh" content="{RECEIPT_RETRY_AFTER}">'
+            "영수증을 생성하고 있습니다. 잠시 후 자동으로 다시 열립니다.",
+            status=202,
+            content_type="text/html; charset=utf-8",
+        )
+        resp["Retry-After"] = str(RECEIPT_RETRY_AFTER)
+        patch_cache_control(resp, private=True, no_store=True)
+        return resp
 
-        line()
 
-        supply, vat, fee = calc_vat(amount)
-        kv("공급가액", f"{supply:,}원")
-        kv("부가세", f"{vat:,}원")
-        kv("봉사료", f"{fee:,}원")
+@method_decorator(never_cache, name="dispatch")
+class ReceiptExportView(LoginRequiredMixin, View):
+    """
+    /accounts/receipts/export/?format=pdf|zip&rc_start=&rc_end=&rc_category=&rc_sort=
 
-        line()
+    마이페이지 영수증 탭과 같은 필터/정렬로 영수증을 한 번에 내려받기
+    - format=pdf: 영수증마다 한 페이지인 PDF 1개 (최대 export_limit()건, 넘으면 ZIP 안내)
+    - format=zip: receipt_<id>.pdf 파일들을 묶은 ZIP (영수증 캐시 재사용, 건수 상한 없음)
+    - 둘 다 StreamingHttpResponse로 조각씩 전송하고, 거래도 iterator()로 나눠 읽는다
+    """
+    login_url = "login"
 
-        product_name = tx.product_name or (tx.product.name if tx.product else "상품")
-        qty = tx.quantity or 1
-        kv("상품명", f"{product_name} ({qty}개)")
-        kv("메모", tx.memo or "-")
+    def get(self, request):
+        fmt = request.GET.get("format") or "pdf"
+        if fmt not in ("pdf", "zip"):
+            raise Http404("지원하지 않는 형식입니다.")
 
-        line()
+        filters = receipt_filters(request.GET)
+        qs = receipt_queryset(request.user, filters).select_related(
+            "account", "account__bank", "product", "used_coupon", "used_coupon__coupon"
+        )
 
-        # 배송지: 결제 시 Transaction에 저장된 값이 있으면 그걸 우선 출력
-        if tx.shipping_address:
-            zip_code = tx.shipping_zip_code or ""
-            detail = tx.shipping_detail_address or ""
-            addr_text = f"({zip_code}) {tx.shipping_address} {detail}".strip()
-        elif default_addr:
-            addr_text = f"({default_addr.zip_code}) {default_addr.address} {default_addr.detail_address}"
+        if not qs.exists():
+            messages.info(request, "내보낼 영수증이 없습니다.")
+            return redirect(f"{reverse('mypage')}?tab=receipt")
+        # PDF 한 파일은 저장 전까지 페이지를 메모리에 모으므로 건수 상한이 있다 (ZIP은 상한 없음)
+        limit = export_limit()
+        if fmt == "pdf" and qs[limit : limit + 1].exists():
+            messages.error(
+                request,
+                f"PDF 한 파일로는 최대 {limit:,}건까지 내보낼 수 있습니다. ZIP으로 받거나 기간을 좁혀주세요.",
+            )
+            return redirect(f"{reverse('mypage')}?tab=receipt")
+
+        # 결제 시 배송지가 저장되지 않은 거래용 기본 배송지 (한 번만 조회)
+        default_addr = Address.objects.filter(user=request.user).order_by("-is_default", "id").first()
+        txs = qs.iterator(chunk_size=100)
+
+        stamp = timezone.localtime().strftime("%Y%m%d_%H%M%S")
+        if fmt == "zip":
+            resp = StreamingHttpResponse(iter_receipts_zip(txs, default_addr), content_type="application/zip")
         else:
-            addr_text = "-"
-
-        kv_multiline("배송지", addr_text, size=7, max_chars=24)
-
-        line()
-
-        canv.setFont(font_name, 7)
-        canv.drawString(x, 12 * mm, "※ 본 영수증은 시스템에서 생성된 증빙용 문서입니다.")
-        canv.showPage()
-        canv.save()
-
+            filename = f"receipts_{stamp}.pdf"
+            resp = StreamingHttpResponse(
+                iter_receipts_pdf(txs, default_addr, title=filename), content_type="application/pdf"
+            )
+        resp["Content-Disposition"] = f'attachment; filename="receipts_{stamp}.{fmt}"'
         return resp
 
 
@@ -209,6 +177,7 @@ class ReceiptHideView(LoginRequiredMixin, View):
 
         tx.receipt_hidden = True
         tx.save(update_fields=["receipt_hidden"])
+        purge_receipt(tx.id)
         messages.success(request, "영수증이 삭제되었습니다. (거래 내역은 유지됩니다)")
 
         # 삭제 후 원래 보고 있던 화면으로 복귀(없으면 영수증 탭)
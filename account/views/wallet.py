@@ -6,9 +6,14 @@ from django.shortcuts import redirect
 from django.utils import timezone
 
 from account.models import Account
+from account.utils.setdefault import invalidate_default_account
 from shop.models import Transaction
+from shop.utils.idempotency import idempotent, mark_succeeded
+from shop.utils.inventory import credit_balance
+from shop.utils.ledger import apply_ledger_entry
 
 @login_required
+@idempotent("charge_balance")
 def charge_balance(request):
     if request.method == "POST":
         amount = request.POST.get("amount")
@@ -28,12 +33,11 @@ def charge_balance(request):
                 return redirect(request.META.get("HTTP_REFERER", "/"))
 
             with transaction.atomic():
-                # 계좌 잔액 증가
-                account.balance += amount_int
-                account.save()
+                # 계좌 잔액 증가 (읽고 되쓰지 않고 F() 증가 -> 동시 충전/결제와 충돌해도 잔액 유실 없음)
+                credit_balance(account, amount_int)
 
                 # 거래 내역 기록
-                Transaction.objects.create(
+                tx = Transaction.objects.create(
                     user=request.user,
                     account=account,
                     tx_type=Transaction.IN,
@@ -43,6 +47,10 @@ def charge_balance(request):
                     merchant="내 지갑",
                     memo=f"{account.bank.name} 충전 완료"
                 )
+                apply_ledger_entry(tx)
+            # 같은 요청에서 잔액을 다시 읽을 때 충전 전 값이 보이지 않도록
+            invalidate_default_account(request.user)
+            mark_succeeded(request)
 
             messages.success(request, f"{intcomma(amount_int)}원이 성공적으로 충전되었습니다!")
 
@@ -0,0 +1,24 @@
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path: str, **initkwargs):
+    """
+    URLconf용: 뷰 모듈을 서버 시작 때가 아니라 그 URL로 첫 요청이 왔을 때 import 한다.
+        path("receipts/<int:tx_id>.pdf", lazy_view("account.views.receipt.ReceiptPDFView"), name="receipt_pdf")
+    - 클래스 뷰면 as_view(**initkwargs), 함수 뷰면 그대로 사용 (한 번 만든 뷰는 재사용)
+    - csrf_exempt처럼 뷰 함수 속성을 미들웨어가 미리 읽는 데코레이터는 감지되지 않으므로
+      그런 뷰에는 쓰지 않는다 (dispatch에 거는 method_decorator는 문제없음)
+    """
+    resolved = None
+
+    def view(request, *args, **kwargs):
+        nonlocal resolved
+        if resolved is None:
+            target = import_string(dotted_path)
+            resolved = target.as_view(**initkwargs) if isinstance(target, type) else target
+        return resolved(request, *args, **kwargs)
+
+    view.lazy_view_path = dotted_path
+    view.__name__ = dotted_path.rsplit(".", 1)[-1]
+    view.__qualname__ = view.__name__
+    return view
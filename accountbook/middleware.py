@@ -0,0 +1,109 @@
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("accountbook.requests")
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper 로 거는 쿼리 기록기 (요청마다 새로 만든다).
+    - SQL 문(파라미터 자리 %s 그대로) 별로 횟수 / 누적 시간
+    - 같은 SQL + 같은 파라미터가 또 실행되면 중복(N+1, 같은 값 재조회)으로 센다
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duplicates = 0
+        self.total = 0.0
+        self.by_sql = defaultdict(lambda: [0, 0.0])  # sql -> [횟수, 누적 초]
+        self._seen = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.total += elapsed
+            stat = self.by_sql[sql]
+            stat[0] += 1
+            stat[1] += elapsed
+            key = (sql, repr(params))
+            self._seen[key] += 1
+            if self._seen[key] > 1:
+                self.duplicates += 1
+
+    def top(self, n: int) -> list:
+        """누적 시간이 긴 SQL 문 n개 [{sql, count, ms}, ...]"""
+        rows = sorted(self.by_sql.items(), key=lambda item: item[1][1], reverse=True)[:n]
+        return [
+            {"sql": sql[:500], "count": count, "ms": round(seconds * 1000, 2)}
+            for sql, (count, seconds) in rows
+        ]
+
+
+class RequestInstrumentationMiddleware:
+    """
+    요청마다 SQL 개수 / 중복 쿼리 / DB 시간 / 전체 처리 시간을 재서
+    - 응답에 Server-Timing 헤더 (브라우저 개발자도구 Network > Timing 에 표시)
+    - accountbook.requests 로거에 URL 이름별 JSON 한 줄
+    - REQUEST_SLOW_MS 이상 걸린 요청은 WARNING + 누적 시간 상위 SQL 문
+    settings.REQUEST_INSTRUMENTATION 이 False면 미들웨어 체인에서 빠진다 (오버헤드 없음).
+    StreamingHttpResponse 는 본문을 내보내는 시간/쿼리는 포함하지 않는다 (뷰가 응답을 반환한 시점까지).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "REQUEST_SLOW_MS", 500)
+        self.top_sql = getattr(settings, "REQUEST_TOP_SQL", 5)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.total * 1000
+
+        response["Server-Timing"] = ", ".join(
+            filter(
+                None,
+                [
+                    response.get("Server-Timing"),
+                    f'db;dur={db_ms:.1f};desc="{recorder.count} queries, {recorder.duplicates} duplicate"',
+                    f"app;dur={max(total_ms - db_ms, 0):.1f}",
+                    f"total;dur={total_ms:.1f}",
+                ],
+            )
+        )
+
+        match = getattr(request, "resolver_match", None)
+        record = {
+            "url_name": (match.view_name if match else None) or "-",
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 1),
+            "db_ms": round(db_ms, 1),
+            "queries": recorder.count,
+            "dup_queries": recorder.duplicates,
+        }
+        if total_ms >= self.slow_ms:
+            record["slow"] = True
+            record["top_sql"] = recorder.top(self.top_sql)
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(record, ensure_ascii=False))
+        return response
@@ -34,6 +34,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # 요청별 SQL/시간 계측 (REQUEST_INSTRUMENTATION 이 꺼져 있으면 체인에서 빠짐)
+    "accountbook.middleware.RequestInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -104,4 +106,33 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # 로그인 관련 경로
 LOGIN_REDIRECT_URL = "/shop/"
 LOGOUT_REDIRECT_URL = "/shop/"
-LOGIN_URL = "/accounts/login/"
\ No newline at end of file
+LOGIN_URL = "/accounts/login/"
+# 캐시 (기본: 프로세스 로컬 메모리. 워커가 여러 개면 Redis/Memcached 등 공유 캐시 권장)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "accountbook-default",
+    }
+}
+
+# 상품 목록 카탈로그 캐시 (shop.utils.catalog)
+CATALOG_CACHE_ENABLED = os.environ.get("CATALOG_CACHE_ENABLED", "1") != "0"
+CATALOG_CACHE_TIMEOUT = 300
+
+# 요청별 SQL/시간 계측 (accountbook.middleware.RequestInstrumentationMiddleware)
+# - Server-Timing 헤더 + accountbook.requests 로거에 JSON 한 줄
+# - REQUEST_SLOW_MS 이상 걸린 요청은 WARNING + 누적 시간 상위 REQUEST_TOP_SQL 개 SQL
+REQUEST_INSTRUMENTATION = os.environ.get("REQUEST_INSTRUMENTATION", "0") == "1"
+REQUEST_SLOW_MS = int(os.environ.get("REQUEST_SLOW_MS", "500"))
+REQUEST_TOP_SQL = 5
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "accountbook.requests": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
@@ -0,0 +1,26 @@
+class ChunkBuffer:
+    """
+    zipfile이 쓰는 대상(seek 불가 스트림).
+    쓴 바이트를 모아 두었다가 제너레이터가 take()로 꺼내 가면 비운다 -> 메모리에는 마지막 take() 이후 분량만.
+    (영수증 ZIP 내보내기, 거래내역 XLSX 내보내기)
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
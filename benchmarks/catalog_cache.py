@@ -0,0 +1,105 @@
+"""
+상품 목록(ProductListView) 초당 요청 수: 카탈로그 캐시 off(before) vs on(after)
+
+    python benchmarks/catalog_cache.py --products 2000 --seconds 5
+
+- 실제 DB를 건드리지 않도록 Django 테스트 DB(test_<NAME>)를 만들어 시드하고 끝나면 삭제
+- 검색어 없음 / 카테고리 필터 / 검색어 조합의 목록 URL을 돌아가며 django.test.Client로 요청
+- 템플릿 렌더링까지 포함한 뷰 전체 처리량 (네트워크/WSGI 서버 제외)
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "accountbook.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from shop.models import Category, Coupon, Product  # noqa: E402
+
+
+def seed(products: int):
+    cats = [Category.objects.create(name=f"카테고리{i}") for i in range(10)]
+    Product.objects.bulk_create(
+        [
+            Product(
+                category=cats[i % len(cats)],
+                name=f"상품{i}",
+                price=1000 + i,
+                stock=100,
+                image1="bench.png",
+                search_text=f"상품{i} 카테고리{i % len(cats)}",
+            )
+            for i in range(products)
+        ],
+        batch_size=1000,
+    )
+    for i in range(3):
+        Coupon.objects.create(
+            name=f"쿠폰{i}", code=f"BENCH{i}", discount_value=Decimal(1000), valid_to=timezone.now()
+        )
+    return cats
+
+
+def urls(cats):
+    base = reverse("product_list")
+    return [
+        f"{base}",
+        f"{base}?page=2",
+        f"{base}?sort=price_low",
+        f"{base}?category={cats[3].id}",
+        f"{base}?search=상품1&page=3",
+    ]
+
+
+def measure(label, url_list, seconds):
+    client = Client()
+    for url in url_list:  # 캐시 채우기 / 템플릿 로딩
+        client.get(url)
+    done = 0
+    deadline = time.perf_counter() + seconds
+    for url in itertools.cycle(url_list):
+        resp = client.get(url)
+        assert resp.status_code == 200, (url, resp.status_code)
+        done += 1
+        if time.perf_counter() >= deadline:
+            break
+    print(f"[{label}] {done / seconds:.1f} req/s (n={done}, {connection.vendor})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=1, autoclobber=True)
+    try:
+        url_list = urls(seed(args.products))
+        with override_settings(CATALOG_CACHE_ENABLED=False):
+            measure("before (캐시 off)", url_list, args.seconds)
+        cache.clear()
+        with override_settings(CATALOG_CACHE_ENABLED=True):
+            measure("after (캐시 on)", url_list, args.seconds)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=1)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
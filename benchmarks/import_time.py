@@ -0,0 +1,72 @@
+"""
+콜드 스타트 import 시간 측정 / 회귀 확인
+
+    python benchmarks/import_time.py            # python -X importtime manage.py check 결과 요약
+    python benchmarks/import_time.py --top 30
+
+- 새 프로세스로 `python -X importtime manage.py check`를 실행해 stderr의 importtime 로그를 집계
+- 누적 시간이 큰 최상위 패키지 목록과 전체 시간을 출력
+- 웹 워커 부팅 때 올라오면 안 되는 모듈(FORBIDDEN: ReportLab, 영수증 뷰)이 보이면 종료코드 1
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# 영수증 PDF 요청이 올 때만 import 되어야 하는 모듈
+FORBIDDEN = ("reportlab", "account.views.receipt", "account.utils.receipt_export")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_importtime():
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "accountbook.settings"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "manage.py", "check"],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(proc.stderr[-2000:])
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            self_us, cumulative_us, indent, module = m.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = run_importtime()
+    by_package = defaultdict(int)
+    for module, self_us, _, _ in rows:
+        by_package[module.split(".")[0]] += self_us
+
+    total_ms = sum(self_us for _, self_us, _, _ in rows) / 1000
+    print(f"전체 import 시간: {total_ms:.1f}ms (모듈 {len(rows)}개)")
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {package:<30} {us / 1000:8.1f}ms")
+
+    loaded = sorted({m for m, *_ in rows if any(m == f or m.startswith(f + ".") for f in FORBIDDEN)})
+    if loaded:
+        print("부팅 중 import 되면 안 되는 모듈이 올라왔습니다:")
+        for m in loaded:
+            print(f"  - {m}")
+        sys.exit(1)
+    print("OK: ReportLab/영수증 뷰는 부팅 때 import 되지 않습니다.")
+
+
+if __name__ == "__main__":
+    main()
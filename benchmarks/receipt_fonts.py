@@ -0,0 +1,94 @@
+"""
+영수증 PDF 1장 렌더링 시간: 요청마다 폰트 등록(before) vs 프로세스당 한 번 등록(after)
+
+    python benchmarks/receipt_fonts.py --repeat 50
+
+- DB 없이 receipt_fields 형태의 dict로 draw_receipt만 측정
+- before: 예전 register_korean_font처럼 렌더링마다 TTFont(NanumGothic-Regular.ttf)를 새로 파싱/등록
+- after : get_receipt_fonts() 싱글턴 (첫 호출에서만 Regular/Bold/ExtraBold 등록)
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "accountbook.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from reportlab.pdfbase import pdfmetrics  # noqa: E402
+from reportlab.pdfbase.ttfonts import TTFont  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from account.utils.receipt import RECEIPT_PAGESIZE, draw_receipt, get_receipt_fonts  # noqa: E402
+
+FIELDS = {
+    "tx_id": 1,
+    "merchant": "ACCOUNT BOOK",
+    "amount": 18000,
+    "occurred": "2026-01-01 12:00:00",
+    "account": "테스트은행 (****1234)",
+    "tx_type": "출금",
+    "has_coupon": True,
+    "coupon_name": "10퍼 할인",
+    "discount": 2000,
+    "discounted_total": 18000,
+    "product_name": "사과",
+    "quantity": 2,
+    "memo": "장바구니 결제(1/1)",
+    "address": "(12345) 서울시 어딘가 101호",
+}
+
+
+def legacy_register_font() -> str:
+    """변경 전 동작: 호출마다 TTF 파일을 파싱해서 다시 등록"""
+    font_path = os.path.join(settings.BASE_DIR, "static", "fonts", "NanumGothic-Regular.ttf")
+    if os.path.exists(font_path):
+        pdfmetrics.registerFont(TTFont("NanumGothic-Regular", font_path))
+        return "NanumGothic-Regular"
+    return "Helvetica"
+
+
+def render(font_name_fn):
+    buf = io.BytesIO()
+    canv = canvas.Canvas(buf, pagesize=RECEIPT_PAGESIZE)
+    draw_receipt(canv, FIELDS, font_name_fn())
+    canv.save()
+    return buf.getvalue()
+
+
+def measure(label, font_name_fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        render(font_name_fn)
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    print(
+        f"[{label}] median={statistics.median(timings):.2f}ms "
+        f"min={timings[0]:.2f}ms max={timings[-1]:.2f}ms (n={repeat})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    measure("before (요청마다 폰트 등록)", legacy_register_font, args.repeat)
+
+    t0 = time.perf_counter()
+    get_receipt_fonts()
+    print(f"[after] 최초 1회 폰트 패밀리 등록: {(time.perf_counter() - t0) * 1000:.2f}ms")
+    measure("after (프로세스당 1회 등록)", lambda: get_receipt_fonts()["regular"], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Transaction 복합 인덱스 전/후 쿼리 플랜과 지연시간 비교 벤치마크
+
+    python benchmarks/tx_indexes.py --rows 1000000
+
+- 실제 DB를 건드리지 않도록 Django 테스트 DB(test_<NAME>)를 만들어 시드하고 끝나면 삭제
+- 인덱스를 모두 지운 상태(before) -> 다시 만든 상태(after) 순서로
+  거래내역 탭 / 마이페이지 영수증 탭 / 상품 상세 구매여부 쿼리를 측정
+- PostgreSQL에서 돌려야 의미 있는 플랜이 나온다 (DATABASE_URL 지정)
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "accountbook.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Q  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from account.models import Account, Bank  # noqa: E402
+from shop.models import Category, Product, Transaction  # noqa: E402
+
+User = get_user_model()
+
+
+def seed(rows: int, users: int, chunk: int = 10_000):
+    bank = Bank.objects.create(name="벤치은행", min_len=1, max_len=50)
+    cats = [Category.objects.create(name=f"카테고리{i}") for i in range(10)]
+    products = [
+        Product.objects.create(
+            category=cats[i % len(cats)], name=f"상품{i}", price=1000 + i, stock=100, image1="bench.png"
+        )
+        for i in range(100)
+    ]
+    user_objs = User.objects.bulk_create([User(username=f"bench{i}") for i in range(users)])
+    accounts = Account.objects.bulk_create(
+        [
+            Account(user=u, name="bench", phone="01000000000", bank=bank, account_number=f"{i:010d}", is_default=True)
+            for i, u in enumerate(user_objs)
+        ]
+    )
+
+    rnd = random.Random(42)
+    now = timezone.now()
+    done = 0
+    while done < rows:
+        batch = []
+        for _ in range(min(chunk, rows - done)):
+            # 첫 번째 사용자를 "헤비 유저"로: 전체의 약 10%
+            idx = 0 if rnd.random() < 0.1 else rnd.randrange(users)
+            product = rnd.choice(products)
+            is_out = rnd.random() < 0.7
+            batch.append(
+                Transaction(
+                    user_id=user_objs[idx].id,
+                    account_id=accounts[idx].id,
+                    category_id=product.category_id if is_out else None,
+                    product_id=product.id if is_out else None,
+                    product_name=product.name if is_out else "계좌 충전",
+                    tx_type=Transaction.OUT if is_out else Transaction.IN,
+                    amount=Decimal(rnd.randint(1000, 100_000)),
+                    occurred_at=now - timedelta(minutes=rnd.randint(0, 60 * 24 * 730)),
+                    receipt_hidden=rnd.random() < 0.05,
+                )
+            )
+        Transaction.objects.bulk_create(batch)
+        done += len(batch)
+        print(f"  seeded {done:,}/{rows:,}", end="\r", flush=True)
+    print()
+    return user_objs[0], products[0]
+
+
+def workloads(user, product):
+    now = timezone.now()
+    history = (
+        Transaction.objects.filter(user=user, tx_type__in=["OUT", "buy"])
+        .filter(occurred_at__gte=now - timedelta(days=90), occurred_at__lt=now)
+        .order_by("-occurred_at")[:10]
+    )
+    receipts = Transaction.objects.filter(
+        user=user, tx_type=Transaction.OUT, receipt_hidden=False
+    ).order_by("-occurred_at", "-id")[:10]
+    has_bought = Transaction.objects.filter(user=user, tx_type__in=["OUT", "buy"]).filter(
+        Q(product=product) | Q(product_name=product.name)
+    )[:1]
+    return {"history": history, "receipts": receipts, "has_bought": has_bought}
+
+
+def measure(label, qs_map, repeat):
+    print(f"\n===== {label} =====")
+    for name, qs in qs_map.items():
+        plan = qs.explain(analyze=True) if connection.vendor == "postgresql" else qs.explain()
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            list(qs.all())
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        print(f"\n[{name}] median={timings[len(timings) // 2]:.2f}ms min={timings[0]:.2f}ms")
+        print(plan)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=1, autoclobber=True)
+    try:
+        print(f"seeding {args.rows:,} transactions for {args.users} users ...")
+        user, product = seed(args.rows, args.users)
+        qs_map = workloads(user, product)
+        indexes = Transaction._meta.indexes
+
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(Transaction, index)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE shop_transaction")
+        measure("before (FK 단일 인덱스만)", qs_map, args.repeat)
+
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Transaction, index)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE shop_transaction")
+        measure("after (복합 인덱스)", qs_map, args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=1)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
 from .models import *
+from shop.models import REVIEW_STAT_FIELDS
 from account.models import *
+from account.utils.receipt_cache import purge_receipt
+from shop.utils.ledger import rebuild_ledger
+from shop.utils.purchases import record_purchases
+from shop.utils.review_stats import rebuild_review_stats
+
+User = get_user_model()
 
 # Register your models here.
 
@@ -38,6 +46,35 @@ class TransactionAdmin(admin.ModelAdmin):
     search_fields = ("user__username", "product_name", "shipping_address", "memo")
     ordering = ("-occurred_at",)
 
+    # 관리자에서 거래를 직접 수정/삭제하면 증분 갱신을 거치지 않으므로 해당 사용자 집계를 재계산
+    # (캐시된 영수증 PDF도 함께 정리)
+    def save_model(self, request, obj, form, change):
+        # 거래를 다른 사용자에게 옮긴 경우 이전 사용자 집계에서도 빠지도록 둘 다 재계산
+        old_user_id = Transaction.objects.filter(pk=obj.pk).values_list("user_id", flat=True).first()
+        super().save_model(request, obj, form, change)
+        rebuild_ledger(obj.user)
+        if old_user_id is not None and old_user_id != obj.user_id:
+            rebuild_ledger(User.objects.get(pk=old_user_id))
+        if obj.tx_type == Transaction.OUT:
+            record_purchases(obj.user_id, [obj.product_id], obj.occurred_at)
+        if change:
+            purge_receipt(obj.pk)
+
+    def delete_model(self, request, obj):
+        user, tx_id = obj.user, obj.pk
+        super().delete_model(request, obj)
+        rebuild_ledger(user)
+        purge_receipt(tx_id)
+
+    def delete_queryset(self, request, queryset):
+        txs = list(queryset.select_related("user"))
+        users = {tx.user for tx in txs}
+        super().delete_queryset(request, queryset)
+        for user in users:
+            rebuild_ledger(user)
+        for tx in txs:
+            purge_receipt(tx.pk)
+
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
@@ -48,6 +85,18 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ("name", "category__name")
     ordering = ("category", "name")
 
+    # 수정 폼을 여는 사이에 달린 리뷰가 폼 객체의 (오래된) 리뷰 통계로 덮어써지지 않도록 통계 컬럼은 빼고 저장
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        obj.save(
+            update_fields=[
+                f.attname
+                for f in obj._meta.concrete_fields
+                if not f.primary_key and f.attname not in REVIEW_STAT_FIELDS
+            ]
+        )
+
     fieldsets = (
         ("기본 정보", {"fields": ("category", "name", "price", "stock", "description")}),
         ("상단 슬라이드 이미지 (최대 5장)", {"fields": ("image1", "image2", "image3", "image4", "image5")}),
@@ -70,6 +119,22 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ["content", "user__username", "product__name"]
     inlines = [ReviewImageInline]
 
+    # 관리자에서 리뷰를 수정/삭제하면 뷰의 증분 갱신을 거치지 않으므로 해당 상품 리뷰 통계를 재계산
+    def save_model(self, request, obj, form, change):
+        old_product_id = Review.objects.filter(pk=obj.pk).values_list("product_id", flat=True).first()
+        super().save_model(request, obj, form, change)
+        rebuild_review_stats({obj.product_id, old_product_id} - {None})
+
+    def delete_model(self, request, obj):
+        product_id = obj.product_id
+        super().delete_model(request, obj)
+        rebuild_review_stats([product_id])
+
+    def delete_queryset(self, request, queryset):
+        product_ids = set(queryset.values_list("product_id", flat=True))
+        super().delete_queryset(request, queryset)
+        rebuild_review_stats(product_ids)
+
     def star_rating(self, obj):
         return "★" * obj.rating
     star_rating.short_description = "평점"
@@ -101,3 +166,32 @@ class UserCouponAdmin(admin.ModelAdmin):
     list_filter = ("is_used", "coupon", "user", "used_at")  # ✅ 핵심
     search_fields = ("user__username", "coupon__code", "coupon__name")
     ordering = ("-used_at",)
+
+
+@admin.register(UserLedgerSummary)
+class UserLedgerSummaryAdmin(admin.ModelAdmin):
+    # 집계 테이블은 조회 전용 (수정은 rebuild_ledger 커맨드로)
+    list_display = ("user", "total_in", "total_out", "updated_at")
+    search_fields = ("user__username",)
+    readonly_fields = ("user", "total_in", "total_out", "updated_at")
+
+
+@admin.register(LedgerMonthlyRollup)
+class LedgerMonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ("user", "account", "month", "total_in", "total_out")
+    list_filter = ("month",)
+    search_fields = ("user__username",)
+    ordering = ("-month",)
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    # 중복 제출 방지 키는 조회 전용 (정리는 purge_idempotency_keys 커맨드로)
+    list_display = ("user", "scope", "key", "status", "response_status", "created_at", "expires_at")
+    list_filter = ("scope", "status")
+    search_fields = ("user__username", "key")
+    ordering = ("-created_at",)
+    readonly_fields = (
+        "user", "scope", "key", "request_hash", "status",
+        "response_status", "response_location", "response_messages", "created_at", "expires_at",
+    )
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ShopConfig(AppConfig):
     name = "shop"
+
+    def ready(self):
+        # 상품/카테고리/쿠폰 변경 시 카탈로그 캐시 무효화
+        from shop import signals  # noqa: F401
@@ -0,0 +1,49 @@
+"""
+데이터 마이그레이션과 관리 커맨드가 같이 쓰는 백필 함수.
+마이그레이션의 과거 모델(apps.get_model)로도 돌아야 하므로 shop.models / shop.utils를 import하지 않고
+모델 클래스를 인자로 받는다.
+"""
+
+from django.db.models import Min
+
+
+def fill_purchases(Transaction, Product, UserProductPurchase, tx_types, user_ids=None, batch_size: int = 1000) -> int:
+    """
+    기존 거래내역으로 구매 이력 채우기 (만든 행 수 반환, 여러 번 실행해도 안전)
+    - product FK가 있는 거래: 그 상품
+    - product_name만 남은 예전 거래: 같은 이름의 상품 모두 (기존 Q(product_name=...) 판정과 동일)
+    """
+    txs = Transaction.objects.filter(tx_type__in=tx_types)
+    if user_ids is not None:
+        txs = txs.filter(user_id__in=user_ids)
+
+    first_seen = {}
+    for row in txs.filter(product__isnull=False).values("user_id", "product_id").annotate(at=Min("occurred_at")):
+        first_seen[(row["user_id"], row["product_id"])] = row["at"]
+
+    legacy = (
+        txs.filter(product__isnull=True)
+        .exclude(product_name="")
+        .values("user_id", "product_name")
+        .annotate(at=Min("occurred_at"))
+    )
+    names = {}
+    for row in legacy:
+        names.setdefault(row["product_name"], []).append(row)
+    if names:
+        for product_id, name in Product.objects.filter(name__in=names).values_list("id", "name"):
+            for row in names[name]:
+                key = (row["user_id"], product_id)
+                if key not in first_seen or row["at"] < first_seen[key]:
+                    first_seen[key] = row["at"]
+
+    before = UserProductPurchase.objects.count()
+    UserProductPurchase.objects.bulk_create(
+        [
+            UserProductPurchase(user_id=user_id, product_id=product_id, first_purchased_at=at)
+            for (user_id, product_id), at in first_seen.items()
+        ],
+        ignore_conflicts=True,
+        batch_size=batch_size,
+    )
+    return UserProductPurchase.objects.count() - before
@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.utils.purchases import backfill_purchases
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "기존 거래내역(product FK 또는 product_name만 있는 예전 거래)으로 "
+        "리뷰 작성 자격용 구매 이력(UserProductPurchase)을 채웁니다. 여러 번 실행해도 안전합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="특정 사용자(username)만 처리")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["user"]:
+            user_ids = list(User.objects.filter(username=options["user"]).values_list("id", flat=True))
+            if not user_ids:
+                raise CommandError(f"사용자를 찾을 수 없습니다: {options['user']}")
+
+        created = backfill_purchases(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"구매 이력 {created}건을 추가했습니다."))
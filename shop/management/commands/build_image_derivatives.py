@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from shop.models import Product, ReviewImage
+from shop.utils.images import PRODUCT_IMAGE_FIELDS, REVIEW_IMAGE_FIELDS, ensure_derivatives
+
+
+class Command(BaseCommand):
+    help = "기존 상품/리뷰 이미지의 썸네일·WebP 파생 이미지를 원본 옆에 미리 만듭니다. (이미 있으면 건너뜀)"
+
+    def handle(self, *args, **options):
+        done = skipped = 0
+        for model, fields in ((Product, PRODUCT_IMAGE_FIELDS), (ReviewImage, REVIEW_IMAGE_FIELDS)):
+            for obj in model.objects.only("pk", *fields).iterator(chunk_size=200):
+                for name in fields:
+                    fieldfile = getattr(obj, name)
+                    if not fieldfile:
+                        continue
+                    if ensure_derivatives(fieldfile):
+                        done += 1
+                    else:
+                        skipped += 1
+        self.stdout.write(self.style.SUCCESS(f"이미지 {done}개 처리, {skipped}개 건너뜀(원본 없음/이미지 아님)"))
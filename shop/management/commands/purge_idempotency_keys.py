@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from shop.utils.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "만료된 결제/충전 멱등 키(IdempotencyKey)를 삭제합니다. (cron 등으로 주기 실행)"
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f"만료된 멱등 키 {deleted}건을 삭제했습니다."))
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.utils.ledger import rebuild_ledger, verify_ledger
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "원본 거래내역(Transaction)으로 누적/월별 집계 테이블을 재계산하거나 검증합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="특정 사용자(username)만 처리")
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="재계산하지 않고 저장된 집계와 원본 합계를 비교만 함 (불일치 시 종료코드 1)",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("id")
+        if options["user"]:
+            users = users.filter(username=options["user"])
+            if not users.exists():
+                raise CommandError(f"사용자를 찾을 수 없습니다: {options['user']}")
+
+        if options["verify"]:
+            bad = 0
+            for user in users.iterator():
+                problems = verify_ledger(user)
+                if problems:
+                    bad += 1
+                    for p in problems:
+                        self.stdout.write(self.style.WARNING(f"[{user.username}] {p}"))
+            if bad:
+                raise CommandError(f"집계 불일치 사용자 {bad}명")
+            self.stdout.write(self.style.SUCCESS("집계 테이블이 원본 거래내역과 일치합니다."))
+            return
+
+        count = 0
+        for user in users.iterator():
+            rebuild_ledger(user)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count}명의 집계 테이블을 재계산했습니다."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from shop.utils.review_stats import rebuild_review_stats
+
+
+class Command(BaseCommand):
+    help = "원본 리뷰(Review)로 상품별 리뷰 수/별점 합계/평균/분포를 다시 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--product", type=int, action="append", help="특정 상품 id만 처리 (여러 번 지정 가능)")
+
+    def handle(self, *args, **options):
+        count = rebuild_review_stats(options["product"])
+        self.stdout.write(self.style.SUCCESS(f"{count}개 상품의 리뷰 통계를 재계산했습니다."))
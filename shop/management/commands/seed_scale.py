@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.utils.synthetic import ScaleSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "성능 테스트용 대용량 데이터(사용자/계좌/배송지/카테고리/상품/쿠폰/거래)를 생성합니다. "
+        "거래는 월별 성장·계절성, 카테고리 비중, 인기 상품 쏠림을 반영하고 집계 테이블도 함께 채웁니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000, help="생성할 사용자 수 (기본 1000)")
+        parser.add_argument("--transactions", type=int, default=100_000, help="생성할 거래 수 (기본 10만)")
+        parser.add_argument("--products", type=int, default=500, help="생성할 상품 수 (기본 500)")
+        parser.add_argument("--coupons", type=int, default=30, help="생성할 쿠폰 종류 수 (기본 30)")
+        parser.add_argument("--months", type=int, default=24, help="거래 기간(최근 N개월, 기본 24)")
+        parser.add_argument("--batch-size", type=int, default=20000, help="한 번에 INSERT/커밋하는 행 수 (기본 2만)")
+        parser.add_argument("--prefix", default="seed", help="사용자 이름/쿠폰 코드 접두어 (다시 실행할 때는 바꿔서)")
+        parser.add_argument("--seed", type=int, default=None, help="난수 시드 (같은 값이면 같은 데이터)")
+        parser.add_argument("--password", default="pass12345", help="생성 사용자 공통 비밀번호")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(stage, done, total):
+            elapsed = time.perf_counter() - started
+            rate = done / elapsed if elapsed else 0
+            self.stdout.write(f"  {stage}: {done:,}/{total:,} ({rate:,.0f}건/초, {elapsed:.1f}초)")
+
+        try:
+            seeder = ScaleSeeder(
+                users=options["users"],
+                transactions=options["transactions"],
+                products=options["products"],
+                coupons=options["coupons"],
+                months=options["months"],
+                prefix=options["prefix"],
+                batch_size=options["batch_size"],
+                seed=options["seed"],
+                password=options["password"],
+                progress=progress if options["verbosity"] >= 1 else None,
+            )
+            stats = seeder.run()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        summary = ", ".join(f"{name} {count:,}" for name, count in stats.items())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"생성 완료 ({elapsed:.1f}초): {summary}"))
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-17 16:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_address_receiver_name'),
+        ('shop', '0004_coupon_transaction_discount_amount_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserLedgerSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_in', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='누적 입금')),
+                ('total_out', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='누적 출금')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LedgerMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('total_in', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='월 입금')),
+                ('total_out', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='월 출금')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_rollups', to='account.account')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'account', 'month'), name='uniq_ledger_rollup_user_account_month')],
+            },
+        ),
+    ]
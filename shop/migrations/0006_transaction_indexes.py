@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-17 16:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_address_receiver_name'),
+        ('shop', '0005_ledger_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'tx_type', '-occurred_at'], name='tx_user_type_occurred_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', '-occurred_at'], name='tx_user_occurred_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('receipt_hidden', False), ('tx_type', 'OUT')), fields=['user', '-occurred_at', '-id'], name='tx_user_receipts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'product'], name='tx_user_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'product_name'], name='tx_user_product_name_idx'),
+        ),
+    ]
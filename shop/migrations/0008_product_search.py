@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-17 18:02
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def backfill_search_text(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    products = list(Product.objects.select_related("category"))
+    for p in products:
+        parts = [p.name, p.category.name, p.description, p.description_text1, p.description_text2]
+        raw = " ".join(x for x in parts if x)
+        p.search_text = " ".join(unicodedata.normalize("NFKC", raw).lower().split())
+    Product.objects.bulk_update(products, ["search_text"], batch_size=500)
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm GIN 인덱스는 PostgreSQL 전용 (SQLite 등에서는 LIKE 풀스캔 그대로)
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS product_search_trgm_idx "
+        "ON shop_product USING gin (search_text gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS product_search_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0007_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:46
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_review_stats(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    Review = apps.get_model("shop", "Review")
+    histogram = {f"r{r}": Count("id", filter=Q(rating=r)) for r in range(1, 6)}
+    rows = Review.objects.values("product_id").annotate(count=Count("id"), total=Sum("rating"), **histogram)
+    for row in rows:
+        Product.objects.filter(pk=row["product_id"]).update(
+            review_count=row["count"],
+            rating_sum=row["total"],
+            rating_avg=(Decimal(row["total"]) / row["count"]).quantize(Decimal("0.01")),
+            **{f"rating_{r}": row[f"r{r}"] for r in range(1, 6)},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-rating_avg', '-review_count', '-id'], name='product_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-review_count', '-id'], name='product_review_count_idx'),
+        ),
+        migrations.RunPython(backfill_review_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-17 17:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0009_product_review_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProductPurchase',
+            fields=[
+                ('pk', models.CompositePrimaryKey('user', 'product', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('first_purchased_at', models.DateTimeField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to='shop.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_purchases', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Case, DateField, DecimalField, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+# shop.utils.tx_query.IN_TYPES / OUT_TYPES 의 이 시점 값 (마이그레이션은 앱 코드를 import하지 않는다)
+IN_TYPES = ("IN", "income")
+OUT_TYPES = ("OUT", "buy")
+
+
+def backfill_ledger(apps, schema_editor):
+    """
+    기존 거래내역으로 월별 집계 / 누적 합계를 채운다 (거래가 없는 사용자도 0 합계 행 생성).
+    조회 경로에서 집계를 다시 만들지 않으므로, 배포 시 한 번 채워 둬야 한다.
+    """
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Transaction = apps.get_model("shop", "Transaction")
+    LedgerMonthlyRollup = apps.get_model("shop", "LedgerMonthlyRollup")
+    UserLedgerSummary = apps.get_model("shop", "UserLedgerSummary")
+
+    LedgerMonthlyRollup.objects.all().delete()
+    UserLedgerSummary.objects.all().delete()
+
+    rows = (
+        Transaction.objects.annotate(m=TruncMonth("occurred_at", output_field=DateField()))
+        .values("user_id", "account_id", "m")
+        .annotate(
+            _in=Sum(Case(When(tx_type__in=IN_TYPES, then="amount"), default=Value(0), output_field=DecimalField())),
+            _out=Sum(Case(When(tx_type__in=OUT_TYPES, then="amount"), default=Value(0), output_field=DecimalField())),
+        )
+        .order_by("user_id", "account_id", "m")
+    )
+
+    totals = {}
+    rollups = []
+    for r in rows.iterator(chunk_size=2000):
+        rollups.append(
+            LedgerMonthlyRollup(
+                user_id=r["user_id"],
+                account_id=r["account_id"],
+                month=r["m"],
+                total_in=r["_in"] or 0,
+                total_out=r["_out"] or 0,
+            )
+        )
+        t = totals.setdefault(r["user_id"], [Decimal("0"), Decimal("0")])
+        t[0] += r["_in"] or 0
+        t[1] += r["_out"] or 0
+        if len(rollups) >= 2000:
+            LedgerMonthlyRollup.objects.bulk_create(rollups)
+            rollups = []
+    LedgerMonthlyRollup.objects.bulk_create(rollups)
+
+    summaries = []
+    for user_id in User.objects.values_list("pk", flat=True).iterator(chunk_size=2000):
+        total_in, total_out = totals.get(user_id, (0, 0))
+        summaries.append(UserLedgerSummary(user_id=user_id, total_in=total_in, total_out=total_out))
+        if len(summaries) >= 2000:
+            UserLedgerSummary.objects.bulk_create(summaries)
+            summaries = []
+    UserLedgerSummary.objects.bulk_create(summaries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_user_product_purchase'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+from shop.backfills import fill_purchases
+
+# shop.utils.purchases.PURCHASE_TX_TYPES 의 이 시점 값 (마이그레이션은 앱 코드를 import하지 않는다)
+PURCHASE_TX_TYPES = ("OUT", "buy")
+
+
+def backfill_purchases(apps, schema_editor):
+    """
+    기존 거래내역으로 리뷰 작성 자격용 구매 이력을 채운다 (backfill_purchases 커맨드와 같은 함수).
+    리뷰 자격은 UserProductPurchase만 보므로, 배포 시 한 번 채워 둬야 기존 구매자가 리뷰를 쓸 수 있다.
+    """
+    fill_purchases(
+        apps.get_model("shop", "Transaction"),
+        apps.get_model("shop", "Product"),
+        apps.get_model("shop", "UserProductPurchase"),
+        PURCHASE_TX_TYPES,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0011_backfill_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_purchases, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 import re
+import unicodedata
 from django.conf import settings
 from django.core.validators import MinValueValidator,MaxValueValidator
 from django.db import models
@@ -6,6 +7,7 @@ from account.models import Account
 import uuid
 import os
 from django.utils import timezone
+from django.utils.functional import cached_property
 
 # 회원가입 간 입력할 대부분의 정보
 class Category(models.Model):
@@ -28,12 +30,35 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        renamed = bool(self.pk) and not Category.objects.filter(pk=self.pk, name=self.name).exists()
+        super().save(*args, **kwargs)
+        if renamed:
+            # 카테고리 이름도 상품 검색 대상이므로 소속 상품의 search_text 갱신
+            products = list(self.products.all())
+            for product in products:
+                product.category = self
+                product.search_text = product.build_search_text()
+            Product.objects.bulk_update(products, ["search_text"], batch_size=500)
+
+
+def normalize_search_text(value: str) -> str:
+    """검색용 정규화: NFKC(전각/반각 통일) + 소문자 + 공백 하나로"""
+    return " ".join(unicodedata.normalize("NFKC", value or "").lower().split())
+
+
 def product_image_upload_to(instance, filename):
     return f"products/{instance.pk}/{filename}"
 
 def product_detail_image_upload_to(instance, filename):
     return f"products/desc/{instance.pk}/{filename}"
 
+# 리뷰 통계 컬럼 (shop.utils.review_stats만 갱신, ProductAdmin은 저장할 때 제외)
+REVIEW_STAT_FIELDS = (
+    "review_count", "rating_sum", "rating_avg", "rating_1", "rating_2", "rating_3", "rating_4", "rating_5",
+)
+
+
 class Product(models.Model):
     category = models.ForeignKey(
         Category, on_delete=models.CASCADE, related_name="products"
@@ -61,9 +86,47 @@ class Product(models.Model):
         upload_to=product_detail_image_upload_to, blank=True, null=True
     )
 
+    # 검색용 비정규화 컬럼: 상품명 + 카테고리명 + 설명들 (정규화된 소문자 텍스트)
+    # PostgreSQL에서는 pg_trgm GIN 인덱스로 LIKE '%검색어%'를 인덱스 스캔 (shop.utils.search)
+    search_text = models.TextField(blank=True, default="", editable=False)
+
+    # --- [리뷰 통계 (비정규화)] ---
+    # 리뷰 작성/수정/삭제 시 shop.utils.review_stats가 F() 조건 UPDATE로 같이 갱신
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_avg = models.DecimalField(max_digits=3, decimal_places=2, default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # 상품 목록 "별점 높은 순" / "리뷰 많은 순" 정렬용
+        indexes = [
+            models.Index(fields=["-rating_avg", "-review_count", "-id"], name="product_rating_idx"),
+            models.Index(fields=["-review_count", "-id"], name="product_review_count_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
+    @property
+    def rating_histogram(self) -> dict:
+        """{5: n, 4: n, ..., 1: n} (별점 높은 순)"""
+        return {r: getattr(self, f"rating_{r}") for r in range(5, 0, -1)}
+
+    def build_search_text(self) -> str:
+        parts = [self.name, self.category.name, self.description, self.description_text1, self.description_text2]
+        return normalize_search_text(" ".join(p for p in parts if p))
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "search_text" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "search_text"]
+        super().save(*args, **kwargs)
+
 
 class Cart(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -79,6 +142,10 @@ class Cart(models.Model):
     # 언제 담았는지 장바구니 생성시 생성 날짜를 적어줌
 
     def total_price(self):
+        # cart_repo.cart_lines()에서 SQL로 계산해 둔 line_total이 있으면 그대로 사용
+        line_total = getattr(self, "line_total", None)
+        if line_total is not None:
+            return line_total
         # 상품 개당 가격 * 장바구니 수량 곱해서 반환
         return self.product.price * self.quantity
 
@@ -153,6 +220,24 @@ class Transaction(models.Model):
         'UserCoupon', null=True, blank=True, on_delete=models.SET_NULL, verbose_name="사용된 쿠폰"
     )
 
+    class Meta:
+        # 목록/영수증/구매여부 조회가 모두 user로 시작하므로 user를 선두 컬럼으로 둔 복합 인덱스
+        indexes = [
+            # 거래내역 입금/출금 탭: user + tx_type + 기간, -occurred_at 정렬
+            models.Index(fields=["user", "tx_type", "-occurred_at"], name="tx_user_type_occurred_idx"),
+            # 거래내역 전체/요약, 집계 재계산: user + 기간
+            models.Index(fields=["user", "-occurred_at"], name="tx_user_occurred_idx"),
+            # 마이페이지 영수증 탭: 숨김되지 않은 출금만 (부분 인덱스)
+            models.Index(
+                fields=["user", "-occurred_at", "-id"],
+                name="tx_user_receipts_idx",
+                condition=models.Q(tx_type="OUT", receipt_hidden=False),
+            ),
+            # 상품 상세 구매여부: Q(product=...) | Q(product_name=...) 양쪽 모두 인덱스 사용
+            models.Index(fields=["user", "product"], name="tx_user_product_idx"),
+            models.Index(fields=["user", "product_name"], name="tx_user_product_name_idx"),
+        ]
+
     def clean(self):
         # **무결성 핵심: 거래 user와 계좌 user 일치 강제**
         if self.account_id and self.user_id and self.account.user_id != self.user_id:
@@ -193,6 +278,11 @@ class Review(models.Model):
 
     def __str__(self):
         return f"{self.user.username}의 리뷰 - {self.product.name} ({self.rating}점)"
+
+    @cached_property
+    def image_list(self):
+        """템플릿용 리뷰 이미지 목록 (prefetch 결과 재사용, 캐시에서 복원한 리뷰는 미리 채워 둠)"""
+        return list(self.images.all())
 # 현재 이 상태에서 product(Product FK), quantity(주문량)등의 정보가 더 필요할 것.
 
 def review_image_upload_to(instance, filename):
@@ -266,3 +356,102 @@ class UserCoupon(models.Model):
     def is_valid(self):
         now = timezone.now()
         return not self.is_used and self.coupon.active and self.coupon.valid_from <= now <= self.coupon.valid_to
+
+
+# 거래내역(Transaction) 누적 합계를 미리 계산해 두는 집계 테이블
+# - 마이페이지/컨설팅/거래내역 요약에서 전체 거래를 매번 Sum() 하지 않도록
+# - 결제/충전/회원가입 뷰의 transaction.atomic() 안에서 shop.utils.ledger로 갱신
+# - 어긋났을 때는 `python manage.py rebuild_ledger`로 원본 거래에서 재계산
+class UserLedgerSummary(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="ledger_summary"
+    )
+    total_in = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="누적 입금")
+    total_out = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="누적 출금")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user} | IN {self.total_in} / OUT {self.total_out}"
+
+
+class UserProductPurchase(models.Model):
+    """
+    (사용자, 상품) 구매 이력 - 리뷰 작성 자격 확인용.
+    결제 시 shop.utils.purchases.record_purchases로 같이 기록하고,
+    product_name만 남은 예전 거래는 backfill_purchases 커맨드로 채운다.
+    (user, product) 복합 기본키라서 "산 적 있나?"는 기본키 조회 한 번
+    """
+    pk = models.CompositePrimaryKey("user", "product")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="product_purchases"
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="purchases")
+    first_purchased_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user} | {self.product}"
+
+
+class LedgerMonthlyRollup(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="ledger_rollups"
+    )
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="ledger_rollups"
+    )
+    # 해당 월 1일 (Asia/Seoul 기준)
+    month = models.DateField()
+    total_in = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="월 입금")
+    total_out = models.DecimalField(max_digits=14, decimal_places=0, default=0, verbose_name="월 출금")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "account", "month"],
+                name="uniq_ledger_rollup_user_account_month",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} | {self.account_id} | {self.month:%Y-%m}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    결제/충전 POST의 중복 제출 방지용 키.
+    - 같은 (user, scope, key)로 다시 들어온 요청은 뷰를 실행하지 않고 처음 응답(리다이렉트 + 메시지)을 재생한다.
+    - expires_at이 지난 행은 purge_idempotency_keys 커맨드로 정리한다.
+    """
+    PENDING = "pending"
+    DONE = "done"
+    STATUS_CHOICES = [(PENDING, "처리 중"), (DONE, "완료")]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys"
+    )
+    scope = models.CharField(max_length=50)  # 엔드포인트 구분 (order_execute, direct_purchase, charge_balance)
+    key = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)  # 같은 키로 다른 내용을 보냈는지 확인용
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+
+    # 재생할 응답
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_location = models.CharField(max_length=500, blank=True)
+    response_messages = models.JSONField(default=list, blank=True)  # [[level, message, extra_tags], ...]
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "scope", "key"],
+                name="uniq_idempotency_user_scope_key",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="idempotency_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} | {self.scope} | {self.key} ({self.status})"
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from shop.models import Category, Coupon, Product, Review, ReviewImage, UserLedgerSummary
+from shop.utils.catalog import bump_catalog_version
+from shop.utils.images import PRODUCT_IMAGE_FIELDS, REVIEW_IMAGE_FIELDS, derivatives_on_upload, ensure_derivatives
+from shop.utils.review_feed import bump_review_feed
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_catalog_cache(sender, **kwargs):
+    """어드민 등에서 카탈로그가 바뀌면 캐시 버전 증가"""
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=get_user_model())
+def create_ledger_summary(sender, instance, created, raw=False, **kwargs):
+    """회원 생성 시 누적 합계 행을 0으로 만들어 둔다 (첫 결제/충전에서 행 생성 경합이 없도록)"""
+    if created and not raw:
+        UserLedgerSummary.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_feed(sender, instance, **kwargs):
+    """
+    리뷰 작성/수정/삭제 -> 상품 상세 리뷰 첫 페이지 캐시 무효화 (커밋 후)
+    (리뷰 이미지 추가/삭제도 뷰·어드민 모두 리뷰를 같이 저장하므로 여기서 함께 처리됨)
+    """
+    product_id = instance.product_id
+    transaction.on_commit(lambda: bump_review_feed(product_id))
+
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=ReviewImage)
+def build_image_derivatives(sender, instance, **kwargs):
+    """업로드된 상품/리뷰 이미지의 썸네일·WebP를 커밋 후 생성 (이미 있으면 건너뜀)"""
+    if not derivatives_on_upload():
+        return
+    fields = PRODUCT_IMAGE_FIELDS if sender is Product else REVIEW_IMAGE_FIELDS
+    files = [getattr(instance, name) for name in fields if getattr(instance, name)]
+    if files:
+        transaction.on_commit(lambda: [ensure_derivatives(f) for f in files])
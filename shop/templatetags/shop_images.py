@@ -0,0 +1,43 @@
+from django import template
+
+from shop.utils.images import image_srcset as _image_srcset
+from shop.utils.images import thumbnail_url as _thumbnail_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(fieldfile, fmt="webp"):
+    """{% image_srcset product.image1 %} -> 'url 320w, url 640w, ...' (없으면 '')"""
+    if not fieldfile:
+        return ""
+    return _image_srcset(fieldfile, fmt)
+
+
+@register.simple_tag
+def thumbnail_url(fieldfile, width=640):
+    """{% thumbnail_url product.image1 320 %} -> 가로 width 이상인 가장 작은 썸네일 URL"""
+    if not fieldfile:
+        return ""
+    return _thumbnail_url(fieldfile, int(width))
+
+
+@register.inclusion_tag("shop/tags/responsive_image.html")
+def responsive_image(fieldfile, sizes="100vw", css_class="", alt="", width=640, loading="lazy"):
+    """
+    <picture>: WebP srcset + 원본 형식 썸네일 srcset, 지연 로딩
+        {% responsive_image product.image1 sizes="(max-width: 768px) 50vw, 25vw" alt=product.name %}
+    파생 이미지를 만들 수 없으면(원본 없음 등) 원본 <img> 한 장
+    첫 화면의 큰 이미지는 loading="eager"
+    """
+    webp = _image_srcset(fieldfile, "webp") if fieldfile else ""
+    return {
+        "original": fieldfile.url if fieldfile else "",
+        "src": _thumbnail_url(fieldfile, int(width)) if webp else (fieldfile.url if fieldfile else ""),
+        "webp_srcset": webp,
+        "srcset": _image_srcset(fieldfile, "fallback") if webp else "",
+        "sizes": sizes,
+        "css_class": css_class,
+        "alt": alt,
+        "loading": loading,
+    }
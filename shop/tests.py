@@ -1,18 +1,51 @@
 from __future__ import annotations
 
+import csv
+import json
+import os
+import re
+import shutil
 import tempfile
-from datetime import timedelta
+import threading
+import zipfile
+from datetime import date, timedelta
 from decimal import Decimal
-from io import BytesIO
+from io import BytesIO, StringIO
+from unittest import mock
+from xml.etree import ElementTree
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.db.models import Sum
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from account.models import Account, Address, Bank
-from shop.models import Cart, Category, Coupon, Product, Transaction, UserCoupon
+from accountbook.middleware import QueryRecorder
+from shop.models import (
+    Cart,
+    Category,
+    Coupon,
+    IdempotencyKey,
+    LedgerMonthlyRollup,
+    Product,
+    Review,
+    ReviewImage,
+    Transaction,
+    UserCoupon,
+    UserLedgerSummary,
+    UserProductPurchase,
+)
+from shop.utils.ledger import get_ledger_summary, rebuild_ledger, verify_ledger
+from shop.utils.purchases import backfill_purchases, record_purchases
+from shop.utils.review_stats import rebuild_review_stats
+from shop.utils.tx_summary import day_range, day_start, month_bounds
 
 
 User = get_user_model()
@@ -152,6 +185,13 @@ class ShopViewsAndModelsTests(TestCase):
         self.assertEqual(tx.amount, Decimal("18000"))
         self.assertEqual(tx.used_coupon_id, user_coupon.id)
 
+        # 누적 집계 테이블도 같은 트랜잭션에서 갱신
+        self.assertEqual(UserLedgerSummary.objects.get(user=self.user).total_out, Decimal("18000"))
+        self.assertEqual(verify_ledger(self.user), [])
+
+        # 리뷰 작성 자격용 구매 이력
+        self.assertTrue(UserProductPurchase.objects.filter(pk=(self.user.pk, self.product.pk)).exists())
+
     def test_coupon_code_is_uppercased_on_save(self):
         c = Coupon.objects.create(
             name="welcome",
@@ -165,3 +205,1298 @@ class ShopViewsAndModelsTests(TestCase):
         )
         c.refresh_from_db()
         self.assertEqual(c.code, "WELCOME2026")
+
+
+class LedgerSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="구매자",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="1111",
+            balance=Decimal("0"),
+            is_default=True,
+        )
+        self.client.login(username="buyer", password="pass12345")
+
+    def test_charge_updates_summary_and_monthly_rollup(self):
+        self.client.post(reverse("charge_balance"), {"amount": "3000", "account_id": self.account.id})
+        self.client.post(reverse("charge_balance"), {"amount": "2000", "account_id": self.account.id})
+
+        summary = UserLedgerSummary.objects.get(user=self.user)
+        self.assertEqual(summary.total_in, Decimal("5000"))
+        self.assertEqual(summary.total_out, Decimal("0"))
+
+        rollup = LedgerMonthlyRollup.objects.get(user=self.user, account=self.account)
+        self.assertEqual(rollup.month, timezone.localdate().replace(day=1))
+        self.assertEqual(rollup.total_in, Decimal("5000"))
+        self.assertEqual(verify_ledger(self.user), [])
+
+    def test_rebuild_command_fixes_drift(self):
+        Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type=Transaction.OUT,
+            amount=Decimal("700"),
+            occurred_at=timezone.now(),
+        )
+        # 증분 갱신 없이 만든 거래 -> 집계에 반영되지 않음 (조회 경로에서 재계산하지 않는다)
+        self.assertEqual(get_ledger_summary(self.user).total_out, Decimal("0"))
+        self.assertNotEqual(verify_ledger(self.user), [])
+        with self.assertRaises(CommandError):
+            call_command("rebuild_ledger", "--verify", stdout=StringIO())
+
+        call_command("rebuild_ledger", stdout=StringIO())
+        self.assertEqual(verify_ledger(self.user), [])
+        self.assertEqual(get_ledger_summary(self.user).total_out, Decimal("700"))
+
+    def test_summary_row_created_with_user(self):
+        summary = UserLedgerSummary.objects.get(user=self.user)
+        self.assertEqual((summary.total_in, summary.total_out), (Decimal("0"), Decimal("0")))
+
+    def test_reads_do_not_write_ledger_tables(self):
+        UserLedgerSummary.objects.filter(user=self.user).delete()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get(reverse("mypage")).status_code, 200)
+            self.client.get(reverse("product_consulting_list"))
+        writes = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))
+            and ("shop_ledgermonthlyrollup" in q["sql"] or "shop_userledgersummary" in q["sql"])
+        ]
+        self.assertEqual(writes, [])
+
+    def test_admin_moving_or_deleting_keeps_both_users_in_sync(self):
+        from django.contrib.admin.sites import site
+
+        other = User.objects.create_user(username="other", password="pass12345")
+        other_account = Account.objects.create(
+            user=other, name="다른", phone="01012345678", bank=self.bank, account_number="2222", is_default=True
+        )
+        self.client.post(reverse("charge_balance"), {"amount": "3000", "account_id": self.account.id})
+        tx = Transaction.objects.get(user=self.user)
+
+        # 관리자에서 거래를 다른 사용자 계좌로 옮기면 이전 사용자 집계에서도 빠진다
+        tx.user, tx.account = other, other_account
+        site._registry[Transaction].save_model(None, tx, None, True)
+        self.assertEqual(get_ledger_summary(self.user).total_in, Decimal("0"))
+        self.assertEqual(get_ledger_summary(other).total_in, Decimal("3000"))
+
+        # 관리자에서 계좌를 지우면 CASCADE로 지워진 거래만큼 누적 합계도 줄어든다
+        site._registry[Account].delete_queryset(None, Account.objects.filter(pk=other_account.pk))
+        self.assertEqual(get_ledger_summary(other).total_in, Decimal("0"))
+        self.assertEqual(verify_ledger(self.user) + verify_ledger(other), [])
+
+    def test_first_write_without_summary_row_creates_it(self):
+        UserLedgerSummary.objects.filter(user=self.user).delete()
+        self.client.post(reverse("charge_balance"), {"amount": "3000", "account_id": self.account.id})
+        self.assertEqual(UserLedgerSummary.objects.get(user=self.user).total_in, Decimal("3000"))
+        self.assertEqual(verify_ledger(self.user), [])
+
+
+class OccurredRangeFilterTests(TestCase):
+    """기간 필터가 Asia/Seoul 기준 [start, end) 로 동작하는지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="구매자",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="1111",
+            is_default=True,
+        )
+
+    def _tx(self, occurred_at, amount="1000"):
+        return Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            tx_type=Transaction.IN,
+            amount=Decimal(amount),
+            occurred_at=occurred_at,
+        )
+
+    def test_day_range_is_half_open_in_local_time(self):
+        start, end = day_range("2026-03-01", "2026-03-31")
+        self.assertEqual(timezone.localtime(start).isoformat(), "2026-03-01T00:00:00+09:00")
+        self.assertEqual(timezone.localtime(end).isoformat(), "2026-04-01T00:00:00+09:00")
+        self.assertEqual(day_range("", "not-a-date"), (None, None))
+
+    def test_month_bounds_open_ends(self):
+        self.assertEqual(month_bounds("2026-11", "2026-12"), (date(2026, 11, 1), date(2027, 1, 1)))
+        self.assertEqual(month_bounds("2026-11", ""), (date(2026, 11, 1), None))
+        self.assertEqual(month_bounds("", "2026-02"), (None, date(2026, 3, 1)))
+
+    def test_history_filter_uses_local_day_boundaries(self):
+        # KST 3/1 00:30 (= UTC 2/28 15:30) 은 3월 거래, KST 4/1 00:00 은 제외
+        inside = self._tx(day_start(date(2026, 3, 1)) + timedelta(minutes=30))
+        self._tx(day_start(date(2026, 4, 1)))
+        self._tx(day_start(date(2026, 3, 1)) - timedelta(seconds=1))
+
+        self.client.login(username="buyer", password="pass12345")
+        resp = self.client.get(
+            reverse("transaction_history"),
+            {"tab": "in", "start_date": "2026-03-01", "end_date": "2026-03-31"},
+        )
+        self.assertEqual([tx.id for tx in resp.context["transactions"]], [inside.id])
+
+
+class ConsultingBudgetQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="구매자",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="1111",
+            is_default=True,
+        )
+        self.client.login(username="buyer", password="pass12345")
+        for amount in ("500000", "300000"):
+            self.client.post(reverse("charge_balance"), {"amount": amount, "account_id": self.account.id})
+        self.category = Category.objects.create(name="식료품")
+        for i in range(3):
+            Product.objects.create(
+                category=self.category, name=f"상품{i}", price=Decimal("1000"), stock=5, image1="p.png"
+            )
+
+    def test_consulting_page_runs_single_ledger_aggregate(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("product_consulting_list"))
+        self.assertEqual(resp.status_code, 200)
+
+        snapshot = resp.context["budget_snapshot"]
+        self.assertEqual(snapshot.total_in, Decimal("800000"))
+        self.assertEqual(snapshot.month_in, Decimal("800000"))
+        self.assertEqual(resp.context["recommended_budget"], snapshot.recommended_budget)
+
+        ledger_queries = [
+            q["sql"] for q in ctx.captured_queries
+            if "shop_transaction" in q["sql"] or "shop_ledgermonthlyrollup" in q["sql"]
+        ]
+        self.assertEqual(len(ledger_queries), 1)
+        self.assertLessEqual(len(ctx.captured_queries), 10)
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        food = Category.objects.create(name="식료품")
+        self.clean = Category.objects.create(name="청소용품")
+        self.apple = Product.objects.create(
+            category=food, name="청송 사과", price=Decimal("3000"), stock=5, image1="p.png"
+        )
+        self.juice = Product.objects.create(
+            category=food,
+            name="주스",
+            price=Decimal("2000"),
+            stock=5,
+            image1="p.png",
+            description_text1="국산 사과를 착즙했습니다",
+        )
+        self.mop = Product.objects.create(
+            category=self.clean, name="Super MOP", price=Decimal("9000"), stock=5, image1="p.png"
+        )
+
+    def _names(self, **params):
+        resp = self.client.get(reverse("product_list"), params)
+        self.assertEqual(resp.status_code, 200)
+        return [p.name for p in resp.context["products"]]
+
+    def test_search_matches_descriptions_and_ranks_name_first(self):
+        # 상품명에 있는 쪽이 설명에만 있는 쪽보다 먼저 (id는 주스가 더 최신)
+        self.assertEqual(self._names(search="사과"), ["청송 사과", "주스"])
+        self.assertEqual(self._names(search="사과", sort="price_low"), ["주스", "청송 사과"])
+        self.assertEqual(self._names(search="착즙 국산"), ["주스"])
+
+    def test_search_matches_category_name_and_is_case_insensitive(self):
+        self.assertEqual(self._names(search="청소"), ["Super MOP"])
+        self.assertEqual(self._names(search="ｍｏｐ"), ["Super MOP"])  # 전각 입력도 정규화
+
+    def test_search_text_follows_product_and_category_edits(self):
+        self.mop.description = "극세사 걸레"
+        self.mop.save(update_fields=["description"])
+        self.assertEqual(self._names(search="극세사"), ["Super MOP"])
+
+        self.clean.name = "생활용품"
+        self.clean.save()
+        self.assertEqual(self._names(search="생활"), ["Super MOP"])
+        self.assertEqual(self._names(search="청소"), [])
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="식료품")
+        for i in range(10):
+            Product.objects.create(
+                category=self.category, name=f"상품{i}", price=Decimal(1000 + i), stock=5, image1="p.png"
+            )
+        Coupon.objects.create(
+            name="배너", code="BANNER", discount_value=1000, valid_to=timezone.now() + timedelta(days=1)
+        )
+
+    def _get(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("product_list"), params)
+        self.assertEqual(resp.status_code, 200)
+        return resp, [q["sql"] for q in ctx.captured_queries]
+
+    def test_warm_list_page_only_loads_product_rows(self):
+        cold, cold_sql = self._get(page=2, sort="price_low")
+        warm, warm_sql = self._get(page=2, sort="price_low")
+
+        self.assertEqual([p.name for p in warm.context["products"]], ["상품8", "상품9"])
+        self.assertEqual(warm.context["page_obj"].paginator.num_pages, 2)
+        self.assertEqual(len(warm.context["display_coupon"]), 1)
+        self.assertGreater(len(cold_sql), len(warm_sql))
+        self.assertEqual(len(warm_sql), 1)
+        self.assertIn("shop_product", warm_sql[0])
+
+    def test_catalog_edits_bump_version(self):
+        self._get()
+        Product.objects.filter(name="상품9").get().delete()
+        resp, _ = self._get(sort="price_high")
+        self.assertEqual(resp.context["products"][0].name, "상품8")
+
+        Category.objects.create(name="청소용품")
+        resp, _ = self._get()
+        self.assertEqual(len(resp.context["categories"]), 2)
+
+        Coupon.objects.update(active=False)  # update()는 시그널이 없으므로 다음 save 전까지 유지
+        Coupon.objects.get().save()
+        resp, _ = self._get()
+        self.assertEqual(resp.context["display_coupon"], [])
+
+    def test_out_of_range_page_is_404(self):
+        resp = self.client.get(reverse("product_list"), {"page": 9})
+        self.assertEqual(resp.status_code, 404)
+        resp = self.client.get(reverse("product_list"), {"page": "last"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.context["page_obj"].number, 2)
+
+
+class ReviewStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="식료품")
+        self.product = Product.objects.create(
+            category=self.category, name="사과", price=Decimal("1000"), stock=5, image1="p.png"
+        )
+        self.other = Product.objects.create(
+            category=self.category, name="배", price=Decimal("1000"), stock=5, image1="p.png"
+        )
+        bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.users = []
+        for i in range(3):
+            user = User.objects.create_user(username=f"r{i}", password="pass12345")
+            account = Account.objects.create(
+                user=user, name=f"r{i}", phone="01012345678", bank=bank, account_number=f"100{i}", is_default=True
+            )
+            Transaction.objects.create(
+                user=user, account=account, tx_type=Transaction.OUT, amount=Decimal("1000"),
+                occurred_at=timezone.now(), product=self.product, product_name="사과",
+            )
+            self.users.append(user)
+        backfill_purchases()
+
+    def _review(self, user, rating):
+        self.client.force_login(user)
+        self.client.post(reverse("review_create", args=[self.product.id]), {"rating": rating, "content": "맛있어요"})
+        return Review.objects.filter(user=user).last()
+
+    def _stats(self):
+        self.product.refresh_from_db()
+        return self.product.review_count, self.product.rating_sum, self.product.rating_avg
+
+    def test_create_update_delete_keep_stats_in_sync(self):
+        first = self._review(self.users[0], 5)
+        self._review(self.users[1], 4)
+        self._review(self.users[2], 4)
+        self.assertEqual(self._stats(), (3, 13, Decimal("4.33")))
+        self.assertEqual(self.product.rating_histogram, {5: 1, 4: 2, 3: 0, 2: 0, 1: 0})
+
+        self.client.force_login(self.users[0])
+        self.client.post(reverse("review_update", args=[first.id]), {"rating": 1, "content": "변심"})
+        self.assertEqual(self._stats(), (3, 9, Decimal("3.00")))
+        self.assertEqual(self.product.rating_1, 1)
+        self.assertEqual(self.product.rating_5, 0)
+
+        for user in self.users:
+            self.client.force_login(user)
+            review_id = Review.objects.get(user=user).id
+            self.client.post(reverse("review_delete", args=[review_id]))
+        self.assertEqual(self._stats(), (0, 0, Decimal("0")))
+
+        # 이미 지운 리뷰를 다시 지워도 통계는 두 번 차감되지 않음
+        resp = self.client.post(reverse("review_delete", args=[review_id]))
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(self._stats(), (0, 0, Decimal("0")))
+
+        # 잘못된 별점은 저장하지 않음
+        self._review(self.users[0], 9)
+        self.assertFalse(Review.objects.exists())
+
+    def test_detail_page_uses_stored_stats(self):
+        self._review(self.users[0], 5)
+        self._review(self.users[1], 2)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("product_detail", args=[self.product.id]))
+        self.assertEqual(resp.context["average_rating"], Decimal("3.5"))
+        self.assertFalse(any("AVG(" in q["sql"].upper() for q in ctx.captured_queries))
+
+    def test_sort_by_rating_and_review_count(self):
+        self._review(self.users[0], 3)
+        self._review(self.users[1], 3)
+        Review.objects.create(product=self.other, user=self.users[2], rating=5, content="좋아요")
+        rebuild_review_stats([self.other.id])
+
+        resp = self.client.get(reverse("product_list"), {"sort": "rating"})
+        self.assertEqual([p.name for p in resp.context["products"]], ["배", "사과"])
+        resp = self.client.get(reverse("product_list"), {"sort": "reviews"})
+        self.assertEqual([p.name for p in resp.context["products"]], ["사과", "배"])
+
+    def test_admin_save_does_not_overwrite_stats(self):
+        from django.contrib.admin.sites import site
+
+        stale = Product.objects.get(pk=self.product.pk)
+        self._review(self.users[0], 5)
+        stale.price = Decimal("2000")
+        site._registry[Product].save_model(None, stale, None, True)
+        self.assertEqual(self._stats(), (1, 5, Decimal("5.00")))
+        self.assertEqual(self.product.price, Decimal("2000"))
+
+    def test_plain_save_keeps_default_model_semantics(self):
+        # Product.save()는 search_text만 덧붙이고 나머지는 Django 기본 동작 그대로
+        self.product.review_count = 7
+        self.product.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.review_count, 7)
+
+
+class PurchaseEligibilityTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="식료품")
+        self.product = Product.objects.create(
+            category=self.category, name="사과", price=Decimal("1000"), stock=5, image1="p.png"
+        )
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user, name="구매자", phone="01012345678", bank=bank, account_number="1111", is_default=True
+        )
+
+    def _tx(self, when, **kwargs):
+        return Transaction.objects.create(
+            user=self.user, account=self.account, tx_type=Transaction.OUT, amount=Decimal("1000"),
+            occurred_at=when, **kwargs,
+        )
+
+    def test_backfill_covers_legacy_name_only_rows(self):
+        now = timezone.now()
+        self._tx(now, product_name="사과")
+        self._tx(now - timedelta(days=3), product_name="사과")
+        self._tx(now, product_name="없어진 상품")
+
+        out = StringIO()
+        call_command("backfill_purchases", stdout=out)
+        self.assertIn("1건", out.getvalue())
+        purchase = UserProductPurchase.objects.get()
+        self.assertEqual(purchase.product_id, self.product.id)
+        self.assertEqual(purchase.first_purchased_at, now - timedelta(days=3))
+
+        call_command("backfill_purchases", stdout=out)  # 다시 실행해도 중복 없음
+        self.assertEqual(UserProductPurchase.objects.count(), 1)
+
+    def test_detail_page_checks_eligibility_without_scanning_transactions(self):
+        self.client.login(username="buyer", password="pass12345")
+        resp = self.client.get(reverse("product_detail", args=[self.product.id]))
+        self.assertFalse(resp.context["can_review"])
+
+        record_purchases(self.user.id, [self.product.id], timezone.now())
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("product_detail", args=[self.product.id]))
+        self.assertTrue(resp.context["can_review"])
+        self.assertFalse(any("shop_transaction" in q["sql"] for q in ctx.captured_queries))
+
+
+class ReviewFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="식료품")
+        self.product = Product.objects.create(
+            category=category, name="사과", price=Decimal("1000"), stock=5, image1="p.png"
+        )
+        self.users = User.objects.bulk_create([User(username=f"w{i}") for i in range(25)])
+        base = timezone.now()
+        for i, user in enumerate(self.users):
+            review = Review.objects.create(product=self.product, user=user, rating=5, content=f"리뷰{i}")
+            Review.objects.filter(pk=review.pk).update(created_at=base - timedelta(minutes=i))
+            ReviewImage.objects.create(review=review, image="r.png")
+        cache.clear()
+
+    def test_detail_shows_first_page_and_feed_continues_by_cursor(self):
+        resp = self.client.get(reverse("product_detail", args=[self.product.id]))
+        reviews = resp.context["reviews"]
+        self.assertEqual([r.content for r in reviews], [f"리뷰{i}" for i in range(10)])
+        self.assertTrue(reviews.has_next())
+
+        seen = []
+        cursor = reviews.next_cursor
+        while cursor:
+            data = self.client.get(reverse("review_feed", args=[self.product.id]), {"cursor": cursor}).json()
+            seen += re.findall(r"리뷰\d+", data["html"])
+            cursor = data["next_cursor"]
+        self.assertEqual(seen, [f"리뷰{i}" for i in range(10, 25)])
+
+    def test_feed_queries_do_not_grow_per_review(self):
+        cursor = self.client.get(reverse("product_detail", args=[self.product.id])).context["reviews"].next_cursor
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("review_feed", args=[self.product.id]), {"cursor": cursor})
+        # 상품 확인 + 리뷰(작성자 JOIN) + 이미지 prefetch
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    def test_first_page_is_cached_until_a_review_changes(self):
+        url = reverse("product_detail", args=[self.product.id])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertFalse(any("shop_review" in q["sql"] for q in ctx.captured_queries))
+        self.assertEqual(resp.context["reviews"][0].user.username, "w0")
+        self.assertIn("/media/r.png", resp.content.decode())
+
+        # 캐시에는 모델 객체(작성자 User 행, 비밀번호 해시)가 아니라 화면에 쓰는 값만 들어간다
+        rows, _ = cache.get(f"reviews:first:{self.product.id}:{cache.get(f'reviews:version:{self.product.id}')}")
+        self.assertNotIn("password", repr(rows))
+        self.assertFalse(any(isinstance(v, (Review, User)) for row in rows for v in row))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.filter(content="리뷰0").get().delete()
+        resp = self.client.get(url)
+        self.assertEqual(resp.context["reviews"][0].content, "리뷰1")
+
+
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.media_root = media_root
+        self.category = Category.objects.create(name="식료품")
+
+    def _upload(self, size=(1000, 500)):
+        from PIL import Image
+
+        buf = BytesIO()
+        Image.new("RGB", size, (200, 30, 30)).save(buf, format="PNG")
+        return SimpleUploadedFile("apple.png", buf.getvalue(), content_type="image/png")
+
+    def test_upload_builds_thumbnails_and_webp_next_to_original(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(
+                category=self.category, name="사과", price=Decimal("1000"), stock=5, image1=self._upload()
+            )
+        stem = os.path.join(self.media_root, product.image1.name)
+        for width in (320, 640, 1000):  # 1280은 원본(1000px)보다 크므로 원본 너비로
+            self.assertTrue(os.path.exists(f"{stem}.w{width}.webp"))
+            self.assertTrue(os.path.exists(f"{stem}.w{width}.png"))
+        self.assertFalse(os.path.exists(f"{stem}.w1280.webp"))
+
+        from PIL import Image
+
+        with Image.open(f"{stem}.w320.webp") as thumb:
+            self.assertEqual(thumb.size, (320, 160))
+
+        html = self.client.get(reverse("product_list")).content.decode()
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(".png.w320.webp 320w", html)
+        self.assertIn(".png.w1000.png 1000w", html)
+
+    def test_same_stem_different_extension_get_separate_derivatives(self):
+        from PIL import Image
+
+        from shop.utils.images import derivative_name, ensure_derivatives
+
+        storage = Product._meta.get_field("image1").storage
+        names = []
+        for ext, fmt, color in (("png", "PNG", (255, 0, 0)), ("jpg", "JPEG", (0, 0, 255))):
+            buf = BytesIO()
+            Image.new("RGB", (400, 200), color).save(buf, format=fmt)
+            names.append(storage.save(f"products/None/x.{ext}", SimpleUploadedFile(f"x.{ext}", buf.getvalue())))
+        png, jpg = (Product(image1=n).image1 for n in names)
+        ensure_derivatives(png)
+        ensure_derivatives(jpg)
+        self.assertNotEqual(derivative_name(png.name, 320, "webp"), derivative_name(jpg.name, 320, "webp"))
+        with Image.open(storage.path(derivative_name(jpg.name, 320, "webp"))) as thumb:
+            self.assertGreater(thumb.convert("RGB").getpixel((0, 0))[2], 200)
+
+    def test_existing_derivatives_skip_decoding_the_original(self):
+        from PIL import Image
+
+        from shop.utils.images import ensure_derivatives
+
+        buf = BytesIO()
+        Image.new("RGB", (2000, 1000), (0, 128, 0)).save(buf, format="PNG")
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(
+                category=self.category, name="사과", price=Decimal("1000"), stock=5,
+                image1=SimpleUploadedFile("big.png", buf.getvalue()),
+            )
+        cache.clear()
+        with mock.patch.object(Image, "open", side_effect=AssertionError("원본을 열면 안 됨")):
+            self.assertEqual(ensure_derivatives(product.image1), [320, 640, 1280])
+
+    def test_missing_original_falls_back_to_plain_img(self):
+        Product.objects.create(category=self.category, name="배", price=Decimal("1000"), stock=5, image1="p.png")
+        html = self.client.get(reverse("product_list")).content.decode()
+        self.assertNotIn("<picture", html)
+        self.assertIn('src="/media/p.png"', html)
+
+    def test_lazy_generation_on_first_render(self):
+        with override_settings(IMAGE_DERIVATIVES_ON_UPLOAD=False), self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(
+                category=self.category, name="사과", price=Decimal("1000"), stock=5, image1=self._upload((300, 300))
+            )
+        stem = os.path.join(self.media_root, product.image1.name)
+        self.assertFalse(os.path.exists(f"{stem}.w300.webp"))
+
+        html = self.client.get(reverse("product_detail", args=[product.id])).content.decode()
+        self.assertTrue(os.path.exists(f"{stem}.w300.webp"))
+        self.assertIn('loading="eager"', html)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="구매자",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="1111",
+            is_default=True,
+        )
+        base = timezone.now()
+        # 같은 시각/같은 금액이 섞여 있어도 (정렬키, id)로 빠짐없이 순회되어야 함
+        for i in range(25):
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                tx_type=Transaction.OUT,
+                amount=Decimal(1000 * (i % 4 + 1)),
+                occurred_at=base - timedelta(minutes=i // 3),
+            )
+        self.client.login(username="buyer", password="pass12345")
+
+    def _walk(self, url, params, cursor_key, page_key):
+        seen, cursor = [], None
+        for _ in range(10):
+            query = dict(params)
+            if cursor:
+                query[cursor_key] = cursor
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(url, query)
+            self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries if "shop_transaction" in q["sql"]))
+            page = resp.context[page_key]
+            seen.extend(tx.id for tx in page)
+            if not page.has_next():
+                return seen, page
+            cursor = page.next_cursor
+        self.fail("cursor pagination did not terminate")
+
+    def test_history_cursor_walk_matches_offset_order(self):
+        expected = list(
+            Transaction.objects.filter(user=self.user).order_by("-occurred_at", "-id").values_list("id", flat=True)
+        )
+        seen, last_page = self._walk(
+            reverse("transaction_history"), {"tab": "out", "paging": "cursor"}, "cursor", "page_obj"
+        )
+        self.assertEqual(seen, expected)
+
+        # 마지막 페이지에서 이전으로 돌아가면 바로 앞 10건
+        resp = self.client.get(
+            reverse("transaction_history"),
+            {"tab": "out", "paging": "cursor", "cursor": last_page.prev_cursor},
+        )
+        self.assertEqual([tx.id for tx in resp.context["page_obj"]], expected[10:20])
+
+    def test_receipts_cursor_walk_keeps_price_sort(self):
+        expected = list(
+            Transaction.objects.filter(user=self.user)
+            .order_by("-amount", "-occurred_at", "-id")
+            .values_list("id", flat=True)
+        )
+        seen, _ = self._walk(
+            reverse("mypage"),
+            {"tab": "receipt", "rc_paging": "cursor", "rc_sort": "price_high"},
+            "rc_cursor",
+            "receipts_page",
+        )
+        self.assertEqual(seen, expected)
+
+    def test_filter_forms_keep_cursor_mode(self):
+        resp = self.client.get(reverse("transaction_history"), {"tab": "out", "paging": "cursor"})
+        self.assertContains(resp, '<input type="hidden" name="paging" value="cursor">', count=1)
+        # 폼 제출 결과(필터 + hidden paging)도 커서 모드 유지
+        resp = self.client.get(
+            reverse("transaction_history"), {"tab": "out", "paging": "cursor", "start_date": "2000-01-01"}
+        )
+        self.assertTrue(resp.context["cursor_mode"])
+        self.assertContains(resp, '<input type="hidden" name="paging" value="cursor">', count=1)
+
+        resp = self.client.get(reverse("mypage"), {"tab": "receipt", "rc_paging": "cursor"})
+        self.assertContains(resp, '<input type="hidden" name="rc_paging" value="cursor">')
+        resp = self.client.get(reverse("mypage"), {"tab": "receipt", "rc_paging": "cursor", "rc_sort": "price_low"})
+        self.assertTrue(resp.context["rc_cursor_mode"])
+
+        # 커서 모드가 아니면 hidden 필드 없음
+        resp = self.client.get(reverse("transaction_history"), {"tab": "out"})
+        self.assertNotContains(resp, 'name="paging"')
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        resp = self.client.get(
+            reverse("transaction_history"), {"tab": "out", "paging": "cursor", "cursor": "garbage"}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.context["page_obj"].has_previous())
+
+
+class TransactionExportTests(TestCase):
+    """거래내역 CSV/XLSX 내보내기: 화면과 같은 필터, 행 수와 상관없이 쿼리 수 일정"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="구매자",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="12345678",
+            is_default=True,
+        )
+        self.category = Category.objects.create(name="문구")
+        self.product = Product.objects.create(
+            name="연필", category=self.category, price=Decimal("1000"), stock=100
+        )
+        coupon = Coupon.objects.create(
+            name="천원할인",
+            code="save1000",
+            discount_type="amount",
+            discount_value=1000,
+            valid_to=timezone.now() + timedelta(days=7),
+        )
+        self.user_coupon = UserCoupon.objects.create(user=self.user, coupon=coupon, is_used=True)
+        now = timezone.now()
+        self.discounted = Transaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            product=self.product,
+            product_name="연필",
+            quantity=3,
+            tx_type=Transaction.OUT,
+            amount=Decimal("2000"),
+            total_price_at_pay=Decimal("3000"),
+            discount_amount=Decimal("1000"),
+            used_coupon=self.user_coupon,
+            occurred_at=now,
+            memo="=HYPERLINK(\"x\")",
+            receiver_name="홍길동",
+            shipping_zip_code="12345",
+            shipping_address="서울시 어딘가",
+            shipping_detail_address="101호",
+        )
+        for i in range(5):
+            Transaction.objects.create(
+                user=self.user,
+                account=self.account,
+                tx_type=Transaction.OUT,
+                amount=Decimal("500"),
+                occurred_at=now - timedelta(hours=i + 1),
+            )
+        Transaction.objects.create(
+            user=self.user, account=self.account, tx_type=Transaction.IN,
+            amount=Decimal("9000"), occurred_at=now,
+        )
+        self.client.login(username="buyer", password="pass12345")
+
+    def _export(self, **params):
+        resp = self.client.get(reverse("transaction_export"), params)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        return resp, b"".join(resp.streaming_content)
+
+    def _csv_rows(self, **params):
+        _, body = self._export(format="csv", **params)
+        return list(csv.reader(body.decode("utf-8-sig").splitlines()))
+
+    def test_csv_uses_history_filters_and_includes_order_columns(self):
+        rows = self._csv_rows(tab="out", discounted="1")
+        header, data = rows[0], rows[1:]
+        self.assertEqual(len(data), 1)
+        row = dict(zip(header, data[0]))
+        self.assertEqual(row["거래ID"], str(self.discounted.id))
+        self.assertEqual(row["상품"], "연필")
+        self.assertEqual(row["수량"], "3")
+        self.assertEqual(row["쿠폰"], "천원할인")
+        self.assertEqual(row["결제 금액"], "2000")
+        self.assertEqual(row["할인 전 금액"], "3000")
+        self.assertEqual(row["배송지"], "서울시 어딘가")
+        self.assertEqual(row["상세주소"], "101호")
+        # 엑셀 수식으로 실행되지 않도록 접두어
+        self.assertTrue(row["메모"].startswith("'="))
+
+        # 탭 필터: 화면과 같은 건수 (출금 6 / 입금 1)
+        self.assertEqual(len(self._csv_rows(tab="out")) - 1, 6)
+        self.assertEqual(len(self._csv_rows(tab="in")) - 1, 1)
+
+    def test_xlsx_is_a_readable_workbook(self):
+        resp, body = self._export(format="xlsx", tab="out")
+        self.assertIn("spreadsheetml", resp["Content-Type"])
+        with zipfile.ZipFile(BytesIO(body)) as zf:
+            self.assertIn("xl/workbook.xml", zf.namelist())
+            sheet = ElementTree.fromstring(zf.read("xl/worksheets/sheet1.xml"))
+        ns = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        rows = sheet.findall("m:sheetData/m:row", ns)
+        self.assertEqual(len(rows), 1 + 6)
+        first = ["".join(c.itertext()) for c in rows[1].findall("m:c", ns)]
+        self.assertEqual(first[0], str(self.discounted.id))
+        self.assertIn("천원할인", first)
+
+    def test_export_query_count_does_not_grow_with_rows(self):
+        def count():
+            with CaptureQueriesContext(connection) as ctx:
+                self._export(format="csv", tab="out")
+            return len(ctx.captured_queries)
+
+        before = count()
+        for i in range(30):
+            Transaction.objects.create(
+                user=self.user, account=self.account, tx_type=Transaction.OUT,
+                amount=Decimal("100"), occurred_at=timezone.now() - timedelta(days=i + 1),
+            )
+        self.assertEqual(count(), before)
+
+    def test_unknown_format_is_404(self):
+        resp = self.client.get(reverse("transaction_export"), {"format": "pdf"})
+        self.assertEqual(resp.status_code, 404)
+
+
+class TransactionSummaryAPITests(TestCase):
+    """요약 탭 그래프 JSON: 조건 반영, 거래내역이 그대로면 304"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="구매자",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="1111",
+            is_default=True,
+        )
+        self.food = Category.objects.create(name="식료품")
+        self.book = Category.objects.create(name="도서")
+        tz = timezone.get_current_timezone()
+        for when, tx_type, amount, category in [
+            (timezone.datetime(2026, 1, 10, 12, tzinfo=tz), Transaction.IN, "50000", None),
+            (timezone.datetime(2026, 1, 20, 12, tzinfo=tz), Transaction.OUT, "7000", self.food),
+            (timezone.datetime(2026, 2, 5, 12, tzinfo=tz), Transaction.OUT, "3000", self.book),
+            (timezone.datetime(2026, 3, 1, 0, 30, tzinfo=tz), Transaction.OUT, "1000", self.food),
+        ]:
+            Transaction.objects.create(
+                user=self.user, account=self.account, tx_type=tx_type,
+                amount=Decimal(amount), category=category, occurred_at=when,
+            )
+        rebuild_ledger(self.user)  # 뷰를 거치지 않고 만든 거래 -> 집계 테이블 채우기
+        self.client.login(username="buyer", password="pass12345")
+        self.url = reverse("transaction_summary_api")
+
+    def test_series_honor_month_range_and_category(self):
+        resp = self.client.get(self.url, {"sum_start": "2026-01", "sum_end": "2026-02"})
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(data["monthly"], {"labels": ["2026-01", "2026-02"], "in": [50000, 0], "out": [7000, 3000]})
+        self.assertEqual(data["totals"], {"in": 50000, "out": 10000, "net": 40000})
+        self.assertEqual(data["category"], {"labels": ["식료품", "도서"], "values": [7000, 3000]})
+
+        data = self.client.get(self.url, {"sum_category": str(self.food.id)}).json()
+        self.assertEqual(data["category"], {"labels": ["식료품"], "values": [8000]})
+
+    def test_unchanged_ledger_returns_304_without_aggregating(self):
+        first = self.client.get(self.url)
+        etag = first["ETag"]
+        self.assertIn("private", first["Cache-Control"])
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertFalse(any("SUM(" in q["sql"] for q in ctx.captured_queries))
+
+        # 거래 추가 / 카테고리 이름 변경 / 다른 조건이면 ETag가 달라짐
+        Transaction.objects.create(
+            user=self.user, account=self.account, tx_type=Transaction.OUT,
+            amount=Decimal("500"), occurred_at=timezone.now(),
+        )
+        added = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(added.status_code, 200)
+        self.assertNotEqual(added["ETag"], etag)
+
+        self.book.name = "책"
+        self.book.save()
+        renamed = self.client.get(self.url, HTTP_IF_NONE_MATCH=added["ETag"])
+        self.assertEqual(renamed.status_code, 200)
+        self.assertIn("책", renamed.json()["category"]["labels"])
+
+        other = self.client.get(self.url, {"sum_start": "2026-02"}, HTTP_IF_NONE_MATCH=renamed["ETag"])
+        self.assertEqual(other.status_code, 200)
+
+    def test_summary_page_points_chart_at_api(self):
+        resp = self.client.get(reverse("transaction_history"), {"tab": "summary", "sum_start": "2026-01"})
+        self.assertContains(resp, f"{self.url}?sum_start=2026-01")
+
+    def test_anonymous_is_forbidden(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+@override_settings(REQUEST_INSTRUMENTATION=True, REQUEST_SLOW_MS=60_000)
+class RequestInstrumentationTests(TestCase):
+    """요청별 SQL/시간 계측 미들웨어: Server-Timing 헤더 + URL 이름별 JSON 로그"""
+
+    def setUp(self):
+        cache.clear()
+        Category.objects.create(name="식료품")
+
+    def _log_record(self, logs):
+        return json.loads(logs.records[-1].getMessage())
+
+    def test_server_timing_and_json_log_per_url_name(self):
+        with self.assertLogs("accountbook.requests", "INFO") as logs:
+            resp = self.client.get(reverse("product_list"))
+        self.assertRegex(resp["Server-Timing"], r'db;dur=[0-9.]+;desc="\d+ queries, \d+ duplicate", app;dur=[0-9.]+, total;dur=')
+
+        record = self._log_record(logs)
+        self.assertEqual(record["url_name"], "product_list")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["queries"], 0)
+        self.assertNotIn("top_sql", record)
+
+    @override_settings(REQUEST_SLOW_MS=0)
+    def test_slow_request_logs_top_sql(self):
+        with self.assertLogs("accountbook.requests", "WARNING") as logs:
+            self.client.get(reverse("product_list"))
+        record = self._log_record(logs)
+        self.assertTrue(record["slow"])
+        self.assertTrue(record["top_sql"])
+        self.assertTrue(all({"sql", "count", "ms"} <= set(row) for row in record["top_sql"]))
+
+    def test_recorder_counts_repeated_identical_queries_as_duplicates(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            list(Category.objects.filter(name="식료품"))
+            list(Category.objects.filter(name="식료품"))
+            list(Category.objects.filter(name="도서"))
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.duplicates, 1)
+        self.assertEqual(recorder.top(1)[0]["count"], 3)
+
+    @override_settings(REQUEST_INSTRUMENTATION=False)
+    def test_disabled_by_setting(self):
+        resp = self.client.get(reverse("product_list"))
+        self.assertNotIn("Server-Timing", resp)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SeedScaleCommandTests(TestCase):
+    """seed_scale: 대용량 생성 데이터가 집계/구매 이력/잔액과 일관적인지"""
+
+    def _seed(self, **options):
+        out = StringIO()
+        call_command(
+            "seed_scale", users=4, transactions=400, products=24, coupons=5,
+            months=6, prefix="t", seed=7, stdout=out, **options,
+        )
+        return out.getvalue()
+
+    def test_generated_data_is_consistent(self):
+        output = self._seed()
+        self.assertIn("생성 완료", output)
+
+        users = list(User.objects.filter(username__startswith="t_"))
+        self.assertEqual(len(users), 4)
+        txs = Transaction.objects.filter(user__in=users)
+        self.assertGreaterEqual(txs.count(), 400)
+        self.assertFalse(txs.filter(occurred_at__gt=timezone.now()).exists())
+        self.assertTrue(txs.filter(tx_type=Transaction.IN).exists())
+        self.assertTrue(txs.filter(tx_type=Transaction.OUT, product__isnull=False).exists())
+
+        # 미리 계산해서 넣은 월별 집계 = 원본 재계산
+        for user in users:
+            self.assertEqual(verify_ledger(user), [])
+
+        # 구매 이력이 이미 다 채워져 있음
+        self.assertEqual(backfill_purchases([u.id for u in users]), 0)
+
+        # 계좌 잔액 = 입금 - 출금 (음수 없음)
+        for account in Account.objects.filter(user__in=users):
+            totals = txs.filter(account=account).values("tx_type").annotate(total=Sum("amount"))
+            by_type = {row["tx_type"]: row["total"] for row in totals}
+            self.assertEqual(account.balance, by_type.get("IN", 0) - by_type.get("OUT", 0))
+            self.assertGreaterEqual(account.balance, 0)
+
+        # 쿠폰을 쓴 거래 = 사용 처리된 보유 쿠폰
+        self.assertEqual(
+            txs.filter(used_coupon__isnull=False).count(),
+            UserCoupon.objects.filter(user__in=users, is_used=True).count(),
+        )
+        # bulk 생성이어도 검색 컬럼은 채워져 있음
+        self.assertFalse(Product.objects.filter(search_text="").exists())
+
+    def test_same_prefix_twice_is_rejected(self):
+        self._seed()
+        with self.assertRaises(CommandError):
+            self._seed()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class CartQueryCountTests(TestCase):
+    """장바구니 크기와 상관없이 장바구니/주문서/결제 쿼리 수가 일정한지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="구매자",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="1111",
+            balance=Decimal("10000000"),
+            is_default=True,
+        )
+        self.address = Address.objects.create(
+            user=self.user, zip_code="12345", address="서울시", detail_address="101호", is_default=True
+        )
+        self.category = Category.objects.create(name="식료품")
+        self.client.login(username="buyer", password="pass12345")
+
+    def _fill_cart(self, n):
+        Cart.objects.filter(user=self.user).delete()
+        for i in range(n):
+            product = Product.objects.create(
+                category=self.category,
+                name=f"상품{n}-{i}",
+                price=Decimal("1000"),
+                stock=10,
+                image1=_make_test_image(),
+            )
+            Cart.objects.create(user=self.user, product=product, quantity=2)
+
+    def _count(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            getattr(self.client, method)(url, data or {})
+        return len(ctx.captured_queries)
+
+    def test_cart_and_checkout_pages_constant_queries(self):
+        counts = {}
+        for n in (1, 6):
+            self._fill_cart(n)
+            counts[n] = (
+                self._count("get", reverse("cart_list")),
+                self._count("get", reverse("checkout")),
+            )
+        self.assertEqual(counts[1], counts[6])
+
+    def test_order_execution_lookup_queries_do_not_grow_per_item(self):
+        reads = {}
+        for n in (2, 6):
+            self._fill_cart(n)
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(reverse("order_execute"), {"address_id": str(self.address.id)})
+            # 쓰기(상품별 재고/거래 기록)를 제외한 조회 쿼리 수
+            reads[n] = sum(1 for q in ctx.captured_queries if q["sql"].startswith("SELECT"))
+            self.assertFalse(Cart.objects.filter(user=self.user).exists())
+        self.assertEqual(reads[2], reads[6])
+
+    def test_order_execution_total_queries_do_not_grow_per_item(self):
+        data = {"address_id": str(self.address.id)}
+        # 이번 달 월별 집계 행을 먼저 만들어 두고(최초 INSERT가 비교에 섞이지 않게) 측정
+        self._fill_cart(1)
+        self.client.post(reverse("order_execute"), data)
+
+        counts = {}
+        for n in (2, 6):
+            self._fill_cart(n)
+            counts[n] = self._count("post", reverse("order_execute"), data)
+            self.assertFalse(Cart.objects.filter(user=self.user).exists())
+        # 재고 UPDATE 1회 + 거래 INSERT 1회 + 잔액 UPDATE 1회로 일괄 처리
+        self.assertEqual(counts[2], counts[6])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1 + 2 + 6)
+        self.assertEqual(set(Product.objects.values_list("stock", flat=True)), {8})
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("10000000") - Decimal("2000") * 9)
+
+    def test_order_execution_stock_shortage_rolls_back_everything(self):
+        self._fill_cart(3)
+        short = Product.objects.order_by("-id").first()
+        Product.objects.filter(pk=short.pk).update(stock=1)
+
+        self.client.post(reverse("order_execute"), {"address_id": str(self.address.id)})
+
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 3)
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+        self.assertEqual(
+            sorted(Product.objects.values_list("stock", flat=True)), [1, 10, 10]
+        )
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("10000000"))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class IdempotencyKeyTests(TestCase):
+    """같은 멱등 키로 다시 보낸 결제/충전 POST는 첫 응답만 재생하고 DB는 건드리지 않는지"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="buyer", password="pass12345")
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        self.account = Account.objects.create(
+            user=self.user,
+            name="구매자",
+            phone="01012345678",
+            bank=self.bank,
+            account_number="1111",
+            balance=Decimal("100000"),
+            is_default=True,
+        )
+        self.address = Address.objects.create(
+            user=self.user, zip_code="12345", address="서울시", detail_address="101호", is_default=True
+        )
+        category = Category.objects.create(name="식료품")
+        self.product = Product.objects.create(
+            category=category, name="사과", price=Decimal("1000"), stock=10, image1=_make_test_image()
+        )
+        self.client.login(username="buyer", password="pass12345")
+
+    def _direct(self, key, quantity="1"):
+        return self.client.post(
+            reverse("direct_purchase", args=[self.product.id]),
+            {"address_id": str(self.address.id), "quantity": quantity, "idempotency_key": key},
+        )
+
+    def test_checkout_page_renders_fresh_key(self):
+        Cart.objects.create(user=self.user, product=self.product, quantity=1)
+        first = self.client.get(reverse("checkout")).context["idempotency_key"]
+        second = self.client.get(reverse("checkout")).context["idempotency_key"]
+        self.assertTrue(first)
+        self.assertNotEqual(first, second)
+
+    def test_repeated_direct_purchase_replays_first_response(self):
+        first = self._direct("k1")
+        with CaptureQueriesContext(connection) as ctx:
+            second = self._direct("k1")
+
+        self.assertEqual(second.status_code, 302)
+        self.assertEqual(second["Location"], first["Location"])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 9)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("99000"))
+
+        # 재생 요청은 상품/계좌/거래 테이블을 읽거나 쓰지 않는다
+        touched = [
+            q["sql"] for q in ctx.captured_queries
+            if any(t in q["sql"] for t in ('"shop_product"', '"account_account"', '"shop_transaction"'))
+            and not q["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(touched, [])
+
+        # 첫 응답의 메시지도 함께 재생
+        msgs = [str(m) for m in second.wsgi_request._messages]
+        self.assertTrue(any("결제가 완료" in m for m in msgs))
+
+    def test_cart_checkout_and_charge_run_once_per_key(self):
+        Cart.objects.create(user=self.user, product=self.product, quantity=2)
+        data = {"address_id": str(self.address.id), "idempotency_key": "order-1"}
+        self.client.post(reverse("order_execute"), data)
+        Cart.objects.create(user=self.user, product=self.product, quantity=2)
+        self.client.post(reverse("order_execute"), data)
+        self.assertEqual(Transaction.objects.filter(tx_type=Transaction.OUT).count(), 1)
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 1)
+
+        charge = {"amount": "5000", "account_id": self.account.id}
+        for _ in range(2):
+            self.client.post(reverse("charge_balance"), charge, HTTP_IDEMPOTENCY_KEY="charge-1")
+        self.assertEqual(Transaction.objects.filter(tx_type=Transaction.IN).count(), 1)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("100000") - Decimal("2000") + Decimal("5000"))
+
+    def test_failed_purchase_is_not_replayed_for_the_same_key(self):
+        Account.objects.filter(pk=self.account.pk).update(balance=Decimal("0"))
+        failed = self._direct("k3")
+        self.assertEqual(failed["Location"], reverse("product_detail", args=[self.product.id]))
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        # 잔액을 채운 뒤 같은 키로 다시 보내면 실패를 재생하지 않고 실제로 결제
+        Account.objects.filter(pk=self.account.pk).update(balance=Decimal("100000"))
+        retried = self._direct("k3")
+        self.assertEqual(retried["Location"], reverse("mypage"))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().status, IdempotencyKey.DONE)
+
+    def test_same_key_with_different_payload_is_rejected(self):
+        self._direct("k2", quantity="1")
+        resp = self._direct("k2", quantity="3")
+        self.assertEqual(resp.status_code, 422)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        self._direct("")
+        self._direct("")
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_expired_keys_are_purged_and_can_run_again(self):
+        self._direct("k3")
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        out = StringIO()
+        call_command("purge_idempotency_keys", stdout=out)
+        self.assertIn("1건", out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        self._direct("k3")
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ConcurrentCheckoutStressTests(TransactionTestCase):
+    """
+    여러 스레드(= 여러 워커)가 같은 상품/계좌를 동시에 결제·충전해도
+    재고가 음수가 되거나 초과 판매/잔액 유실이 생기지 않는지.
+    (PostgreSQL에서는 실제 행 잠금 경합, SQLite에서는 쓰기 직렬화 하에서 불변식만 확인)
+    """
+
+    BUYERS = 12
+    STOCK = 5
+
+    def setUp(self):
+        self.bank = Bank.objects.create(name="테스트은행", min_len=1, max_len=50, prefixes_csv="")
+        category = Category.objects.create(name="한정판")
+        self.product = Product.objects.create(
+            category=category,
+            name="인기상품",
+            price=Decimal("1000"),
+            stock=self.STOCK,
+            image1=_make_test_image(),
+        )
+
+    def _make_buyer(self, i, balance="100000"):
+        user = User.objects.create_user(username=f"buyer{i}", password="pass12345")
+        account = Account.objects.create(
+            user=user,
+            name=f"구매자{i}",
+            phone="01012345678",
+            bank=self.bank,
+            account_number=f"{1000 + i}",
+            balance=Decimal(balance),
+            is_default=True,
+        )
+        address = Address.objects.create(
+            user=user, zip_code="12345", address="서울시", detail_address="101호", is_default=True
+        )
+        return user, account, address
+
+    def _hammer(self, jobs):
+        """jobs: [(user, url, data)] 를 스레드마다 하나씩 동시에 POST"""
+        # 로그인(세션 생성)은 메인 스레드에서 미리 해 두고, 스레드는 POST만 동시에 보낸다
+        clients = []
+        for user, _, _ in jobs:
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            clients.append(client)
+
+        barrier = threading.Barrier(len(jobs), timeout=30)
+        errors = []
+
+        def run(client, url, data):
+            try:
+                barrier.wait()
+                client.post(url, data)
+            except Exception as e:  # pragma: no cover - 진단용
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=run, args=(client, url, data))
+            for client, (_, url, data) in zip(clients, jobs)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
+    def test_many_buyers_never_oversell_one_product(self):
+        buyers = [self._make_buyer(i) for i in range(self.BUYERS)]
+        url = reverse("direct_purchase", args=[self.product.id])
+        self._hammer(
+            [(user, url, {"address_id": str(address.id), "quantity": "1"}) for user, _, address in buyers]
+        )
+
+        self.product.refresh_from_db()
+        sold = Transaction.objects.filter(product=self.product, tx_type=Transaction.OUT).count()
+        self.assertGreaterEqual(self.product.stock, 0)
+        self.assertGreaterEqual(sold, 1)
+        self.assertEqual(self.product.stock, self.STOCK - sold)
+        if connection.vendor == "postgresql":
+            self.assertEqual(sold, self.STOCK)
+
+        # 결제에 성공한 사람만 정확히 한 번 차감
+        for user, account, _ in buyers:
+            account.refresh_from_db()
+            paid = Transaction.objects.filter(user=user, tx_type=Transaction.OUT).count()
+            self.assertEqual(account.balance, Decimal("100000") - Decimal("1000") * paid)
+
+    def test_concurrent_charges_do_not_lose_updates(self):
+        user, account, _ = self._make_buyer(0, balance="0")
+        jobs = [
+            (user, reverse("charge_balance"), {"amount": "1000", "account_id": account.id})
+            for _ in range(8)
+        ]
+        self._hammer(jobs)
+
+        account.refresh_from_db()
+        charged = Transaction.objects.filter(user=user, tx_type=Transaction.IN).count()
+        self.assertGreaterEqual(charged, 1)
+        self.assertEqual(account.balance, Decimal("1000") * charged)
+        if connection.vendor == "postgresql":
+            self.assertEqual(charged, 8)
+
+    def test_concurrent_retries_with_one_key_charge_once(self):
+        user, account, _ = self._make_buyer(0, balance="0")
+        jobs = [
+            (user, reverse("charge_balance"), {"amount": "1000", "account_id": account.id, "idempotency_key": "same"})
+            for _ in range(6)
+        ]
+        self._hammer(jobs)
+
+        account.refresh_from_db()
+        charged = Transaction.objects.filter(user=user, tx_type=Transaction.IN).count()
+        self.assertLessEqual(charged, 1)
+        self.assertEqual(account.balance, Decimal("1000") * charged)
+        if connection.vendor == "postgresql":
+            self.assertEqual(charged, 1)
@@ -10,9 +10,12 @@ from shop.views import (
     OrderExecutionView,
     DirectPurchaseView,
     TransactionHistoryView,
+    TransactionExportView,
+    TransactionSummaryView,
     ReviewCreateView,
     ReviewDeleteView,
     ReviewUpdateView,
+    ReviewFeedView,
     ConsultingProductListView,
     CouponRegisterView,
 )
@@ -27,9 +30,12 @@ urlpatterns = [
     path("order/execute/", OrderExecutionView.as_view(), name="order_execute"),
     path("order/direct/<int:product_id>/", DirectPurchaseView.as_view(), name="direct_purchase"),
     path("transactions/", TransactionHistoryView.as_view(), name="transaction_history"),
+    path("transactions/export/", TransactionExportView.as_view(), name="transaction_export"),
+    path("transactions/summary.json", TransactionSummaryView.as_view(), name="transaction_summary_api"),
     path("product/<int:product_id>/review/", ReviewCreateView.as_view(), name="review_create"),
     path("review/delete/<int:review_id>/", ReviewDeleteView.as_view(), name="review_delete"),
     path("review/update/<int:review_id>/", ReviewUpdateView.as_view(), name="review_update"),
+    path("products/<int:pk>/reviews/", ReviewFeedView.as_view(), name="review_feed"),
     path("consulting/", ConsultingProductListView.as_view(), name="product_consulting_list"),
     path("coupons/", CouponRegisterView.as_view(), name="register_coupon"),
 ]
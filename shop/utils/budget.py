@@ -0,0 +1,120 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, Sum, Value, When
+from django.utils import timezone
+
+from shop.models import LedgerMonthlyRollup
+
+# request에 스냅샷을 기억해 두는 속성 이름 (get_queryset / get_context_data 공유)
+_SNAPSHOT_CACHE_ATTR = "_budget_snapshot"
+
+
+def _to_decimal(v) -> Decimal:
+    if v is None:
+        return Decimal("0")
+    if isinstance(v, Decimal):
+        return v
+    return Decimal(str(v))
+
+
+@dataclass(frozen=True)
+class BudgetSnapshot:
+    """
+    컨설팅(예산 추천) 계산에 필요한 수치 묶음. 월별 집계 테이블 기준이라 예전 직접 Sum()과 두 가지가 다르다.
+    - 입금/출금에 예전 데이터의 income/buy 거래도 포함 (거래내역 요약 탭과 같은 IN_TYPES/OUT_TYPES)
+    - "이번 달"은 오늘까지가 아니라 달력상 이번 달 전체 (오늘 이후 일시로 기록된 거래도 포함)
+    - month_in / month_out : 이번 달 입금/출금 (계좌 전체)
+    - total_in / total_out : 가입 이후 누적 입금/출금 (계좌 전체)
+    """
+
+    month: date
+    month_in: Decimal
+    month_out: Decimal
+    total_in: Decimal
+    total_out: Decimal
+
+    @property
+    def asset_base(self) -> Decimal:
+        """Runway+SWR 모델 계산용 자산(순자산) = 누적입금 - 누적출금 (0 미만은 0 처리)"""
+        net = self.total_in - self.total_out
+        if net < 0:
+            net = Decimal("0")
+        return net.quantize(Decimal("1"))
+
+    @property
+    def runway(self) -> Decimal:
+        """누적 순자산 / 이번 달 지출 (지출이 없으면 1로 나눔)"""
+        denom = self.month_out if self.month_out > 0 else Decimal("1")
+        return self.asset_base / denom
+
+    @property
+    def recommended_budget(self) -> Decimal:
+        asset_base = self.asset_base
+        if asset_base <= 0:
+            return Decimal("0")
+
+        runway = self.runway
+
+        # base monthly safe spending rate (월 1%)
+        base_rate = Decimal("0.01")
+
+        # risk multiplier by runway
+        if runway >= Decimal("24"):
+            mult = Decimal("1.6")
+        elif runway >= Decimal("12"):
+            mult = Decimal("1.2")
+        elif runway >= Decimal("6"):
+            mult = Decimal("0.9")
+        else:
+            mult = Decimal("0.6")
+
+        budget = asset_base * base_rate * mult
+        budget = min(budget, asset_base)
+
+        return budget.quantize(Decimal("1"))
+
+
+def compute_budget_snapshot(user, today=None) -> BudgetSnapshot:
+    """
+    월별 집계 테이블 한 번의 조건부 집계로 이번 달/누적 IN·OUT을 모두 계산.
+    """
+    today = today or timezone.localdate()
+    month = today.replace(day=1)
+
+    s = LedgerMonthlyRollup.objects.filter(user=user).aggregate(
+        _total_in=Sum("total_in"),
+        _total_out=Sum("total_out"),
+        _month_in=Sum(
+            Case(
+                When(month=month, then="total_in"),
+                default=Value(0),
+                output_field=DecimalField(),
+            )
+        ),
+        _month_out=Sum(
+            Case(
+                When(month=month, then="total_out"),
+                default=Value(0),
+                output_field=DecimalField(),
+            )
+        ),
+    )
+
+    return BudgetSnapshot(
+        month=month,
+        month_in=_to_decimal(s["_month_in"]).quantize(Decimal("1")),
+        month_out=_to_decimal(s["_month_out"]).quantize(Decimal("1")),
+        total_in=_to_decimal(s["_total_in"]).quantize(Decimal("1")),
+        total_out=_to_decimal(s["_total_out"]).quantize(Decimal("1")),
+    )
+
+
+def get_budget_snapshot(request) -> BudgetSnapshot:
+    """요청 단위로 메모이즈된 BudgetSnapshot (같은 요청에서 여러 번 불러도 쿼리 1회)"""
+    snapshot = getattr(request, _SNAPSHOT_CACHE_ATTR, None)
+    if snapshot is None:
+        snapshot = compute_budget_snapshot(request.user)
+        setattr(request, _SNAPSHOT_CACHE_ATTR, snapshot)
+    return snapshot
@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F
+
+from shop.models import Cart
+
+
+def cart_lines(user):
+    """
+    장바구니 목록 + 상품/카테고리를 한 번에 가져오는 queryset.
+    - select_related로 item.product / item.product.category 지연 로딩(N+1) 방지
+    - line_total(= 상품가 * 수량)을 SQL에서 계산해서 annotate
+    """
+    return (
+        Cart.objects.filter(user=user)
+        .select_related("product", "product__category")
+        .annotate(
+            line_total=ExpressionWrapper(
+                F("product__price") * F("quantity"),
+                output_field=DecimalField(max_digits=14, decimal_places=0),
+            )
+        )
+        .order_by("id")
+    )
+
+
+def cart_total(lines) -> Decimal:
+    """cart_lines 결과(queryset 또는 list)를 한 번 순회해서 총액 계산 (queryset이면 결과 캐시 재사용)"""
+    return sum((line.total_price() for line in lines), Decimal("0"))
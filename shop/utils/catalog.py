@@ -0,0 +1,106 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404
+
+from shop.models import Category, Coupon, Product
+
+# 카탈로그(카테고리/쿠폰 배너/상품 목록 페이지) 캐시 키는 모두 버전을 포함한다.
+# 상품/카테고리/쿠폰이 바뀌면 버전만 올리고(shop.signals), 예전 키는 TTL로 자연 만료.
+_VERSION_KEY = "catalog:version"
+
+
+def catalog_cache_enabled() -> bool:
+    return getattr(settings, "CATALOG_CACHE_ENABLED", True)
+
+
+def _cache():
+    return caches[getattr(settings, "CATALOG_CACHE_ALIAS", "default")]
+
+
+def _timeout() -> int:
+    # locmem은 프로세스마다 따로라서 다른 워커의 버전 증가를 못 본다 -> TTL이 최대 지연 시간
+    return getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+
+
+def catalog_version() -> int:
+    cache = _cache()
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        # 버전 키가 밀려난 경우에도 예전 값과 겹치지 않도록 시각 기반 초기값
+        cache.add(_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version() -> None:
+    """상품/카테고리/쿠폰 저장·삭제 시 호출 -> 이전 버전 캐시 전부 무효"""
+    cache = _cache()
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, time.time_ns(), None)
+
+
+def _key(*parts) -> str:
+    # 검색어 등 사용자 입력이 들어가므로 해시 (memcached 키 길이/공백 제한)
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f"catalog:{catalog_version()}:{parts[0]}:{digest}"
+
+
+def _cached(key_parts, compute):
+    if not catalog_cache_enabled():
+        return compute()
+    cache = _cache()
+    key = _key(*key_parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, _timeout())
+    return value
+
+
+def get_categories() -> list:
+    """상품 목록 필터용 전체 카테고리"""
+    return _cached(("categories",), lambda: list(Category.objects.all()))
+
+
+def get_active_coupons() -> list:
+    """상품 목록 상단 쿠폰 배너 (활성 쿠폰 최신순)"""
+    return _cached(("coupons",), lambda: list(Coupon.objects.filter(active=True).order_by("-id")))
+
+
+class _KnownCountPaginator(Paginator):
+    """count를 캐시에서 받아 COUNT(*) 쿼리를 생략하는 Paginator"""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.__dict__["count"] = count
+
+
+def paginate_product_ids(queryset, page_size: int, page, key_parts):
+    """
+    ListView.paginate_queryset 대체: (paginator, page, object_list, is_paginated)
+    - (검색어, 카테고리, 정렬) 별 전체 개수, (…, 페이지) 별 상품 id 목록만 캐시
+    - 상품 행(가격/재고/이미지)은 매번 id로 새로 읽으므로 재고 변화는 바로 반영된다
+    """
+    count = _cached((*key_parts, "count"), queryset.count)
+    paginator = _KnownCountPaginator(queryset, page_size, count)
+    try:
+        number = paginator.num_pages if page == "last" else int(page or 1)
+        number = paginator.validate_number(number)
+    except (ValueError, InvalidPage):
+        raise Http404("페이지를 찾을 수 없습니다.")
+
+    bottom = (number - 1) * page_size
+    ids = _cached(
+        (*key_parts, "page", number),
+        lambda: list(queryset.values_list("id", flat=True)[bottom:bottom + page_size]),
+    )
+    by_id = Product.objects.in_bulk(ids)
+    products = [by_id[i] for i in ids if i in by_id]
+    page_obj = paginator._get_page(products, number, paginator)
+    return paginator, page_obj, products, paginator.num_pages > 1
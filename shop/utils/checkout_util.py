@@ -1,7 +1,9 @@
 from decimal import Decimal
 from django.shortcuts import get_object_or_404
 from account.models import Account, Address
-from ..models import Cart, Product, UserCoupon
+from ..models import Product, UserCoupon
+from .cart_repo import cart_lines, cart_total
+from .idempotency import new_idempotency_key
 
 
 def build_checkout_context(request, product_id=None, quantity=1):
@@ -30,8 +32,9 @@ def build_checkout_context(request, product_id=None, quantity=1):
 
         product = None
         quantity = None
-        cart_items = Cart.objects.filter(user=request.user)
-        total_amount = sum(item.total_price() for item in cart_items) if cart_items.exists() else Decimal("0")
+        # 장바구니 + 상품을 한 번에 읽고 한 번 순회로 합계 (exists()/지연 로딩 쿼리 없음)
+        cart_items = list(cart_lines(request.user))
+        total_amount = cart_total(cart_items)
 
         # ✅ 쿠폰 할인 로직 (변수명 total_amount로 통일)
     discount_amount = Decimal("0")
@@ -60,4 +63,6 @@ def build_checkout_context(request, product_id=None, quantity=1):
         "final_price": final_price,
         "user_coupons": user_coupons,
         "selected_coupon_id": selected_coupon_id,            
+        # 결제 폼 중복 제출 방지 키 (렌더링마다 새로 발급)
+        "idempotency_key": new_idempotency_key(),
     }
\ No newline at end of file
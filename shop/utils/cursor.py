@@ -0,0 +1,142 @@
+from datetime import datetime
+from functools import reduce
+from operator import or_
+from typing import List, Optional, Sequence
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# 커서 토큰 서명용 salt (다른 signing 용도와 토큰이 섞이지 않게)
+_CURSOR_SALT = "shop.cursor"
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder는 datetime을 밀리초로 잘라버려서 "같은 시각" 비교가 어긋난다 -> 마이크로초까지 유지
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _CursorSerializer(signing.JSONSerializer):
+    # datetime / Decimal 값을 그대로 담기 위한 직렬화
+    def dumps(self, obj):
+        return _CursorEncoder(separators=(",", ":")).encode(obj).encode("latin-1")
+
+
+def encode_cursor(direction: str, values: Sequence) -> str:
+    """('n'|'p', 정렬 키 값들) -> URL에 그대로 쓸 수 있는 불투명 토큰"""
+    return signing.dumps(
+        {"d": direction, "v": list(values)},
+        salt=_CURSOR_SALT,
+        serializer=_CursorSerializer,
+        compress=True,
+    )
+
+
+def decode_cursor(token: Optional[str]):
+    """토큰 -> (direction, values). 비었거나 위조/손상된 토큰은 None (첫 페이지로 처리)"""
+    if not token:
+        return None
+    try:
+        data = signing.loads(token, salt=_CURSOR_SALT, serializer=_CursorSerializer)
+        direction, values = data["d"], data["v"]
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+    if direction not in ("n", "p") or not isinstance(values, list):
+        return None
+    return direction, values
+
+
+class CursorPage:
+    """
+    keyset(커서) 페이지. Django Page처럼 순회/len 가능하지만 전체 개수(COUNT)는 모른다.
+    - next_cursor / prev_cursor : 다음/이전 페이지 토큰 (없으면 None)
+    """
+
+    def __init__(self, object_list: List, has_next: bool, has_previous: bool, ordering: Sequence[str]):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.ordering = list(ordering)
+
+    def _key(self, obj):
+        return [getattr(obj, f.lstrip("-")) for f in self.ordering]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor("n", self._key(self.object_list[-1]))
+
+    @property
+    def prev_cursor(self) -> Optional[str]:
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor("p", self._key(self.object_list[0]))
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+def _after(ordering: Sequence[str], values: Sequence, forward: bool) -> Q:
+    """
+    (f1, f2, ...) 사전식 비교 조건.
+    예) ordering=['-occurred_at', '-id'], forward
+        -> occurred_at < v1 OR (occurred_at = v1 AND id < v2)
+    """
+    clauses = []
+    equal = {}
+    for field, value in zip(ordering, values):
+        desc = field.startswith("-")
+        name = field.lstrip("-")
+        op = "lt" if desc == forward else "gt"
+        clauses.append(Q(**equal, **{f"{name}__{op}": value}))
+        equal[name] = value
+    return reduce(or_, clauses)
+
+
+def _reverse(ordering: Sequence[str]) -> List[str]:
+    return [f[1:] if f.startswith("-") else f"-{f}" for f in ordering]
+
+
+def paginate_by_cursor(qs, ordering: Sequence[str], cursor: Optional[str], per_page: int) -> CursorPage:
+    """
+    OFFSET/COUNT 없이 정렬 키 기준으로 한 페이지를 가져온다.
+    - ordering은 반드시 유일한 값(id)으로 끝나야 페이지 경계가 흔들리지 않는다.
+    - per_page + 1 건을 읽어서 다음(이전) 페이지 존재 여부만 판단
+    """
+    decoded = decode_cursor(cursor)
+    if decoded and len(decoded[1]) != len(ordering):
+        decoded = None  # 정렬 옵션이 바뀐 뒤의 오래된 토큰
+
+    if decoded is None:
+        rows = list(qs.order_by(*ordering)[: per_page + 1])
+        return CursorPage(rows[:per_page], len(rows) > per_page, False, ordering)
+
+    direction, values = decoded
+    if direction == "n":
+        rows = list(qs.filter(_after(ordering, values, True)).order_by(*ordering)[: per_page + 1])
+        return CursorPage(rows[:per_page], len(rows) > per_page, True, ordering)
+
+    rows = list(qs.filter(_after(ordering, values, False)).order_by(*_reverse(ordering))[: per_page + 1])
+    has_previous = len(rows) > per_page
+    rows = rows[:per_page]
+    rows.reverse()
+    return CursorPage(rows, True, has_previous, ordering)
@@ -0,0 +1,187 @@
+import hashlib
+import time
+import uuid
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseRedirect
+from django.utils import timezone
+
+from shop.models import IdempotencyKey
+
+# 폼 hidden 필드 이름 / API 클라이언트용 헤더
+IDEMPOTENCY_FIELD = "idempotency_key"
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# 해시에서 빼는 값 (요청마다 달라도 같은 요청으로 본다)
+_IGNORED_FIELDS = {"csrfmiddlewaretoken", IDEMPOTENCY_FIELD}
+
+
+def _ttl() -> timedelta:
+    return timedelta(seconds=getattr(settings, "IDEMPOTENCY_KEY_TTL", 60 * 60 * 24))
+
+
+def _wait_seconds() -> float:
+    return getattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 5)
+
+
+def new_idempotency_key() -> str:
+    """결제/충전 폼을 렌더링할 때마다 새로 발급하는 키"""
+    return uuid.uuid4().hex
+
+
+def _request_key(request) -> str:
+    return (request.headers.get(IDEMPOTENCY_HEADER) or request.POST.get(IDEMPOTENCY_FIELD) or "").strip()
+
+
+def _request_hash(request) -> str:
+    items = sorted(
+        (k, v) for k, values in request.POST.lists() if k not in _IGNORED_FIELDS for v in values
+    )
+    raw = request.path + "\n" + "\n".join(f"{k}={v}" for k, v in items)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def mark_succeeded(request) -> None:
+    """
+    멱등 뷰에서 결제/충전이 실제로 반영됐을 때 호출 (커밋 이후).
+    호출하지 않은 응답(잔액 부족/품절 등 실패 리다이렉트)은 저장하지 않으므로 같은 키로 다시 시도할 수 있다.
+    """
+    request.idempotency_succeeded = True
+
+
+def _snapshot_messages(request) -> list:
+    # 메시지 저장소를 순회하면 "읽음" 처리되므로 used=False로 되돌려 다음 화면에 그대로 보이게 한다
+    storage = messages.get_messages(request)
+    snapshot = list(storage)
+    storage.used = False
+    return snapshot
+
+
+def _replay(request, record: IdempotencyKey) -> HttpResponse:
+    """저장된 첫 응답을 그대로 돌려준다 (Product/Account/Transaction은 건드리지 않음)"""
+    for level, message, extra_tags in record.response_messages:
+        messages.add_message(request, level, message, extra_tags=extra_tags)
+    if record.response_location:
+        return HttpResponseRedirect(record.response_location)
+    return HttpResponse(status=record.response_status or 200)
+
+
+def _claim(request, scope: str, key: str, request_hash: str):
+    """
+    (user, scope, key) 행을 PENDING으로 선점한다.
+    - 선점 성공: (record, True)
+    - 이미 있음: (기존 record, False) / 만료된 행은 지우고 다시 선점
+    """
+    lookup = {"user": request.user, "scope": scope, "key": key}
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    request_hash=request_hash,
+                    expires_at=timezone.now() + _ttl(),
+                    **lookup,
+                )
+            return record, True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(**lookup).first()
+            if record is None:
+                continue  # 그 사이 만료 정리로 지워짐 -> 다시 선점 시도
+            if record.expires_at > timezone.now():
+                return record, False
+            IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=timezone.now()).delete()
+    return IdempotencyKey.objects.filter(**lookup).first(), False
+
+
+# _wait_until_done: 기다리는 사이 첫 요청이 실패해서 키가 지워짐
+_RELEASED = object()
+
+
+def _wait_until_done(record: IdempotencyKey):
+    """
+    같은 키의 첫 요청이 아직 처리 중이면 잠깐 기다렸다가 완료된 행을 반환
+    (첫 요청이 실패해 키가 지워졌으면 _RELEASED, 시간 초과면 None)
+    """
+    deadline = time.monotonic() + _wait_seconds()
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        record = IdempotencyKey.objects.filter(pk=record.pk).first()
+        if record is None:
+            return _RELEASED
+        if record.status == IdempotencyKey.DONE:
+            return record
+    return None
+
+
+def idempotent(scope: str):
+    """
+    POST 뷰 데코레이터. 요청에 멱등 키(폼 idempotency_key 또는 Idempotency-Key 헤더)가 있으면
+    - 처음 온 요청만 뷰를 실행하고, 뷰가 mark_succeeded()로 성공을 알린 경우에만
+      응답(리다이렉트 위치 + 메시지)을 키와 함께 저장
+    - 실패한 요청(mark_succeeded 호출 없음, 4xx/5xx, 예외)은 키를 풀어 같은 키로 다시 시도할 수 있다
+    - 같은 키로 다시 온 요청은 뷰를 실행하지 않고 저장된 응답을 재생
+    - 첫 요청이 처리 중이면 잠깐 기다렸다 재생(첫 요청이 실패했으면 다시 실행), 그래도 안 끝났으면 409
+    - 같은 키로 내용이 다른 요청이 오면 422
+    키가 없는 요청은 예전처럼 그대로 뷰를 실행한다.
+    클래스 뷰에는 method_decorator(idempotent(...), name="post")로 붙인다.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            key = _request_key(request) if request.method == "POST" else ""
+            if not key or not request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+            if len(key) > 64:
+                return HttpResponseBadRequest("잘못된 요청 키입니다.")
+
+            request_hash = _request_hash(request)
+            record, claimed = _claim(request, scope, key, request_hash)
+
+            if not claimed:
+                if record is None:
+                    return HttpResponse("이미 처리 중인 요청입니다.", status=409)
+                if record.request_hash != request_hash:
+                    return HttpResponse("같은 요청 키로 다른 내용을 보낼 수 없습니다.", status=422)
+                if record.status != IdempotencyKey.DONE:
+                    record = _wait_until_done(record)
+                    if record is _RELEASED:
+                        # 첫 요청이 실패해서 키가 풀렸다 -> 이 요청으로 다시 시도
+                        return _wrapped(request, *args, **kwargs)
+                    if record is None:
+                        return HttpResponse("이미 처리 중인 요청입니다.", status=409)
+                return _replay(request, record)
+
+            before = len(_snapshot_messages(request))
+            try:
+                response = view_func(request, *args, **kwargs)
+            except Exception:
+                # 처리 도중 죽은 요청은 같은 키로 다시 시도할 수 있게 선점 해제
+                IdempotencyKey.objects.filter(pk=record.pk).delete()
+                raise
+
+            if response.status_code >= 400 or not getattr(request, "idempotency_succeeded", False):
+                IdempotencyKey.objects.filter(pk=record.pk).delete()
+                return response
+
+            added = _snapshot_messages(request)[before:]
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status=IdempotencyKey.DONE,
+                response_status=response.status_code,
+                response_location=response.get("Location", "")[:500],
+                response_messages=[[m.level, str(m.message), m.extra_tags] for m in added],
+            )
+            return response
+
+        return _wrapped
+
+    return decorator
+
+
+def purge_expired_keys(now=None) -> int:
+    """만료된 멱등 키 삭제, 지운 행 수 반환"""
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
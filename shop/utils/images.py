@@ -0,0 +1,141 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# 썸네일 가로 크기(px). 원본보다 큰 크기는 만들지 않고 원본 너비로 대신한다.
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+# 파생 이미지 목록 캐시 (원본 이름 기준, 업로드 때마다 새 이름이므로 오래 둬도 안전)
+_META_TIMEOUT = 60 * 60 * 24
+
+# 상품/리뷰 모델에서 파생 이미지를 만드는 필드
+PRODUCT_IMAGE_FIELDS = (
+    "image1", "image2", "image3", "image4", "image5", "description_image1", "description_image2",
+)
+REVIEW_IMAGE_FIELDS = ("image",)
+
+
+def derivatives_on_upload() -> bool:
+    """settings.IMAGE_DERIVATIVES_ON_UPLOAD = False 면 업로드 때 만들지 않고 첫 요청 때 만든다"""
+    return getattr(settings, "IMAGE_DERIVATIVES_ON_UPLOAD", True)
+
+
+def _fallback_ext(name: str) -> str:
+    # PNG/GIF 등 투명도가 있을 수 있는 원본은 PNG로, 나머지는 JPEG
+    return ".jpg" if os.path.splitext(name)[1].lower() in (".jpg", ".jpeg") else ".png"
+
+
+def derivative_name(name: str, width: int, fmt: str) -> str:
+    """
+    products/3/apple.png -> products/3/apple.png.w320.webp (원본과 같은 디렉터리)
+    원본 확장자까지 이름에 남겨 apple.png / apple.jpg 가 같은 파생 이미지를 공유하지 않게 한다.
+    """
+    ext = ".webp" if fmt == "webp" else _fallback_ext(name)
+    return f"{name}.w{width}{ext}"
+
+
+def _targets(name: str, width: int):
+    return [derivative_name(name, width, fmt) for fmt in ("webp", "fallback")]
+
+
+def _existing_widths(storage, name: str):
+    """
+    원본을 열지 않고 저장소만 보고 파생 이미지가 다 있는지 확인.
+    DERIVATIVE_WIDTHS가 전부 있으면 그 목록, 하나라도 빠졌으면 None (원본 크기를 봐야 판단 가능)
+    """
+    for width in DERIVATIVE_WIDTHS:
+        if not all(storage.exists(t) for t in _targets(name, width)):
+            return None
+    return list(DERIVATIVE_WIDTHS)
+
+
+def _oriented_size(img: Image.Image):
+    # EXIF 회전(5~8)이면 exif_transpose 후 가로/세로가 바뀐다 (헤더만 읽음, 디코딩 없음)
+    width, height = img.size
+    return (height, width) if img.getexif().get(0x0112) in (5, 6, 7, 8) else (width, height)
+
+
+def _meta_key(name: str) -> str:
+    return f"imgderiv:{name}"
+
+
+def _encode(img: Image.Image, ext: str) -> bytes:
+    buf = io.BytesIO()
+    if ext == ".webp":
+        img.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+    elif ext == ".jpg":
+        img.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        img.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def ensure_derivatives(fieldfile):
+    """
+    원본 이미지 옆에 가로 크기별 썸네일(원본 형식) + WebP를 만든다. 이미 있으면 건너뜀.
+    반환: 만들어진 가로 크기 목록 (원본이 없거나 이미지가 아니면 [])
+    """
+    if not fieldfile or not fieldfile.name:
+        return []
+    name = fieldfile.name
+    widths = cache.get(_meta_key(name))
+    if widths is not None:
+        return widths
+
+    storage = fieldfile.storage
+    if not storage.exists(name):
+        return []
+    widths = _existing_widths(storage, name)
+    if widths is not None:
+        cache.set(_meta_key(name), widths, _META_TIMEOUT)
+        return widths
+
+    try:
+        with storage.open(name, "rb") as f:
+            # Image.open은 헤더만 읽는다. 실제 디코딩(load)은 빠진 파생 이미지가 있을 때만
+            original = Image.open(f)
+            width, _ = _oriented_size(original)
+            widths = sorted({min(w, width) for w in DERIVATIVE_WIDTHS})
+            missing = [w for w in widths if not all(storage.exists(t) for t in _targets(name, w))]
+            if missing:
+                original.load()
+    except (UnidentifiedImageError, OSError):
+        return []
+
+    if missing:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ("RGB", "RGBA"):
+            original = original.convert("RGBA" if "A" in original.getbands() or original.mode == "P" else "RGB")
+        for width in missing:
+            height = max(1, round(original.height * width / original.width))
+            resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+            for target in _targets(name, width):
+                if not storage.exists(target):
+                    storage.save(target, ContentFile(_encode(resized, os.path.splitext(target)[1])))
+
+    cache.set(_meta_key(name), widths, _META_TIMEOUT)
+    return widths
+
+
+def image_srcset(fieldfile, fmt: str = "webp") -> str:
+    """'url 320w, url 640w, ...' (파생 이미지가 없으면 빈 문자열 -> 원본 사용)"""
+    storage = fieldfile.storage
+    return ", ".join(
+        f"{storage.url(derivative_name(fieldfile.name, w, fmt))} {w}w" for w in ensure_derivatives(fieldfile)
+    )
+
+
+def thumbnail_url(fieldfile, width: int, fmt: str = "fallback") -> str:
+    """width 이상인 가장 작은 파생 이미지 URL (없으면 원본 URL)"""
+    widths = ensure_derivatives(fieldfile)
+    if not widths:
+        return fieldfile.url
+    chosen = next((w for w in widths if w >= width), widths[-1])
+    return fieldfile.storage.url(derivative_name(fieldfile.name, chosen, fmt))
+
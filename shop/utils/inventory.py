@@ -0,0 +1,69 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable
+
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from account.models import Account
+from shop.models import Product
+
+
+def cart_quantities(cart_items: Iterable) -> Dict[int, int]:
+    """장바구니 행 -> {product_id: 총 수량} (같은 상품이 여러 행이어도 합산)"""
+    quantities: Dict[int, int] = defaultdict(int)
+    for item in cart_items:
+        quantities[item.product_id] += item.quantity
+    return dict(quantities)
+
+
+def lock_products(product_ids: Iterable[int]) -> Dict[int, Product]:
+    """
+    결제 대상 상품을 SELECT ... FOR UPDATE 한 번으로 잠그고 {id: Product}로 반환.
+    - 항상 id 오름차순으로 잠가서 동시 결제끼리 교착(deadlock)이 나지 않게 한다.
+    - 호출하는 쪽의 transaction.atomic() 안에서 불러야 한다.
+    """
+    ids = sorted(set(product_ids))
+    return {p.id: p for p in Product.objects.select_for_update().filter(id__in=ids).order_by("id")}
+
+
+def decrement_stock(quantities: Dict[int, int]) -> bool:
+    """
+    상품별 재고를 UPDATE 한 번으로 차감한다.
+        UPDATE product SET stock = CASE id WHEN .. THEN stock - qty .. END
+        WHERE (id = .. AND stock >= qty) OR ...
+    재고가 모자란 상품은 WHERE에서 빠지므로 갱신된 행 수가 상품 수보다 적으면 False.
+    False면 호출하는 쪽에서 예외를 던져 트랜잭션을 롤백해야 한다(일부만 차감된 상태가 남지 않게).
+    """
+    if not quantities:
+        return True
+
+    cond = Q()
+    whens = []
+    for product_id, qty in quantities.items():
+        cond |= Q(id=product_id, stock__gte=qty)
+        whens.append(When(id=product_id, then=F("stock") - Value(qty)))
+
+    updated = Product.objects.filter(cond).update(
+        stock=Case(*whens, default=F("stock"), output_field=IntegerField())
+    )
+    return updated == len(quantities)
+
+
+def debit_balance(account: Account, amount: Decimal) -> bool:
+    """
+    계좌 잔액을 UPDATE ... WHERE balance >= amount 한 번으로 차감.
+    잔액이 모자라면 False. 성공하면 메모리의 account.balance도 같이 차감해 둔다.
+    """
+    updated = Account.objects.filter(pk=account.pk, balance__gte=amount).update(
+        balance=F("balance") - amount
+    )
+    if not updated:
+        return False
+    account.balance -= amount
+    return True
+
+
+def credit_balance(account: Account, amount: Decimal) -> None:
+    """계좌 잔액을 UPDATE ... SET balance = balance + amount 로 증가 (동시 충전끼리 값을 덮어쓰지 않게)"""
+    Account.objects.filter(pk=account.pk).update(balance=F("balance") + amount)
+    account.balance += amount
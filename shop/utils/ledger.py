@@ -0,0 +1,256 @@
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, Count, DateField, DecimalField, F, Max, Sum, Value, When
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from shop.models import LedgerMonthlyRollup, Transaction, UserLedgerSummary
+from shop.utils.tx_query import IN_TYPES, OUT_TYPES
+from shop.utils.tx_summary import day_start
+
+
+def month_key(occurred_at) -> date:
+    """거래 일시 -> 집계 키(현지 시간 기준 해당월 1일)"""
+    return timezone.localtime(occurred_at).date().replace(day=1)
+
+
+def _split_amount(tx) -> Tuple[Decimal, Decimal]:
+    amount = Decimal(str(tx.amount or 0))
+    if tx.tx_type in IN_TYPES:
+        return amount, Decimal("0")
+    if tx.tx_type in OUT_TYPES:
+        return Decimal("0"), amount
+    return Decimal("0"), Decimal("0")
+
+
+def _raw_rollups(user) -> List[dict]:
+    """원본 Transaction에서 (계좌, 월)별 IN/OUT 합계를 다시 계산"""
+    return list(
+        Transaction.objects.filter(user=user)
+        .annotate(m=TruncMonth("occurred_at", output_field=DateField()))
+        .values("account_id", "m")
+        .annotate(
+            _in=Sum(
+                Case(
+                    When(tx_type__in=IN_TYPES, then="amount"),
+                    default=Value(0),
+                    output_field=DecimalField(),
+                )
+            ),
+            _out=Sum(
+                Case(
+                    When(tx_type__in=OUT_TYPES, then="amount"),
+                    default=Value(0),
+                    output_field=DecimalField(),
+                )
+            ),
+        )
+        .order_by("account_id", "m")
+    )
+
+
+@transaction.atomic
+def rebuild_ledger(user) -> UserLedgerSummary:
+    """
+    user의 집계 테이블을 원본 거래내역으로부터 통째로 다시 만든다.
+    (관리자 수정, 계좌 삭제 등 증분 갱신을 거치지 않은 변경 이후 사용)
+    """
+    rows = _raw_rollups(user)
+
+    LedgerMonthlyRollup.objects.filter(user=user).delete()
+    LedgerMonthlyRollup.objects.bulk_create(
+        [
+            LedgerMonthlyRollup(
+                user=user,
+                account_id=r["account_id"],
+                month=r["m"],
+                total_in=r["_in"] or 0,
+                total_out=r["_out"] or 0,
+            )
+            for r in rows
+        ]
+    )
+
+    total_in = sum((r["_in"] or 0 for r in rows), Decimal("0"))
+    total_out = sum((r["_out"] or 0 for r in rows), Decimal("0"))
+    summary, _ = UserLedgerSummary.objects.update_or_create(
+        user=user,
+        defaults={"total_in": total_in, "total_out": total_out},
+    )
+    return summary
+
+
+def _locked_summary(user) -> UserLedgerSummary:
+    """
+    user의 누적 합계 행을 SELECT ... FOR UPDATE 로 잠가서 반환 (없으면 0으로 만든다).
+    같은 사용자의 집계 갱신이 이 행에서 줄을 서므로, 월별 집계 get_or_create 도 동시에 겹치지 않는다.
+    """
+    summary = UserLedgerSummary.objects.select_for_update().filter(user=user).first()
+    if summary is None:
+        # 회원가입 시그널/백필 마이그레이션을 거치지 않은 사용자 (동시 생성은 get_or_create가 처리)
+        UserLedgerSummary.objects.get_or_create(user=user)
+        summary = UserLedgerSummary.objects.select_for_update().get(user=user)
+    return summary
+
+
+@transaction.atomic
+def apply_ledger_entries(user, txs: Iterable[Transaction]) -> None:
+    """
+    새로 만든 Transaction들을 집계 테이블에 증분 반영.
+    - 호출하는 뷰의 transaction.atomic() 안에서 불러야 거래와 집계가 함께 커밋/롤백된다.
+    - 누적 합계 행을 먼저 잠그고 F() 로 더하므로 같은 사용자의 동시 결제/충전도 합계가 어긋나지 않는다.
+    """
+    txs = list(txs)
+    if not txs:
+        return
+
+    _locked_summary(user)
+
+    total_in = Decimal("0")
+    total_out = Decimal("0")
+    per_month: Dict[Tuple[int, date], List[Decimal]] = defaultdict(
+        lambda: [Decimal("0"), Decimal("0")]
+    )
+    for tx in txs:
+        tx_in, tx_out = _split_amount(tx)
+        total_in += tx_in
+        total_out += tx_out
+        bucket = per_month[(tx.account_id, month_key(tx.occurred_at))]
+        bucket[0] += tx_in
+        bucket[1] += tx_out
+
+    UserLedgerSummary.objects.filter(user=user).update(
+        total_in=F("total_in") + total_in,
+        total_out=F("total_out") + total_out,
+        updated_at=timezone.now(),
+    )
+
+    for (account_id, month), (m_in, m_out) in per_month.items():
+        rollup, created = LedgerMonthlyRollup.objects.get_or_create(
+            user=user,
+            account_id=account_id,
+            month=month,
+            defaults={"total_in": m_in, "total_out": m_out},
+        )
+        if not created:
+            LedgerMonthlyRollup.objects.filter(pk=rollup.pk).update(
+                total_in=F("total_in") + m_in,
+                total_out=F("total_out") + m_out,
+            )
+
+
+def apply_ledger_entry(tx: Transaction) -> None:
+    """Transaction 1건 반영 (apply_ledger_entries 단건 버전)"""
+    apply_ledger_entries(tx.user, [tx])
+
+
+def get_ledger_summary(user) -> UserLedgerSummary:
+    """누적 IN/OUT 합계 행. 없으면 (저장하지 않은) 0 합계 행을 반환 (조회에서는 쓰기 없음)."""
+    summary = UserLedgerSummary.objects.filter(user=user).first()
+    if summary is None:
+        summary = UserLedgerSummary(user=user)
+    return summary
+
+
+def rollup_totals(
+    user,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    account=None,
+) -> Tuple[Decimal, Decimal]:
+    """
+    월별 집계에서 IN/OUT 합계.
+    - start: 포함(해당월 1일), end: 미포함(다음달 1일)
+    - account가 None이면 계좌 상관없이(전체)
+    """
+    qs = LedgerMonthlyRollup.objects.filter(user=user)
+    if start:
+        qs = qs.filter(month__gte=start)
+    if end:
+        qs = qs.filter(month__lt=end)
+    if account is not None:
+        qs = qs.filter(account=account)
+
+    s = qs.aggregate(_in=Sum("total_in"), _out=Sum("total_out"))
+    return s["_in"] or Decimal("0"), s["_out"] or Decimal("0")
+
+
+def monthly_series(user, start: Optional[date] = None, end: Optional[date] = None):
+    """월별 IN/OUT 시계열 [(month, in, out), ...] (계좌 합산, 월 오름차순)"""
+
+    qs = LedgerMonthlyRollup.objects.filter(user=user)
+    if start:
+        qs = qs.filter(month__gte=start)
+    if end:
+        qs = qs.filter(month__lt=end)
+
+    rows = (
+        qs.values("month")
+        .annotate(income=Sum("total_in"), expense=Sum("total_out"))
+        .order_by("month")
+    )
+    return [(r["month"], r["income"] or 0, r["expense"] or 0) for r in rows]
+
+
+def category_series(
+    user,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category_id=None,
+) -> List[Tuple[str, Decimal]]:
+    """카테고리별 지출 합계 [(카테고리 이름, 합계), ...] (합계 내림차순, 기간은 [start, end) 월)"""
+    qs = Transaction.objects.filter(user=user, tx_type__in=OUT_TYPES)
+    if start:
+        qs = qs.filter(occurred_at__gte=day_start(start))
+    if end:
+        qs = qs.filter(occurred_at__lt=day_start(end))
+    if category_id:
+        qs = qs.filter(category_id=category_id)
+
+    rows = qs.values("category__name").annotate(total=Sum("amount")).order_by("-total")
+    return [(r["category__name"] or "미분류", r["total"] or 0) for r in rows]
+
+
+def ledger_version(user) -> str:
+    """
+    사용자 거래내역의 버전 문자열 (요약/차트 API의 ETag 재료).
+    거래 추가 -> 최대 id, 수정 -> 최대 updated_at, 삭제 -> 건수가 바뀐다. (쿼리 1번, 집계 계산 없음)
+    """
+    s = Transaction.objects.filter(user=user).aggregate(n=Count("id"), last_id=Max("id"), last=Max("updated_at"))
+    last = s["last"].timestamp() if s["last"] else 0
+    return f"{s['n']}-{s['last_id'] or 0}-{last:.6f}"
+
+
+def verify_ledger(user) -> List[str]:
+    """저장된 집계와 원본 거래 재계산 결과를 비교해 어긋난 항목 설명을 반환 (비어 있으면 정상)"""
+    problems = []
+    raw = {(r["account_id"], r["m"]): (r["_in"] or 0, r["_out"] or 0) for r in _raw_rollups(user)}
+    stored = {
+        (r.account_id, r.month): (r.total_in, r.total_out)
+        for r in LedgerMonthlyRollup.objects.filter(user=user)
+    }
+
+    for key in sorted(set(raw) | set(stored), key=lambda k: (k[0], k[1])):
+        expected = raw.get(key, (0, 0))
+        actual = stored.get(key, (0, 0))
+        if tuple(map(Decimal, expected)) != tuple(map(Decimal, actual)):
+            account_id, month = key
+            problems.append(
+                f"account={account_id} month={month:%Y-%m} expected={expected} stored={actual}"
+            )
+
+    exp_in = sum((v[0] for v in raw.values()), Decimal("0"))
+    exp_out = sum((v[1] for v in raw.values()), Decimal("0"))
+    summary = UserLedgerSummary.objects.filter(user=user).first()
+    if summary is None:
+        if exp_in or exp_out:
+            problems.append(f"summary missing expected=({exp_in}, {exp_out})")
+    elif (summary.total_in, summary.total_out) != (exp_in, exp_out):
+        problems.append(
+            f"summary expected=({exp_in}, {exp_out}) stored=({summary.total_in}, {summary.total_out})"
+        )
+    return problems
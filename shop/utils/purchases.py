@@ -0,0 +1,33 @@
+from typing import Iterable
+
+from shop.backfills import fill_purchases
+from shop.models import Product, Transaction, UserProductPurchase
+from shop.utils.tx_query import OUT_TYPES
+
+# 구매로 인정하는 거래 유형 (예전 데이터의 "buy" 포함)
+PURCHASE_TX_TYPES = OUT_TYPES
+
+
+def record_purchases(user_id: int, product_ids: Iterable[int], purchased_at) -> None:
+    """결제 트랜잭션 안에서 호출: (사용자, 상품) 구매 이력 기록 (이미 있으면 그대로)"""
+    rows = [
+        UserProductPurchase(user_id=user_id, product_id=product_id, first_purchased_at=purchased_at)
+        for product_id in sorted({pid for pid in product_ids if pid})
+    ]
+    if rows:
+        UserProductPurchase.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def has_purchased(user, product) -> bool:
+    """리뷰 작성 자격: (user, product) 기본키 조회 한 번"""
+    if not user.is_authenticated:
+        return False
+    return UserProductPurchase.objects.filter(pk=(user.pk, product.pk)).exists()
+
+
+def backfill_purchases(user_ids=None, batch_size: int = 1000) -> int:
+    """
+    기존 거래내역으로 구매 이력 채우기 (만든 행 수 반환, 여러 번 실행해도 안전)
+    규칙은 shop.backfills.fill_purchases (데이터 마이그레이션 0012와 같은 함수)
+    """
+    return fill_purchases(Transaction, Product, UserProductPurchase, PURCHASE_TX_TYPES, user_ids, batch_size)
@@ -0,0 +1,57 @@
+from decimal import Decimal
+from typing import Dict
+
+from account.models import Account
+from shop.models import Product, UserCoupon
+from shop.utils.inventory import debit_balance, decrement_stock, lock_products
+
+
+class ReservationError(Exception):
+    """잔액/재고 확보 실패 (뷰에서 그대로 사용자 메시지로 노출)"""
+
+
+def reserve_order(account: Account, quantities: Dict[int, int], amount: Decimal) -> None:
+    """
+    결제 1건에 필요한 잔액과 재고를 확보(차감)한다. 실패하면 ReservationError.
+    - 반드시 호출하는 쪽의 transaction.atomic() 안에서 불러야 한다
+      (예외가 나면 앞에서 차감된 잔액/재고도 함께 롤백된다).
+    - 잠금 순서는 항상 계좌 -> 상품(id 오름차순)으로 고정해서 동시 결제끼리 교착이 생기지 않게 한다.
+    - 값은 읽어서 되쓰지 않고 조건부 UPDATE(balance >= amount, stock >= qty)로만 바꾸므로
+      동시에 들어온 결제가 서로의 차감을 덮어쓰거나 재고를 음수로 만들 수 없다.
+    - 상품이 1종이면(바로구매, 인기 상품 구간) SELECT ... FOR UPDATE 없이 UPDATE 한 번이 곧 잠금이라
+      같은 상품 구매자끼리는 UPDATE~커밋 구간만 줄을 서고, 다른 상품 구매와는 서로 막지 않는다.
+    """
+    if not debit_balance(account, amount):
+        raise ReservationError("잔액이 부족합니다.")
+
+    if len(quantities) > 1:
+        # 여러 상품: id 순서로 먼저 잠가 두면 뒤의 UPDATE가 다른 결제와 엇갈린 순서로 잠그지 않는다
+        locked = lock_products(quantities)
+        for product_id, qty in quantities.items():
+            product = locked.get(product_id)
+            if product is None:
+                raise ReservationError("판매가 종료된 상품이 있습니다.")
+            if product.stock < qty:
+                raise ReservationError(f"[{product.name}] 재고 부족")
+
+    if not decrement_stock(quantities):
+        # 실패한 경우에만 어떤 상품이 부족했는지 이름을 찾아서 알려 준다
+        stocks = Product.objects.filter(id__in=list(quantities)).values_list("id", "name", "stock")
+        for product_id, name, stock in stocks:
+            if stock < quantities[product_id]:
+                raise ReservationError(f"[{name}] 재고 부족")
+        raise ReservationError("재고 부족")
+
+
+def use_coupon(user_coupon: UserCoupon, used_at) -> None:
+    """
+    쿠폰 사용 처리. is_used=False 인 행만 UPDATE 해서
+    같은 쿠폰으로 동시에 들어온 두 번째 결제는 ReservationError로 롤백시킨다.
+    """
+    updated = UserCoupon.objects.filter(pk=user_coupon.pk, is_used=False).update(
+        is_used=True, used_at=used_at
+    )
+    if not updated:
+        raise ReservationError("이미 사용된 쿠폰입니다.")
+    user_coupon.is_used = True
+    user_coupon.used_at = used_at
@@ -0,0 +1,83 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from shop.models import Review, ReviewImage
+from shop.utils.cursor import CursorPage, paginate_by_cursor
+
+# 상품 상세 리뷰 목록: 최신순, 한 번에 REVIEW_PAGE_SIZE개씩 ("더 보기"는 커서로 이어서)
+REVIEW_PAGE_SIZE = 10
+REVIEW_ORDERING = ["-created_at", "-id"]
+
+
+def _timeout() -> int:
+    return getattr(settings, "REVIEW_FEED_CACHE_TIMEOUT", 300)
+
+
+def _version_key(product_id) -> str:
+    return f"reviews:version:{product_id}"
+
+
+def _feed_version(product_id) -> int:
+    version = cache.get(_version_key(product_id))
+    if version is None:
+        cache.add(_version_key(product_id), time.time_ns(), None)
+        version = cache.get(_version_key(product_id))
+    return version
+
+
+def bump_review_feed(product_id) -> None:
+    """리뷰/리뷰 이미지가 바뀌면 해당 상품의 첫 페이지 캐시 무효화 (shop.signals)"""
+    try:
+        cache.incr(_version_key(product_id))
+    except ValueError:
+        cache.set(_version_key(product_id), time.time_ns(), None)
+
+
+def review_queryset(product_id):
+    # 작성자 이름/이미지를 템플릿에서 리뷰마다 조회하지 않도록
+    return Review.objects.filter(product_id=product_id).select_related("user").prefetch_related("images")
+
+
+def _to_cache(review) -> tuple:
+    # 캐시에는 템플릿에 필요한 값만 (User 행 전체/비밀번호 해시 등은 넣지 않음)
+    return (
+        review.id,
+        review.user_id,
+        review.user.username,
+        review.rating,
+        review.content,
+        review.created_at,
+        [(img.id, img.image.name) for img in review.image_list],
+    )
+
+
+def _from_cache(product_id, row) -> Review:
+    review_id, user_id, username, rating, content, created_at, images = row
+    review = Review(
+        id=review_id, product_id=product_id, user_id=user_id, rating=rating, content=content, created_at=created_at
+    )
+    review.user = get_user_model()(pk=user_id, username=username)
+    review.image_list = [ReviewImage(id=img_id, review_id=review_id, image=name) for img_id, name in images]
+    return review
+
+
+def review_page(product_id, cursor=None) -> CursorPage:
+    """
+    리뷰 한 페이지. 커서가 없으면(상세 페이지 첫 화면) 상품별로 캐시한다.
+    - 캐시에는 리뷰 id와 화면에 쓰는 값(작성자 이름, 이미지 경로 등)만 두고 Review 객체로 복원한다
+    - 수정/삭제 버튼 등 사용자별 부분은 템플릿에서 그린다
+    """
+    if cursor:
+        return paginate_by_cursor(review_queryset(product_id), REVIEW_ORDERING, cursor, REVIEW_PAGE_SIZE)
+
+    key = f"reviews:first:{product_id}:{_feed_version(product_id)}"
+    cached = cache.get(key)
+    if cached is None:
+        page = paginate_by_cursor(review_queryset(product_id), REVIEW_ORDERING, None, REVIEW_PAGE_SIZE)
+        cache.set(key, ([_to_cache(r) for r in page.object_list], page.has_next()), _timeout())
+        return page
+    rows, has_next = cached
+    return CursorPage([_from_cache(product_id, row) for row in rows], has_next, False, REVIEW_ORDERING)
@@ -0,0 +1,105 @@
+from collections import Counter
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast, Round
+
+from shop.models import Product, Review
+from shop.utils.catalog import bump_catalog_version
+
+RATINGS = (1, 2, 3, 4, 5)
+
+_AVG_FIELD = DecimalField(max_digits=3, decimal_places=2)
+
+
+def parse_rating(value):
+    """폼 입력 별점 -> 1~5 int (잘못된 값이면 None)"""
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        return None
+    return rating if rating in RATINGS else None
+
+
+def _average(total, count, empty_when: Q):
+    """total / count 를 소수 둘째 자리까지 (리뷰가 0개가 되면 0)"""
+    # 정수 나눗셈이 되지 않게 합계를 실수로 바꾼 뒤 나눈다
+    # (SQLite는 NUMERIC/Decimal 리터럴을 곱해도 정수 나눗셈이 됨, PostgreSQL ROUND는 Round가 numeric으로 캐스팅)
+    ratio = ExpressionWrapper(Cast(total, FloatField()) / count, output_field=FloatField())
+    return Case(
+        When(empty_when, then=Value(Decimal("0"))),
+        default=Round(ratio, 2),
+        output_field=_AVG_FIELD,
+    )
+
+
+def apply_review_change(product_id: int, added: Iterable[int] = (), removed: Iterable[int] = ()) -> None:
+    """
+    리뷰 작성(added) / 삭제(removed) / 별점 수정(removed=[old], added=[new])을 상품 통계에 반영.
+    - UPDATE 한 번에 F()로 더하고 빼므로 동시에 리뷰가 달려도 값이 유실되지 않는다
+    - 평균도 같은 UPDATE에서 (기존 합 + 변화량) / (기존 개수 + 변화량)으로 계산
+    - 리뷰 저장과 같은 transaction.atomic() 안에서 호출
+    """
+    added, removed = list(added), list(removed)
+    d_count = len(added) - len(removed)
+    d_sum = sum(added) - sum(removed)
+    hist = Counter(added)
+    hist.subtract(removed)
+    if not d_count and not any(hist.values()):
+        return
+
+    new_count = F("review_count") + d_count
+    new_sum = F("rating_sum") + d_sum
+    updates = {
+        "review_count": new_count,
+        "rating_sum": new_sum,
+        "rating_avg": _average(new_sum, new_count, Q(review_count__lte=-d_count)),
+    }
+    for rating, delta in hist.items():
+        if delta:
+            updates[f"rating_{rating}"] = F(f"rating_{rating}") + delta
+    Product.objects.filter(pk=product_id).update(**updates)
+
+    # 별점/리뷰 수 정렬 결과가 카탈로그 캐시에 있으므로 커밋 후 무효화
+    transaction.on_commit(bump_catalog_version)
+
+
+def rebuild_review_stats(product_ids=None) -> int:
+    """원본 Review로 상품 리뷰 통계를 다시 계산 (어드민 삭제/CASCADE 등 뷰를 거치지 않은 변경 복구용)"""
+    products = Product.objects.all()
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+
+    aggregates = {
+        row["product_id"]: row
+        for row in Review.objects.filter(product__in=products)
+        .values("product_id")
+        .annotate(
+            count=Count("id"),
+            total=Sum("rating"),
+            **{f"r{r}": Count("id", filter=Q(rating=r)) for r in RATINGS},
+        )
+    }
+    updated = []
+    for product in products.only("id"):
+        row = aggregates.get(product.id) or {}
+        product.review_count = row.get("count", 0)
+        product.rating_sum = row.get("total") or 0
+        product.rating_avg = (
+            (Decimal(product.rating_sum) / product.review_count).quantize(Decimal("0.01"))
+            if product.review_count
+            else Decimal("0")
+        )
+        for r in RATINGS:
+            setattr(product, f"rating_{r}", row.get(f"r{r}", 0))
+        updated.append(product)
+
+    Product.objects.bulk_update(
+        updated,
+        ["review_count", "rating_sum", "rating_avg", *(f"rating_{r}" for r in RATINGS)],
+        batch_size=500,
+    )
+    bump_catalog_version()
+    return len(updated)
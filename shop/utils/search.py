@@ -0,0 +1,70 @@
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, IntegerField, Q, Value, When
+from django.db.models.functions import Cast
+
+from shop.models import normalize_search_text
+
+# 검색어는 공백으로 나눈 단어 전부가 포함된 상품만 (너무 긴 입력은 앞쪽만 사용)
+MAX_SEARCH_TERMS = 5
+
+# 관련도 가중치: 상품명 > 카테고리명 > 설명
+NAME_WEIGHT = 4
+CATEGORY_WEIGHT = 2
+
+
+class WordSimilarity(Func):
+    """pg_trgm word_similarity(검색어, 텍스트): 0~1, 부분 일치/오타에 가까울수록 큼 (PostgreSQL 전용)"""
+    function = "word_similarity"
+    output_field = FloatField()
+
+
+def search_terms(q: str) -> list:
+    return normalize_search_text(q).split()[:MAX_SEARCH_TERMS]
+
+
+def search_products(qs, q: str):
+    """
+    Product 쿼리셋을 검색어로 거르고 관련도(search_rank)를 붙여 반환.
+    - Product.search_text(상품명/카테고리명/설명 정규화 텍스트)에 단어별 LIKE '%단어%'
+      -> PostgreSQL에서는 pg_trgm GIN 인덱스(3글자 n-gram)가 처리하므로 한글 부분 일치도 인덱스 사용
+    - 순위: 상품명/카테고리명에 들어있으면 가산점 + (PostgreSQL) word_similarity
+    - 검색어가 비어 있으면 그대로 반환 (search_rank = 0)
+    """
+    terms = search_terms(q)
+    if not terms:
+        return qs.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    cond = Q()
+    for term in terms:
+        cond &= Q(search_text__contains=term)
+    qs = qs.filter(cond)
+
+    phrase = " ".join(terms)
+    rank = Case(
+        When(name__icontains=phrase, then=Value(NAME_WEIGHT)), default=Value(0), output_field=IntegerField()
+    ) + Case(
+        When(category__name__icontains=phrase, then=Value(CATEGORY_WEIGHT)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    rank = Cast(rank, FloatField())
+    if connection.vendor == "postgresql":
+        rank = rank + WordSimilarity(Value(phrase), F("search_text"))
+    return qs.annotate(search_rank=rank)
+
+
+def order_products(qs, sort_option: str):
+    """목록 정렬 (relevance는 search_products를 거친 쿼리셋에서만 의미 있음)"""
+    if sort_option == "price_low":
+        return qs.order_by("price", "-id")
+    if sort_option == "price_high":
+        return qs.order_by("-price", "-id")
+    if sort_option == "rating":
+        # 별점 높은 순 (같으면 리뷰 많은 순) - product_rating_idx
+        return qs.order_by("-rating_avg", "-review_count", "-id")
+    if sort_option == "reviews":
+        # 리뷰 많은 순 - product_review_count_idx
+        return qs.order_by("-review_count", "-id")
+    if sort_option == "relevance":
+        return qs.order_by("-search_rank", "-id")
+    return qs.order_by("-id")
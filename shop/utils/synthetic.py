@@ -0,0 +1,521 @@
+import calendar
+import random
+import re
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from account.models import Account, Address, Bank
+from shop.models import (
+    Category,
+    Coupon,
+    LedgerMonthlyRollup,
+    Product,
+    Transaction,
+    UserCoupon,
+    UserLedgerSummary,
+    UserProductPurchase,
+)
+from shop.utils.catalog import bump_catalog_version
+from shop.utils.ledger import month_key
+
+User = get_user_model()
+
+# 시드 사용자 이름/쿠폰 코드 접두어 (쿠폰 code max_length=20 안에 들어가도록 짧게)
+PREFIX_RE = re.compile(r"^[a-z][a-z0-9]{0,11}$")
+
+# 모든 시드 상품이 같이 쓰는 대표 이미지 (파생 썸네일은 첫 렌더링 때 생성)
+PLACEHOLDER_IMAGE = "products/seed/placeholder.png"
+
+# (카테고리, 구매 비중, 가격 중앙값, 품목)
+CATEGORY_PROFILES = [
+    ("식료품", 30, 12000, ["생수 2L 묶음", "햇반 12개입", "유기농 계란 30구", "닭가슴살 10팩", "원두 1kg", "김치 5kg"]),
+    ("생활용품", 15, 15000, ["세탁세제", "키친타월", "두루마리 휴지", "주방세제", "섬유유연제", "물티슈"]),
+    ("의류", 12, 39000, ["맨투맨", "청바지", "패딩 점퍼", "반팔 티셔츠", "운동화", "양말 세트"]),
+    ("화장품", 10, 25000, ["선크림", "수분크림", "클렌징폼", "립밤", "샴푸", "바디로션"]),
+    ("도서", 6, 16000, ["소설", "에세이", "자기계발서", "요리책", "만화 세트", "여행 가이드"]),
+    ("디지털", 5, 89000, ["무선 이어폰", "보조배터리", "USB-C 케이블", "키보드", "마우스", "태블릿 케이스"]),
+    ("스포츠", 5, 35000, ["요가매트", "덤벨", "러닝화", "등산 스틱", "수영 고글", "폼롤러"]),
+    ("가전", 4, 249000, ["에어프라이어", "전기포트", "로봇청소기", "공기청정기", "드라이기", "전자레인지"]),
+    ("반려동물", 4, 29000, ["사료 6kg", "고양이 모래", "배변패드", "간식 세트", "장난감", "캣타워"]),
+    ("가구", 3, 159000, ["책상", "의자", "수납장", "침대 프레임", "선반", "조명"]),
+    ("건강식품", 3, 32000, ["종합비타민", "유산균", "오메가3", "홍삼정", "단백질 파우더", "루테인"]),
+    ("문구", 3, 6000, ["볼펜 세트", "노트", "포스트잇", "다이어리", "형광펜", "파일철"]),
+]
+BRANDS = ["한빛", "바른", "모아", "온새미로", "데일리", "그린", "스마트", "프라임", "하루", "누리"]
+
+# 월별 계절성 (11~12월 쇼핑 시즌, 2월 비수기)
+SEASONALITY = {1: 1.1, 2: 0.85, 3: 0.95, 4: 0.95, 5: 1.0, 6: 0.95, 7: 1.05, 8: 1.05, 9: 1.0, 10: 1.0, 11: 1.25, 12: 1.4}
+# 최근 월일수록 거래가 많음 (월 3% 성장)
+MONTHLY_GROWTH = 1.03
+# 시간대별 거래 비중 (0시~23시, 점심/저녁 피크)
+HOUR_WEIGHTS = [2, 1, 1, 1, 1, 1, 2, 4, 6, 7, 7, 8, 10, 9, 8, 8, 8, 9, 10, 12, 13, 12, 9, 5]
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN = "민서지현우준수영하윤도연예은성재진주원호유나"
+CITIES = [
+    ("서울특별시 강남구 테헤란로", "06"), ("서울특별시 마포구 월드컵북로", "03"), ("서울특별시 송파구 올림픽로", "05"),
+    ("부산광역시 해운대구 센텀중앙로", "48"), ("대구광역시 수성구 달구벌대로", "42"), ("인천광역시 연수구 컨벤시아대로", "21"),
+    ("광주광역시 서구 상무중앙로", "61"), ("대전광역시 유성구 대학로", "34"), ("경기도 성남시 분당구 판교역로", "13"),
+    ("경기도 수원시 영통구 광교중앙로", "16"), ("제주특별자치도 제주시 연동", "63"),
+]
+
+# 구매 수량 분포 (누적 가중치)
+QUANTITIES = [1, 2, 3, 4, 5]
+QUANTITY_CUM = [70, 90, 95, 98, 100]
+
+# 입금(충전) 비율 / 쿠폰 사용 비율 / 영수증 숨김 비율
+CHARGE_RATE = 0.12
+COUPON_RATE = 0.08
+HIDDEN_RECEIPT_RATE = 0.02
+
+
+def placeholder_image() -> str:
+    """시드 상품 대표 이미지 (없으면 한 번 만들어 둠)"""
+    if not default_storage.exists(PLACEHOLDER_IMAGE):
+        from PIL import Image
+
+        buf = BytesIO()
+        Image.new("RGB", (640, 640), (230, 232, 236)).save(buf, format="PNG")
+        default_storage.save(PLACEHOLDER_IMAGE, ContentFile(buf.getvalue()))
+    return PLACEHOLDER_IMAGE
+
+
+def month_starts(months: int, today: date) -> list:
+    """오늘이 속한 달부터 거꾸로 months개월의 1일 (오래된 순)"""
+    y, m = today.year, today.month
+    result = []
+    for _ in range(months):
+        result.append(date(y, m, 1))
+        y, m = (y - 1, 12) if m == 1 else (y, m - 1)
+    return result[::-1]
+
+
+def _cum(weights) -> list:
+    total, out = 0.0, []
+    for w in weights:
+        total += w
+        out.append(total)
+    return out
+
+
+class ScaleSeeder:
+    """
+    대용량 테스트 데이터 생성기 (manage.py seed_scale).
+    - 사용자 -> 계좌/배송지/보유 쿠폰 -> 거래 순서로 만들고, 모두 batch_size 단위 bulk_create
+    - 거래는 사용자 한 명 분량씩 만든 뒤 (월별 집계, 구매 이력, 계좌 잔액)을 메모리에서 같이 계산해서
+      rebuild_ledger / backfill_purchases 를 다시 돌리지 않아도 집계 테이블이 원본과 일치한다
+    - bulk_create는 save()/시그널을 거치지 않으므로 search_text는 직접 채우고 카탈로그 버전은 마지막에 올린다
+    """
+
+    def __init__(self, *, users, transactions, products, coupons, months=24, prefix="seed",
+                 batch_size=20000, seed=None, password="pass12345", progress=None):
+        if not PREFIX_RE.match(prefix):
+            raise ValueError("prefix는 영문 소문자로 시작하는 12자 이하의 영문 소문자/숫자여야 합니다.")
+        self.n_users = users
+        self.n_transactions = transactions
+        self.n_products = products
+        self.n_coupons = coupons
+        self.months = max(months, 1)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.password = password
+        self.rng = random.Random(seed)
+        self.progress = progress or (lambda stage, done, total: None)
+        self.tz = timezone.get_current_timezone()
+        self.now = timezone.now()
+        self.today = timezone.localdate(self.now)
+        self._hour_cum = _cum(HOUR_WEIGHTS)
+        self.stats = defaultdict(int)
+
+        self._tx_buffer = []
+        self._rollup_buffer = []
+        self._summary_buffer = []
+        self._purchase_buffer = []
+        self._account_buffer = []
+        self._coupon_buffer = []
+        # 거래 행 기본값 (모든 컬럼의 default; 행마다 필요한 값만 덮어씀)
+        self._blank_tx = {
+            f.attname: f.get_default() for f in Transaction._meta.concrete_fields if not f.primary_key
+        }
+
+    # ---------------------------------------------------------------- 실행
+    def run(self) -> dict:
+        if User.objects.filter(username__startswith=f"{self.prefix}_").exists():
+            raise ValueError(f"이미 '{self.prefix}_' 로 시작하는 사용자가 있습니다. 다른 prefix를 쓰세요.")
+
+        self._build_catalog()
+        users = self._create_users()
+        accounts, addresses = self._create_accounts_and_addresses(users)
+        user_coupons = self._create_user_coupons(users)
+
+        allocation = self._allocate(len(users))
+        month_list = month_starts(self.months, self.today)
+        self._month_list = month_list
+        self._month_cum = _cum(
+            (MONTHLY_GROWTH ** i) * SEASONALITY[m.month] for i, m in enumerate(month_list)
+        )
+
+        done = 0
+        for user, n in zip(users, allocation):
+            done += self._user_history(user, n, accounts[user.id], addresses[user.id], user_coupons[user.id])
+            if len(self._tx_buffer) >= self.batch_size:
+                self._flush()
+                self.progress("transactions", done, self.n_transactions)
+        self._flush()
+        self.progress("transactions", done, self.n_transactions)
+
+        bump_catalog_version()
+        return dict(self.stats)
+
+    # ---------------------------------------------------------- 카탈로그
+    def _build_catalog(self):
+        image = placeholder_image()
+        total_weight = sum(p[1] for p in CATEGORY_PROFILES)
+        self._categories = []
+        categories = []
+        new_products = []
+        serial = Product.objects.count()
+        for name, weight, median, items in CATEGORY_PROFILES:
+            category, created = Category.objects.get_or_create(name=name)
+            self.stats["categories"] += int(created)
+            categories.append((category, weight))
+            count = max(1, round(self.n_products * weight / total_weight))
+            for _ in range(count):
+                serial += 1
+                item = self.rng.choice(items)
+                price = max(1000, int(round(self.rng.lognormvariate(0, 0.5) * median, -2)))
+                product = Product(
+                    category=category,
+                    name=f"{self.rng.choice(BRANDS)} {item} {serial:05d}",
+                    price=Decimal(price),
+                    description=f"{category.name} 카테고리의 {item} 상품입니다.",
+                    stock=self.rng.randint(0, 500),
+                    image1=image,
+                )
+                product.search_text = product.build_search_text()
+                new_products.append(product)
+
+        Product.objects.bulk_create(new_products, batch_size=self.batch_size)
+        self.stats["products"] += len(new_products)
+
+        by_category = defaultdict(list)
+        for product in new_products:
+            by_category[product.category_id].append((product.id, product.name, product.price))
+        for category, weight in categories:
+            rows = by_category[category.id]
+            # 카테고리 안에서는 인기 상품에 구매가 몰리도록 Zipf 분포
+            self._categories.append((category.id, weight, rows, _cum(1 / (rank + 1) for rank in range(len(rows)))))
+        self._category_cum = _cum(c[1] for c in self._categories)
+
+        coupons = []
+        for i in range(self.n_coupons):
+            if self.rng.random() < 0.5:
+                kind, value, cap = "amount", self.rng.choice([1000, 2000, 3000, 5000]), None
+            else:
+                kind, value, cap = "percentage", self.rng.choice([5, 10, 15, 20]), self.rng.choice([5000, 10000, 20000])
+            coupons.append(
+                Coupon(
+                    name=f"{value:,}{'원' if kind == 'amount' else '%'} 할인 쿠폰",
+                    code=f"{self.prefix}-{i:04d}".upper(),
+                    discount_type=kind,
+                    discount_value=value,
+                    max_discount_amount=cap,
+                    valid_from=timezone.now() - timedelta(days=30 * self.months),
+                    valid_to=timezone.now() + timedelta(days=self.rng.choice([-30, 30, 90, 365])),
+                    active=True,
+                )
+            )
+        self._coupons = Coupon.objects.bulk_create(coupons, batch_size=self.batch_size)
+        self.stats["coupons"] += len(self._coupons)
+
+    # ---------------------------------------------------------- 사용자
+    def _name(self) -> str:
+        return self.rng.choice(SURNAMES) + self.rng.choice(GIVEN) + self.rng.choice(GIVEN)
+
+    def _create_users(self) -> list:
+        password = make_password(self.password)  # 해시는 한 번만 계산해서 재사용
+        joined = timezone.make_aware(datetime.combine(month_starts(self.months, self.today)[0], datetime.min.time()))
+        users = [
+            User(
+                username=f"{self.prefix}_{i:06d}",
+                email=f"{self.prefix}_{i:06d}@example.com",
+                password=password,
+                date_joined=joined,
+            )
+            for i in range(self.n_users)
+        ]
+        users = User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.stats["users"] += len(users)
+        return users
+
+    def _create_accounts_and_addresses(self, users):
+        banks = list(Bank.objects.all())
+        if not banks:
+            banks = [Bank.objects.create(name="시드은행", min_len=10, max_len=16)]
+        # 같은 은행+계좌번호 유니크 제약: prefix 해시 + 사용자 순번 + 계좌 순번으로 겹치지 않게
+        tag = zlib.crc32(self.prefix.encode()) % 10000
+
+        accounts, addresses = [], []
+        for index, user in enumerate(users):
+            name = self._name()
+            for k in range(self.rng.choices([1, 2, 3], weights=[50, 35, 15])[0]):
+                accounts.append(
+                    Account(
+                        user=user,
+                        name=name,
+                        phone=f"010{self.rng.randint(0, 99999999):08d}",
+                        bank=self.rng.choice(banks),
+                        account_number=f"9{tag:04d}{index:07d}{k}",
+                        is_default=(k == 0),
+                    )
+                )
+            for k in range(self.rng.choices([1, 2], weights=[70, 30])[0]):
+                city, zip_head = self.rng.choice(CITIES)
+                addresses.append(
+                    Address(
+                        user=user,
+                        alias="집" if k == 0 else "회사",
+                        zip_code=f"{zip_head}{self.rng.randint(0, 999):03d}",
+                        address=f"{city} {self.rng.randint(1, 400)}",
+                        detail_address=f"{self.rng.randint(1, 30)}층 {self.rng.randint(101, 2505)}호",
+                        is_default=(k == 0),
+                        receiver_name=name,
+                    )
+                )
+        Account.objects.bulk_create(accounts, batch_size=self.batch_size)
+        Address.objects.bulk_create(addresses, batch_size=self.batch_size)
+        self.stats["accounts"] += len(accounts)
+        self.stats["addresses"] += len(addresses)
+
+        by_user_accounts, by_user_addresses = defaultdict(list), defaultdict(list)
+        for account in accounts:
+            by_user_accounts[account.user_id].append(account)
+        for address in addresses:
+            by_user_addresses[address.user_id].append(address)
+        return by_user_accounts, by_user_addresses
+
+    def _create_user_coupons(self, users):
+        by_user = defaultdict(list)
+        if not self._coupons:
+            return by_user
+        rows = []
+        for user in users:
+            for coupon in self.rng.sample(self._coupons, min(len(self._coupons), self.rng.randint(0, 4))):
+                rows.append(UserCoupon(user=user, coupon=coupon, is_used=False))
+        UserCoupon.objects.bulk_create(rows, batch_size=self.batch_size)
+        for row in rows:
+            by_user[row.user_id].append(row)
+        self.stats["user_coupons"] += len(rows)
+        return by_user
+
+    def _allocate(self, n_users) -> list:
+        """거래 수를 사용자에게 파레토 분포로 배분 (소수의 헤비 유저가 많은 거래를 가짐)"""
+        if not n_users:
+            return []
+        weights = [self.rng.paretovariate(1.2) for _ in range(n_users)]
+        total = sum(weights)
+        counts = [int(self.n_transactions * w / total) for w in weights]
+        rest = self.n_transactions - sum(counts)
+        for i in sorted(range(n_users), key=lambda i: weights[i], reverse=True)[:rest]:
+            counts[i] += 1
+        return counts
+
+    # ---------------------------------------------------------- 거래
+    def _when(self, month: date) -> datetime:
+        last_day = calendar.monthrange(month.year, month.month)[1]
+        if (month.year, month.month) == (self.today.year, self.today.month):
+            last_day = self.today.day
+        while True:
+            hour = self.rng.choices(range(24), cum_weights=self._hour_cum)[0]
+            when = datetime(
+                month.year, month.month, self.rng.randint(1, last_day),
+                hour, self.rng.randint(0, 59), self.rng.randint(0, 59), tzinfo=self.tz,
+            )
+            # 이번 달은 지금 이후 시각이 나오면 다시 뽑음
+            if when <= self.now:
+                return when
+
+    def _discount(self, user_coupon, gross: int) -> int:
+        coupon = user_coupon.coupon
+        if coupon.discount_type == "amount":
+            discount = coupon.discount_value
+        else:
+            discount = gross * coupon.discount_value // 100
+            if coupon.max_discount_amount:
+                discount = min(discount, coupon.max_discount_amount)
+        # 결제 금액은 최소 1원 (Transaction.amount MinValueValidator(1))
+        return max(0, min(discount, gross - 1) // 10 * 10)
+
+    def _user_history(self, user, n, accounts, addresses, coupons) -> int:
+        rng = self.rng
+        rows = []
+        months = rng.choices(self._month_list, cum_weights=self._month_cum, k=n)
+        unused = list(coupons)
+        rng.shuffle(unused)
+        net = defaultdict(int)  # account_id -> 입금 - 출금
+        first_at = {}
+
+        for month in months:
+            when = self._when(month)
+            account = accounts[0] if len(accounts) == 1 or rng.random() < 0.7 else rng.choice(accounts)
+            if rng.random() < CHARGE_RATE:
+                amount = rng.choice([10000, 30000, 50000, 100000, 200000, 300000, 500000])
+                rows.append(self._charge(user, account, amount, when))
+                net[account.id] += amount
+            else:
+                category_id, _, products, product_cum = rng.choices(self._categories, cum_weights=self._category_cum)[0]
+                product_id, product_name, price = rng.choices(products, cum_weights=product_cum)[0]
+                quantity = rng.choices(QUANTITIES, cum_weights=QUANTITY_CUM)[0]
+                gross = int(price) * quantity
+                used = unused.pop() if unused and rng.random() < COUPON_RATE else None
+                discount = self._discount(used, gross) if used else 0
+                if used:
+                    used.is_used, used.used_at = True, when
+                    self._coupon_buffer.append(used)
+                address = rng.choice(addresses)
+                rows.append(
+                    {
+                        **self._blank_tx,
+                        "user_id": user.id,
+                        "account_id": account.id,
+                        "category_id": category_id,
+                        "product_id": product_id,
+                        "product_name": product_name,
+                        "quantity": quantity,
+                        "tx_type": Transaction.OUT,
+                        "amount": gross - discount,
+                        "total_price_at_pay": gross,
+                        "discount_amount": discount,
+                        "used_coupon_id": used.id if used else None,
+                        "occurred_at": when,
+                        "memo": "바로 구매" if quantity == 1 else f"장바구니 결제(1/{quantity})",
+                        "shipping_address": address.address,
+                        "shipping_detail_address": address.detail_address,
+                        "shipping_zip_code": address.zip_code,
+                        "receiver_name": address.receiver_name,
+                        "receipt_hidden": rng.random() < HIDDEN_RECEIPT_RATE,
+                    }
+                )
+                net[account.id] -= gross - discount
+            first_at[account.id] = min(first_at.get(account.id, when), when)
+
+        # 잔액이 음수가 되지 않도록 부족분은 그 계좌의 첫 거래 직전에 한 번 충전한 것으로
+        for account in accounts:
+            if net[account.id] < 0:
+                amount = -(net[account.id] // 10000) * 10000 + rng.choice([0, 10000, 50000])
+                when = first_at[account.id] - timedelta(hours=1)
+                rows.append(self._charge(user, account, amount, when))
+                net[account.id] += amount
+            account.balance = net[account.id]
+            self._account_buffer.append(account)
+
+        self._collect_aggregates(user, rows)
+        self._tx_buffer.extend(rows)
+        return n
+
+    def _charge(self, user, account, amount, when) -> dict:
+        return {
+            **self._blank_tx,
+            "user_id": user.id,
+            "account_id": account.id,
+            "tx_type": Transaction.IN,
+            "amount": amount,
+            "occurred_at": when,
+            "product_name": "계좌 충전",
+            "merchant": "내 지갑",
+            "memo": f"{account.bank.name} 충전 완료",
+        }
+
+    def _collect_aggregates(self, user, rows):
+        """사용자 한 명 분량의 월별 집계 / 누적 합계 / 구매 이력 (rebuild_ledger, backfill_purchases와 같은 결과)"""
+        per_month = defaultdict(lambda: [0, 0])
+        purchases = {}
+        total_in = total_out = 0
+        for tx in rows:
+            bucket = per_month[(tx["account_id"], month_key(tx["occurred_at"]))]
+            if tx["tx_type"] == Transaction.IN:
+                bucket[0] += tx["amount"]
+                total_in += tx["amount"]
+            else:
+                bucket[1] += tx["amount"]
+                total_out += tx["amount"]
+                product_id = tx["product_id"]
+                if product_id not in purchases or tx["occurred_at"] < purchases[product_id]:
+                    purchases[product_id] = tx["occurred_at"]
+
+        self._rollup_buffer.extend(
+            LedgerMonthlyRollup(user=user, account_id=account_id, month=month, total_in=m_in, total_out=m_out)
+            for (account_id, month), (m_in, m_out) in per_month.items()
+        )
+        self._summary_buffer.append(UserLedgerSummary(user=user, total_in=total_in, total_out=total_out))
+        self._purchase_buffer.extend(
+            {"user_id": user.id, "product_id": product_id, "first_purchased_at": at}
+            for product_id, at in purchases.items()
+        )
+
+    def _insert_rows(self, model, rows):
+        """
+        dict 행들을 INSERT ... VALUES 한 문장 + executemany 로 넣는다.
+        (bulk_create는 행마다 필드 변환/SQL 조립 비용이 커서 수백만 행에서는 대부분의 시간을 차지함)
+        auto_now(_add) 컬럼은 지금 시각으로 채운다.
+        """
+        fields = [f for f in model._meta.concrete_fields if not f.primary_key or f.attname in rows[0]]
+        now = timezone.now()
+        adapt = []
+        for f in fields:
+            if f.get_internal_type() == "DateTimeField":
+                adapt.append(connection.ops.adapt_datetimefield_value)
+            else:
+                adapt.append(None)
+        auto_now = {f.attname for f in fields if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)}
+
+        quote = connection.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote(model._meta.db_table),
+            ", ".join(quote(f.column) for f in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+        params = []
+        for row in rows:
+            values = []
+            for f, fn in zip(fields, adapt):
+                value = now if f.attname in auto_now else row[f.attname]
+                values.append(fn(value) if fn and value is not None else value)
+            params.append(values)
+        with transaction.atomic(), connection.cursor() as cursor:
+            for i in range(0, len(params), self.batch_size):
+                cursor.executemany(sql, params[i : i + self.batch_size])
+
+    def _flush(self):
+        """쌓인 행을 DB에 넣고 버퍼를 비움 (거래는 batch_size 단위)"""
+        if self._tx_buffer:
+            self._insert_rows(Transaction, self._tx_buffer)
+            self.stats["transactions"] += len(self._tx_buffer)
+            self._tx_buffer = []
+        if self._rollup_buffer:
+            LedgerMonthlyRollup.objects.bulk_create(self._rollup_buffer, batch_size=self.batch_size)
+            self.stats["ledger_rollups"] += len(self._rollup_buffer)
+            self._rollup_buffer = []
+        if self._summary_buffer:
+            UserLedgerSummary.objects.bulk_create(self._summary_buffer, batch_size=self.batch_size)
+            self._summary_buffer = []
+        if self._purchase_buffer:
+            self._insert_rows(UserProductPurchase, self._purchase_buffer)
+            self.stats["purchases"] += len(self._purchase_buffer)
+            self._purchase_buffer = []
+        if self._account_buffer:
+            Account.objects.bulk_update(self._account_buffer, ["balance"], batch_size=self.batch_size)
+            self._account_buffer = []
+        if self._coupon_buffer:
+            UserCoupon.objects.bulk_update(self._coupon_buffer, ["is_used", "used_at"], batch_size=self.batch_size)
+            self._coupon_buffer = []
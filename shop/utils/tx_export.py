@@ -0,0 +1,195 @@
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+from accountbook.streaming import ChunkBuffer
+from shop.utils.tx_query import OUT_TYPES
+
+# 한 번에 DB에서 읽어 오는 거래 수 (iterator chunk_size)
+EXPORT_CHUNK_SIZE = 500
+# 응답 조각 크기 (이만큼 모이면 yield)
+FLUSH_SIZE = 64 * 1024
+
+EXPORT_COLUMNS = [
+    "거래ID", "거래일시", "구분", "결제/입금 계좌", "카테고리", "상품", "수량",
+    "할인 전 금액", "할인 금액", "결제 금액", "쿠폰", "가맹점",
+    "수령인", "우편번호", "배송지", "상세주소", "메모",
+]
+
+# 엑셀에서 수식으로 해석되는 첫 글자 (CSV/수식 인젝션 방지)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# XML 1.0에서 허용되지 않는 제어 문자
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def export_chunk_size() -> int:
+    """settings.TRANSACTION_EXPORT_CHUNK_SIZE 로 조정 가능"""
+    return getattr(settings, "TRANSACTION_EXPORT_CHUNK_SIZE", EXPORT_CHUNK_SIZE)
+
+
+def export_rows(qs):
+    """
+    거래 queryset -> EXPORT_COLUMNS 순서의 값 리스트를 한 행씩 yield.
+    select_related + iterator()라서 거래 수와 상관없이 chunk_size 만큼만 메모리에 올라간다.
+    """
+    qs = qs.select_related("account", "account__bank", "category", "product", "used_coupon__coupon")
+    for tx in qs.iterator(chunk_size=export_chunk_size()):
+        coupon = tx.used_coupon.coupon.name if tx.used_coupon_id and tx.used_coupon else ""
+        account = f"{tx.account.bank} ({tx.account.masked_account_number()})" if tx.account_id else ""
+        amount = int(tx.amount or 0)
+        discount = int(tx.discount_amount or 0)
+        original = int(tx.total_price_at_pay or 0) or amount + discount
+        yield [
+            tx.id,
+            timezone.localtime(tx.occurred_at).strftime("%Y-%m-%d %H:%M:%S"),
+            "출금" if tx.tx_type in OUT_TYPES else "입금",
+            account,
+            tx.category.name if tx.category else "",
+            tx.product_name or (tx.product.name if tx.product else ""),
+            tx.quantity or 1,
+            original,
+            discount,
+            amount,
+            coupon,
+            tx.merchant or "",
+            tx.receiver_name or "",
+            tx.shipping_zip_code or "",
+            tx.shipping_address or "",
+            tx.shipping_detail_address or "",
+            tx.memo or "",
+        ]
+
+
+def _safe_text(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """csv.writer가 쓴 한 줄을 그대로 돌려주는 가짜 파일"""
+
+    def write(self, value):
+        return value
+
+
+def iter_history_csv(rows):
+    """
+    CSV(UTF-8 BOM: 엑셀에서 한글이 깨지지 않도록)를 조각(bytes)으로 yield.
+    """
+    writer = csv.writer(_Echo())
+    parts = ["\ufeff", writer.writerow(EXPORT_COLUMNS)]
+    size = 0
+    for row in rows:
+        line = writer.writerow([_safe_text(v) for v in row])
+        parts.append(line)
+        size += len(line)
+        if size >= FLUSH_SIZE:
+            yield "".join(parts).encode("utf-8")
+            parts, size = [], 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="거래내역" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _xlsx_row(values) -> str:
+    cells = []
+    for value in values:
+        if isinstance(value, int):
+            cells.append(f'<c t="n"><v>{value}</v></c>')
+        else:
+            text = escape(_XML_ILLEGAL.sub("", str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def iter_history_xlsx(rows):
+    """
+    XLSX(시트 1개, inline string)를 조각(bytes)으로 yield.
+    openpyxl 없이 SpreadsheetML을 직접 써서, 시트 XML을 ZIP 항목에 행 단위로 흘려보낸다.
+    (ChunkBuffer: seek 불가 스트림 -> 메모리에는 FLUSH_SIZE 분량만)
+    """
+    buf = ChunkBuffer()
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _XLSX_WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+
+        with zf.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            parts = [_XLSX_SHEET_HEAD, _xlsx_row(EXPORT_COLUMNS)]
+            size = 0
+            for row in rows:
+                line = _xlsx_row(row)
+                parts.append(line)
+                size += len(line)
+                if size >= FLUSH_SIZE:
+                    sheet.write("".join(parts).encode("utf-8"))
+                    parts, size = [], 0
+                    data = buf.take()
+                    if data:
+                        yield data
+            parts.append(_XLSX_SHEET_TAIL)
+            sheet.write("".join(parts).encode("utf-8"))
+        data = buf.take()
+        if data:
+            yield data
+    data = buf.take()
+    if data:
+        yield data
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", iter_history_csv),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", iter_history_xlsx),
+}
+
+
+def iter_history_export(qs, fmt: str):
+    """(content_type, bytes 조각 iterator) 반환"""
+    content_type, writer = EXPORT_FORMATS[fmt]
+    return content_type, writer(export_rows(qs))
@@ -0,0 +1,50 @@
+from django.db.models import Q
+
+from shop.models import Transaction
+from shop.utils.tx_summary import day_range, filter_occurred_range
+
+# tx_type 호환(데이터가 IN/OUT 이든 income/buy 든 모두 대응)
+# 거래내역 화면, 집계 테이블(ledger), 구매 이력, 백필 마이그레이션이 모두 이 정의를 쓴다
+IN_TYPES = ["IN", "income"]
+OUT_TYPES = ["OUT", "buy"]
+
+# 거래내역 목록/내보내기 정렬 (id로 끝나야 커서 페이지 경계가 고정됨)
+HISTORY_ORDERING = ["-occurred_at", "-id"]
+
+
+def history_filters(params) -> dict:
+    """GET 파라미터(tab, start_date, end_date, category, account, discounted)를 정리해서 dict로"""
+    return {
+        "tab": params.get("tab") or "in",  # in | out | summary
+        "start_date": (params.get("start_date") or "").strip(),  # YYYY-MM-DD
+        "end_date": (params.get("end_date") or "").strip(),  # YYYY-MM-DD
+        "category": (params.get("category") or "").strip(),  # category_id
+        "account": (params.get("account") or "").strip(),  # account_id
+        "discounted": (params.get("discounted") or "").strip(),  # "1"이면 할인 거래만
+    }
+
+
+def history_queryset(user, filters: dict):
+    """
+    거래내역 화면(TransactionHistoryView)과 거래내역 내보내기가 같이 쓰는 queryset.
+    탭(in/out)은 tx_type으로, 나머지는 공통 필터로 거른다. (summary 탭은 전체)
+    """
+    qs = Transaction.objects.filter(user=user).order_by(*HISTORY_ORDERING)
+
+    # 템플릿 탭 기준으로 DB tx_type 매핑 (호환)
+    if filters["tab"] == "in":
+        qs = qs.filter(tx_type__in=IN_TYPES)
+    elif filters["tab"] == "out":
+        qs = qs.filter(tx_type__in=OUT_TYPES)
+
+    # 날짜 필터는 [start, end) datetime 범위로 (occurred_at 인덱스 사용)
+    qs = filter_occurred_range(qs, *day_range(filters["start_date"], filters["end_date"]))
+    if filters["category"].isdigit():
+        qs = qs.filter(category_id=int(filters["category"]))
+    if filters["account"].isdigit():
+        qs = qs.filter(account_id=int(filters["account"]))
+
+    if filters["discounted"] == "1":
+        qs = qs.filter(Q(used_coupon__isnull=False) | Q(discount_amount__gt=0))
+
+    return qs
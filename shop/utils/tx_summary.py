@@ -1,13 +1,14 @@
-from datetime import date
-from typing import List, Tuple
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
 
 from django.db.models import Case, DecimalField, Sum, Value, When
+from django.utils import timezone
 
 
 def parse_month_range(sum_start: str, sum_end: str) -> Tuple[date, date]:
     """
     YYYY-MM 형태의 sum_start/sum_end를 date 범위로 변환.
-    end는 '다음달 1일'을 반환(occurred_at__date__lt end 용)
+    end는 '다음달 1일'을 반환([start, end) 반열린 구간, 아래 month_range 참고)
     """
     sy, sm = map(int, sum_start.split("-"))
     ey, em = map(int, sum_end.split("-"))
@@ -47,8 +48,77 @@ def month_start(ym: str) -> date:
     return date(y, m, 1)
 
 def next_month_start(ym: str) -> date:
-    """YYYY-MM -> 다음달 1일 (occurred_at__date__lt 용)"""
+    """YYYY-MM -> 다음달 1일 ([start, end) 의 end 용)"""
     y, m = map(int, ym.split("-"))
     if m == 12:
         return date(y + 1, 1, 1)
-    return date(y, m + 1, 1)
\ No newline at end of file
+    return date(y, m + 1, 1)
+
+# =========================
+# 기간 필터 공통 레이어
+# - occurred_at__date__gte/lte 는 컬럼에 타임존 변환/캐스팅을 씌워서 인덱스를 못 탄다.
+# - 대신 현지 시간(Asia/Seoul) 기준 [start, end) aware datetime 으로 바꿔서
+#   occurred_at__gte / occurred_at__lt 로 거는 것을 표준으로 한다.
+# =========================
+def parse_date(value: str) -> Optional[date]:
+    """YYYY-MM-DD -> date (빈 값/잘못된 값은 None)"""
+    try:
+        return date.fromisoformat((value or "").strip())
+    except ValueError:
+        return None
+
+
+def parse_month(value: str) -> Optional[date]:
+    """YYYY-MM -> 해당월 1일 (빈 값/잘못된 값은 None)"""
+    try:
+        return month_start((value or "").strip())
+    except ValueError:
+        return None
+
+
+def day_start(d: date) -> datetime:
+    """date -> 현재 타임존(settings.TIME_ZONE) 기준 그날 00:00 aware datetime"""
+    return timezone.make_aware(datetime.combine(d, time.min))
+
+
+def day_range(start_date: str, end_date: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    YYYY-MM-DD 시작일/종료일(종료일 포함) -> [start, end) datetime
+    end는 '종료일 다음날 00:00'
+    """
+    start = parse_date(start_date)
+    end = parse_date(end_date)
+    return (
+        day_start(start) if start else None,
+        day_start(end + timedelta(days=1)) if end else None,
+    )
+
+
+def month_bounds(sum_start: str, sum_end: str) -> Tuple[Optional[date], Optional[date]]:
+    """
+    YYYY-MM 시작월/종료월(종료월 포함) -> [해당월 1일, 종료월 다음달 1일) date
+    한쪽만 주어지면 반대쪽은 열린 구간(None)
+    """
+    start = parse_month(sum_start)
+    end = parse_month(sum_end)
+    if end:
+        end = next_month_start(f"{end:%Y-%m}")
+    return start, end
+
+
+def month_range(sum_start: str, sum_end: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """month_bounds의 datetime 버전 ([start, end) aware datetime)"""
+    start, end = month_bounds(sum_start, sum_end)
+    return (
+        day_start(start) if start else None,
+        day_start(end) if end else None,
+    )
+
+
+def filter_occurred_range(qs, start: Optional[datetime], end: Optional[datetime], field: str = "occurred_at"):
+    """[start, end) 범위를 인덱스 친화적인 __gte / __lt 로 적용 (None이면 그쪽은 열린 구간)"""
+    if start:
+        qs = qs.filter(**{f"{field}__gte": start})
+    if end:
+        qs = qs.filter(**{f"{field}__lt": end})
+    return qs
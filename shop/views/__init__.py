@@ -3,8 +3,8 @@ from .consulting import ConsultingProductListView
 from .cart import AddToCartView, CartListView, RemoveFromCartView
 from .checkout import CheckoutView
 from .orders import OrderExecutionView, DirectPurchaseView
-from .transactions import TransactionHistoryView
-from .reviews import ReviewCreateView, ReviewDeleteView, ReviewUpdateView
+from .transactions import TransactionExportView, TransactionHistoryView, TransactionSummaryView
+from .reviews import ReviewCreateView, ReviewDeleteView, ReviewFeedView, ReviewUpdateView
 from .coupons import CouponRegisterView
 
 __all__ = [
@@ -13,7 +13,7 @@ __all__ = [
     "AddToCartView", "CartListView", "RemoveFromCartView",
     "CheckoutView",
     "OrderExecutionView", "DirectPurchaseView",
-    "TransactionHistoryView",
-    "ReviewCreateView", "ReviewDeleteView", "ReviewUpdateView",
+    "TransactionHistoryView", "TransactionExportView", "TransactionSummaryView",
+    "ReviewCreateView", "ReviewDeleteView", "ReviewUpdateView", "ReviewFeedView",
     "CouponRegisterView",
 ]
@@ -7,6 +7,7 @@ from django.views.decorators.http import require_POST
 from django.views.generic import ListView
 
 from shop.models import Cart, Product
+from shop.utils.cart_repo import cart_lines, cart_total
 
 
 # 장바구니 추가
@@ -68,18 +69,17 @@ class CartListView(LoginRequiredMixin, ListView):
     # 화면에 보여줄 데이터를 가져오는 규칙에 대한 함수
     def get_queryset(self):
         # filter를 사용하여 현재 로그인 한 유저(self.request.user)의 물건만 골라냄
-        return Cart.objects.filter(user=self.request.user)
+        # (상품/카테고리까지 한 번에 가져와서 템플릿에서 item.product 접근 시 추가 쿼리 없음)
+        return cart_lines(self.request.user)
 
     # 목록 외에 추가로 화면에 전달할 데이터 (총 금액)을 계산
     def get_context_data(self, **kwargs):
         # 부모 클래스(list_view)가 기본적으로 준비한 데이터를 먼저 가져옴 (context)
         context = super().get_context_data(**kwargs)
 
-        # 위에서 필터링한 장바구니 물건들을 한번 더 가져옴
-        cart_items = self.get_queryset()
-
         # 장바구니에 담긴 모든 물건의 (수량 * 가격)을 합산
-        total = sum(item.total_price() for item in cart_items)
+        # (self.object_list를 그대로 순회 -> 템플릿도 같은 결과 캐시를 재사용)
+        total = cart_total(self.object_list)
 
         # 계산된 합계를 total_amount에 담아 html로 전송
         context["total_amount"] = total
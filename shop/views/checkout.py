@@ -87,7 +87,7 @@ class CheckoutView(LoginRequiredMixin, View):
         
         # 장바구니도 비어있고, 단품 상품 정보도 없을 때만 장바구니로 보냅니다.
         cart_items = context.get("cart_items")
-        has_cart_items = cart_items.exists() if cart_items is not None else False
+        has_cart_items = bool(cart_items)
         has_product = context.get("product") is not None
 
         if not has_cart_items and not has_product:
@@ -6,15 +6,24 @@ from django.db import transaction
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views import View
 
+from account.utils.receipt_jobs import enqueue_receipts_on_commit
 from shop.models import Cart, Product, Transaction
+from shop.utils.cart_repo import cart_lines, cart_total
 from shop.utils.coupons_util import apply_coupon_discount
+from shop.utils.idempotency import idempotent, mark_succeeded
+from shop.utils.inventory import cart_quantities
+from shop.utils.ledger import apply_ledger_entries, apply_ledger_entry
+from shop.utils.purchases import record_purchases
+from shop.utils.reservation import reserve_order, use_coupon
 from shop.utils.selection import get_selected_account, get_selected_address
 
 
 
 
+@method_decorator(idempotent("order_execute"), name="post")
 class OrderExecutionView(LoginRequiredMixin, View):
     def post(self, request):
         # 1. 계좌 선택 로직
@@ -25,9 +34,11 @@ class OrderExecutionView(LoginRequiredMixin, View):
         address_id = request.POST.get("address_id")
         selected_address = get_selected_address(request.user, address_id)
         
-        cart_items = Cart.objects.filter(user=request.user)
+        # 장바구니 + 상품/카테고리를 한 번에 로드 (루프 안 지연 로딩/count() 쿼리 없음)
+        cart_items = list(cart_lines(request.user))
+        cart_count = len(cart_items)
         
-        if not cart_items.exists():
+        if not cart_items:
             messages.error(request, "결제할 상품이 없습니다.")
             return redirect("cart_list")            
 
@@ -40,7 +51,7 @@ class OrderExecutionView(LoginRequiredMixin, View):
             return redirect("cart_list")
 
         # 3. 총 결제 금액 및 쿠폰 할인 계산
-        total_price = sum(item.total_price() for item in cart_items)
+        total_price = cart_total(cart_items)
         
         # --- [수정 구간: 쿠폰 ID 안전하게 가져오기] ---
         selected_coupon_id = request.POST.get("coupon_id")
@@ -49,36 +60,26 @@ class OrderExecutionView(LoginRequiredMixin, View):
             request.user, total_price, selected_coupon_id
         )
 
+        quantities = cart_quantities(cart_items)
+
         try:
             with transaction.atomic():
-                # (1) 잔액 검증
-                if user_account.balance < final_price:
-                    raise Exception("잔액이 부족합니다.")
-                
+                # (1)~(3) 잔액 차감 + 상품 잠금(id 순) + 재고 조건부 차감
+                reserve_order(user_account, quantities, final_price)
+
+                # (4) 거래 내역 일괄 생성 (첫 번째 상품에만 할인 정보/총 결제 금액을 기록하여 중복 계산 방지)
+                # 전체 결제 금액(final_price)은 잔액에서 한 번만 깎으므로 로그도 이에 맞춘다.
                 now = timezone.now()
-                # (2) 상품별 재고 차감 및 거래 내역 생성
-                for index, item in enumerate(cart_items):
-                    target_product = item.product
-                    if target_product.stock < item.quantity:
-                        raise Exception(f"[{target_product.name}] 재고 부족")
-
-                    target_product.stock -= item.quantity
-                    target_product.save()
-
-                    # 각 상품별 거래 내역 생성 (첫 번째 상품에만 할인 정보를 기록하여 중복 계산 방지)
-                    # 혹은 각 상품 가격 비율에 맞춰 할인을 나눌 수 있으나, 단순화를 위해 
-                    # 전체 결제 금액(final_price)은 한 번만 잔액에서 깎으므로 로그도 이에 맞춰야 합니다.
-                    Transaction.objects.create(
+                created_txs = Transaction.objects.bulk_create([
+                    Transaction(
                         user=request.user,
                         account=user_account,
-                        product=target_product,
-                        product_name=target_product.name,
-                        category=target_product.category,
+                        product_id=item.product_id,
+                        product_name=item.product.name,
+                        category_id=item.product.category_id,
                         quantity=item.quantity,
                         tx_type=Transaction.OUT,
-                        # 각 행마다 final_price를 넣으면 총 지출이 (아이템수 * final_price)처럼 보일 수 있음
-                        # 여기서는 개별 상품 가격을 적되, 첫 번째 상품 메모에 총 결제 정보를 기록하는 방식 추천
-                        amount=item.total_price() if index > 0 else final_price, 
+                        amount=item.total_price() if index > 0 else final_price,
                         total_price_at_pay=total_price if index == 0 else Decimal("0"),
                         discount_amount=discount_amount if index == 0 else Decimal("0"),
                         used_coupon=user_coupon if index == 0 else None,
@@ -87,22 +88,26 @@ class OrderExecutionView(LoginRequiredMixin, View):
                         shipping_detail_address=selected_address.detail_address,
                         shipping_zip_code=selected_address.zip_code,
                         receiver_name=selected_address.receiver_name or request.user.username,
-                        memo=f"장바구니 결제({index+1}/{cart_items.count()})"
+                        memo=f"장바구니 결제({index+1}/{cart_count})"
                     )
+                    for index, item in enumerate(cart_items)
+                ])
 
-                # (3) 유저 잔액 차감 (실제 금액 한 번만 차감)
-                user_account.balance -= final_price
-                user_account.save()
+                # 누적/월별 집계 테이블 갱신 (거래와 같은 트랜잭션)
+                apply_ledger_entries(request.user, created_txs)
+                # 리뷰 작성 자격용 구매 이력
+                record_purchases(request.user.id, quantities, now)
+                # 커밋 후 영수증 PDF 사전 생성 작업 등록 (RECEIPT_BACKGROUND_RENDER일 때)
+                enqueue_receipts_on_commit(tx.id for tx in created_txs)
 
-                # (4) 쿠폰 사용 완료 처리
+                # (5) 쿠폰 사용 완료 처리 (동시 결제에서 같은 쿠폰이 두 번 쓰이지 않게 조건부 UPDATE)
                 if user_coupon:
-                    user_coupon.is_used = True
-                    user_coupon.used_at = now
-                    user_coupon.save()
+                    use_coupon(user_coupon, now)
 
-                # (5) 장바구니 비우기
-                cart_items.delete()
+                # (6) 장바구니 비우기 (결제한 행만)
+                Cart.objects.filter(id__in=[item.id for item in cart_items]).delete()
 
+            mark_succeeded(request)
             messages.success(request, f"결제 완료! 할인금액: {discount_amount:,}원 / 실 결제금액: {final_price:,}원")
             return redirect("mypage")
 
@@ -111,6 +116,7 @@ class OrderExecutionView(LoginRequiredMixin, View):
             return redirect("cart_list")
 
 
+@method_decorator(idempotent("direct_purchase"), name="post")
 class DirectPurchaseView(LoginRequiredMixin, View):
     def post(self, request, product_id):
         target_product = get_object_or_404(Product, id=product_id)
@@ -126,8 +132,18 @@ class DirectPurchaseView(LoginRequiredMixin, View):
             messages.error(request, "배송지 정보가 없습니다.")
             return redirect("product_detail", pk=product_id)
         
+        if not user_account:
+            messages.error(request, "결제 가능한 계좌 정보가 없습니다.")
+            return redirect("product_detail", pk=product_id)
+
         # 3. 금액 및 쿠폰 계산
-        buy_quantity = int(request.POST.get("quantity", 1))
+        try:
+            buy_quantity = int(request.POST.get("quantity", 1))
+        except (TypeError, ValueError):
+            buy_quantity = 0
+        if buy_quantity < 1:
+            messages.error(request, "구매 수량을 확인해주세요.")
+            return redirect("product_detail", pk=product_id)
         total_price = target_product.price * buy_quantity
 
         selected_coupon_id = request.POST.get("coupon_id")
@@ -138,22 +154,16 @@ class DirectPurchaseView(LoginRequiredMixin, View):
 
         try:
             with transaction.atomic():
-                # (1) 검증
-                if user_account.balance < final_price:
-                    raise Exception("잔액 부족")
-                if target_product.stock < buy_quantity:
-                    raise Exception("재고 부족")
-
-                # (2) 재고 차감
-                target_product.stock -= buy_quantity
-                target_product.save()
+                # (1)~(2) 잔액/재고 조건부 차감 (읽고 되쓰지 않으므로 동시 구매에도 초과 판매 없음)
+                reserve_order(user_account, {target_product.id: buy_quantity}, final_price)
+                now = timezone.now()
 
                 # (3) 거래 내역 생성 (중복 필드 정리 완료 ✨)
-                Transaction.objects.create(
+                tx = Transaction.objects.create(
                     user=request.user,
                     account=user_account,
                     product=target_product,
-                    category=target_product.category,
+                    category_id=target_product.category_id,
                     product_name=target_product.name,
                     quantity=buy_quantity,
                     tx_type=Transaction.OUT,
@@ -163,24 +173,22 @@ class DirectPurchaseView(LoginRequiredMixin, View):
                     discount_amount=discount_amount,   # 할인액
                     used_coupon=user_coupon,           # 사용 쿠폰
                     
-                    occurred_at=timezone.now(),
+                    occurred_at=now,
                     memo=f"바로구매(할인 {discount_amount:,}원): {target_product.name}",
                     shipping_address=selected_address.address,
                     shipping_detail_address=selected_address.detail_address,
                     shipping_zip_code=selected_address.zip_code,
                     receiver_name=selected_address.receiver_name or request.user.username
                 )
+                apply_ledger_entry(tx)
+                enqueue_receipts_on_commit([tx.id])
+                record_purchases(request.user.id, [target_product.id], now)
 
-                # (4) 잔액 차감
-                user_account.balance -= final_price
-                user_account.save()
-
-                # (5) 쿠폰 사용 완료 처리
+                # (4) 쿠폰 사용 완료 처리
                 if user_coupon:
-                    user_coupon.is_used = True
-                    user_coupon.used_at = timezone.now()
-                    user_coupon.save()
+                    use_coupon(user_coupon, now)
 
+            mark_succeeded(request)
             messages.success(request, f"결제가 완료되었습니다! (할인금액: {discount_amount:,}원)")
             return redirect("mypage")
 
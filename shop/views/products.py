@@ -1,7 +1,10 @@
-from django.db.models import Avg, Q
 from django.views.generic import DetailView, ListView
 
-from shop.models import Category, Coupon, Product, Transaction
+from shop.models import Product
+from shop.utils.catalog import get_active_coupons, get_categories, paginate_product_ids
+from shop.utils.purchases import has_purchased
+from shop.utils.review_feed import review_page, review_queryset
+from shop.utils.search import order_products, search_products
 
 
 
@@ -16,26 +19,30 @@ class ProductListView(ListView):
         qs = Product.objects.all()
         q = (self.request.GET.get("search") or "").strip()
         category_id = self.request.GET.get("category")
-        sort_option = self.request.GET.get("sort", "newest")
+        # 검색어가 있으면 기본 정렬은 관련도순
+        sort_option = self.request.GET.get("sort") or ("relevance" if q else "newest")
 
+        self.catalog_key = ("products", q, category_id or "", sort_option)
         if q:
-            qs = qs.filter(name__icontains=q)
+            qs = search_products(qs, q)
         if category_id:
             qs = qs.filter(category_id=category_id)
 
-        if sort_option == "price_low":
-            qs = qs.order_by("price")
-        elif sort_option == "price_high":
-            qs = qs.order_by("-price")
-        else:
-            qs = qs.order_by("-id")
+        if sort_option == "relevance" and not q:
+            sort_option = "newest"
+        qs = order_products(qs, sort_option)
         return qs
 
+    def paginate_queryset(self, queryset, page_size):
+        # 페이지별 상품 id / 전체 개수를 카탈로그 캐시에서 (상품 행은 id로 새로 조회)
+        page = self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg) or 1
+        return paginate_product_ids(queryset, page_size, page, self.catalog_key)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # 1. 모든 카테고리 가져오기 (기존 코드)
-        context["categories"] = Category.objects.all()
-        context["display_coupon"] = Coupon.objects.filter(active=True).order_by("-id")
+        # 1. 모든 카테고리 / 쿠폰 배너 (카탈로그 캐시)
+        context["categories"] = get_categories()
+        context["display_coupon"] = get_active_coupons()
 
         return context
 
@@ -47,33 +54,31 @@ class ProductDetailView(DetailView):
     context_object_name = "product"
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        product = self.get_object()
+        product = self.object
+
+        # 1. 이 상품에 달린 리뷰 첫 페이지 (최신순, 상품별 캐시 / 나머지는 ReviewFeedView로 "더 보기")
+        reviews = review_page(product.id)
+        context["reviews"] = reviews
 
         # URL 파라미터에서 edit_id를 가져와 컨텍스트에 추가
         edit_id = self.request.GET.get('edit_id')
-        if edit_id:
+        if edit_id and edit_id.isdigit():
             context['edit_review_id'] = int(edit_id)
+            # "더 보기"로 펼친 뒤쪽 리뷰를 수정하는 경우: 첫 페이지에 없으면 맨 앞에 붙여서 폼을 보여줌
+            if self.request.user.is_authenticated and all(r.id != int(edit_id) for r in reviews):
+                mine = review_queryset(product.id).filter(id=edit_id, user=self.request.user).first()
+                if mine:
+                    reviews.object_list = [mine, *reviews.object_list]
 
-        # 1. 이 상품에 달린 리뷰들 최신순으로 가져오기
-        reviews = product.reviews.all().order_by('-created_at')
-        context["reviews"] = reviews
-
-        # 2. 평균 별점 계산 (리뷰가 없으면 0)
-        from django.db.models import Avg
-        avg_rating = reviews.aggregate(Avg('rating'))['rating__avg']
-        context["average_rating"] = round(avg_rating, 1) if avg_rating else 0
+        # 2. 평균 별점 / 별점 분포 (Product에 저장된 리뷰 통계, 리뷰가 없으면 0)
+        context["average_rating"] = round(product.rating_avg, 1) if product.review_count else 0
+        context["rating_histogram"] = product.rating_histogram
 
         # 3. 실구매자 여부 확인
         can_review = False
         if self.request.user.is_authenticated:
-            OUT_TYPES = ["OUT", "buy"]
-
-            has_bought = Transaction.objects.filter(
-            user=self.request.user,
-            tx_type__in=OUT_TYPES,  # ✅ 이렇게
-            ).filter(
-            Q(product=product) | Q(product_name=product.name)
-            ).exists()
+            # 구매 이력 테이블 (user, product) 기본키 조회
+            has_bought = has_purchased(self.request.user, product)
 
             already_reviewed = product.reviews.filter(user=self.request.user).exists()
 
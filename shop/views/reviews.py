@@ -1,12 +1,16 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
-from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
 from django.views import View
 
-from shop.models import Product, Review, ReviewImage, Transaction
+from shop.models import Product, Review, ReviewImage
+from shop.utils.purchases import has_purchased
+from shop.utils.review_feed import review_page
+from shop.utils.review_stats import apply_review_change, parse_rating
 
 
 
@@ -14,22 +18,16 @@ class ReviewCreateView(LoginRequiredMixin, View):
     def post(self, request, product_id):
         product = get_object_or_404(Product, id=product_id)
 
-        # 1. 구매 여부 확인
-        OUT_TYPES = [Transaction.OUT]
-
-        has_purchased = Transaction.objects.filter(
-            user=request.user,
-            tx_type__in=OUT_TYPES,
-        ).filter(
-            Q(product=product) | Q(product_name=product.name)
-        ).exists()
-
-        if not has_purchased:
+        # 1. 구매 여부 확인 (구매 이력 테이블 기본키 조회)
+        if not has_purchased(request.user, product):
             messages.error(request, "해당 상품을 구매하신 분만 리뷰를 남길 수 있습니다.")
             return redirect("product_detail", pk=product.id)
         # 2. 리뷰 데이터 가져오기        
-        rating = request.POST.get('rating')
+        rating = parse_rating(request.POST.get('rating'))
         content = request.POST.get('content')
+        if rating is None:
+            messages.error(request, "평점은 1~5점 사이로 선택해주세요.")
+            return redirect("product_detail", pk=product.id)
 
         with transaction.atomic():
             # 3. 리뷰 본문 생성 (먼저 생성해야 review 객체의 ID가 생김)
@@ -39,6 +37,8 @@ class ReviewCreateView(LoginRequiredMixin, View):
                 rating=rating,
                 content=content
             )
+            # 상품 리뷰 통계(개수/합계/평균/분포) 같은 트랜잭션에서 갱신
+            apply_review_change(product.id, added=[rating])
 
             # 여러 장의 이미지 처리 (핵심 부분)
             # request.FILES.getlist를 사용하여 선택된 모든 파일을 리스트로 가져옵니다.
@@ -56,10 +56,16 @@ class ReviewDeleteView(LoginRequiredMixin, View):
     def post(self, request, review_id):
         # 1. 내 리뷰인지 확인하며 가져오기 (보안)
         review = get_object_or_404(Review, id=review_id, user=request.user)
-        product_id = review.product.id
+        product_id = review.product_id
 
-        # 2. 삭제 처리
-        review.delete()
+        # 2. 삭제 처리 (+ 상품 리뷰 통계 차감)
+        # 삭제 요청이 동시에 두 번 와도 실제로 지운 쪽만 통계를 차감한다
+        with transaction.atomic():
+            locked = Review.objects.select_for_update().filter(pk=review.pk).first()
+            if locked is not None:
+                _, deleted = locked.delete()
+                if deleted.get(Review._meta.label):
+                    apply_review_change(product_id, removed=[locked.rating])
 
         # 3. 메시지 남기기
         messages.success(request, "리뷰가 성공적으로 삭제되었습니다.")
@@ -72,11 +78,11 @@ class ReviewUpdateView(LoginRequiredMixin, View):
     def post(self, request, review_id):
         # 1. 내 리뷰인지 확인하며 가져오기 (보안)
         review = get_object_or_404(Review, id=review_id, user=request.user)
-        product_id = review.product.id
+        product_id = review.product_id
 
         # 2. 수정 데이터 가져오기
         content = request.POST.get("content")
-        rating = request.POST.get("rating")
+        rating = parse_rating(request.POST.get("rating"))
 
         # 추가된 데이터: 삭제할 이미지 ID 리스트와 새로 등록할 파일들
         delete_image_ids = request.POST.getlist("delete_images")
@@ -85,9 +91,14 @@ class ReviewUpdateView(LoginRequiredMixin, View):
         # 3. 데이터 업데이트 및 저장
         if content and rating:
             with transaction.atomic():
+                # 동시에 수정해도 같은 이전 별점을 두 번 빼지 않도록 행을 잠그고 다시 읽는다
+                review = Review.objects.select_for_update().get(pk=review.pk)
+                old_rating = review.rating
                 review.content = content
-                review.rating = int(rating)
+                review.rating = rating
                 review.save()
+                if old_rating != rating:
+                    apply_review_change(product_id, added=[rating], removed=[old_rating])
 
                 # 이미지 삭제 로직
                 if delete_image_ids:
@@ -107,3 +118,16 @@ class ReviewUpdateView(LoginRequiredMixin, View):
 
         # 4. 상세 페이지의 리뷰 섹션으로 다시 리다이렉트
         return redirect(reverse('product_detail', kwargs={'pk': product_id}) + '#review-section')
+
+
+class ReviewFeedView(View):
+    """
+    /shop/products/<pk>/reviews/?cursor=<token>
+    상품 상세의 리뷰 "더 보기": 다음 페이지 리뷰 HTML 조각 + 다음 커서(JSON)
+    """
+
+    def get(self, request, pk):
+        product = get_object_or_404(Product.objects.only("id"), pk=pk)
+        page = review_page(product.id, request.GET.get("cursor"))
+        html = render_to_string("shop/_review_list.html", {"reviews": page}, request=request)
+        return JsonResponse({"html": html, "next_cursor": page.next_cursor})
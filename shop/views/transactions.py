@@ -1,16 +1,23 @@
+import hashlib
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Case, DecimalField, Sum, Value, When, Q
-from django.db.models.functions import TruncMonth
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
+from django.views import View
+from django.views.decorators.cache import never_cache
 from django.views.generic import ListView
 
 from account.models import Account
 from shop.models import Category, Transaction
-from shop.utils.tx_summary import (
-    aggregate_in_out,
-    month_start,
-    next_month_start,
-    parse_month_range,
-)
+from shop.utils.catalog import catalog_version
+from shop.utils.cursor import paginate_by_cursor
+from shop.utils.ledger import category_series, ledger_version, monthly_series, rollup_totals
+from shop.utils.tx_export import EXPORT_FORMATS, iter_history_export
+from shop.utils.tx_query import HISTORY_ORDERING, IN_TYPES, OUT_TYPES, history_filters, history_queryset
+from shop.utils.tx_summary import month_bounds, parse_month
 
 
 
@@ -21,47 +28,40 @@ class TransactionHistoryView(LoginRequiredMixin, ListView):
     paginate_by = 10   # 추가: 페이지당 10개 (원하면 20 등으로 변경)
 
     # tx_type 호환(데이터가 IN/OUT 이든 income/buy 든 모두 대응)
-    IN_TYPES = ["IN", "income"]
-    OUT_TYPES = ["OUT", "buy"]
+    IN_TYPES = IN_TYPES
+    OUT_TYPES = OUT_TYPES
+
+    # ?paging=cursor 일 때 쓰는 keyset 정렬 키 (id로 끝나야 페이지 경계가 고정됨)
+    CURSOR_ORDERING = HISTORY_ORDERING
+
+    def _cursor_mode(self):
+        return self.request.GET.get("paging") == "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        tab = self.request.GET.get("tab", "in")
+        if tab == "summary":
+            # 요약 탭은 목록을 그리지 않으므로 COUNT/페이지 조회 자체를 생략
+            return (None, None, queryset.none(), False)
+
+        if not self._cursor_mode():
+            return super().paginate_queryset(queryset, page_size)
+
+        # 커서 모드: OFFSET/COUNT 없이 (occurred_at, id) 기준으로 다음/이전 페이지
+        page = paginate_by_cursor(
+            queryset, self.CURSOR_ORDERING, self.request.GET.get("cursor"), page_size
+        )
+        return (None, page, page.object_list, page.has_other_pages())
 
     def get_queryset(self):
-        qs = Transaction.objects.filter(user=self.request.user).order_by("-occurred_at")
-
-        tab = self.request.GET.get("tab", "in")  # 템플릿 탭과 동일
-
-        # 템플릿 탭 기준으로 DB tx_type 매핑 (호환)
-        if tab == "in":
-            qs = qs.filter(tx_type__in=self.IN_TYPES)
-        elif tab == "out":
-            qs = qs.filter(tx_type__in=self.OUT_TYPES)
-        # summary는 리스트가 아니라 요약이므로, 목록은 기본 qs 유지해도 됨.
-
-        # 공통 필터
-        start_date = self.request.GET.get("start_date") or ""
-        end_date = self.request.GET.get("end_date") or ""
-        category = self.request.GET.get("category") or ""
-        account = self.request.GET.get("account") or ""
-        discounted = self.request.GET.get("discounted") or ""
-
-        if start_date:
-            qs = qs.filter(occurred_at__date__gte=start_date)
-        if end_date:
-            qs = qs.filter(occurred_at__date__lte=end_date)
-        if category:
-            qs = qs.filter(category_id=category)
-        if account:
-            qs = qs.filter(account_id=account)
-
-        if discounted == "1":
-            qs = qs.filter(Q(used_coupon=True) | Q(discount_amount__gt=0))
-
-        return qs
+        # 탭/기간/카테고리/계좌/할인 필터 (거래내역 내보내기와 같은 조건)
+        return history_queryset(self.request.user, history_filters(self.request.GET))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         tab = self.request.GET.get("tab", "in")
         context["active_tab"] = tab
+        context["cursor_mode"] = self._cursor_mode()
 
         context["categories"] = Category.objects.all()
         context["accounts"] = Account.objects.filter(user=self.request.user)
@@ -88,88 +88,106 @@ class TransactionHistoryView(LoginRequiredMixin, ListView):
             context["sum_end"] = sum_end
             context["sum_category"] = sum_category
 
-            base = Transaction.objects.filter(user=self.request.user)
-
             # ✅ 열린 구간 필터링: 시작만/끝만/둘 다
-            if sum_start and sum_end:
-                start, end = parse_month_range(sum_start, sum_end)
-                base = base.filter(occurred_at__date__gte=start, occurred_at__date__lt=end)
-
-            elif sum_start and not sum_end:
-                # 시작월부터 "현재"까지 (열린 끝)
-                start = month_start(sum_start)
-                base = base.filter(occurred_at__date__gte=start)
-
-            elif sum_end and not sum_start:
-                # "최초 거래"부터 끝월까지 (열린 시작)
-                end = next_month_start(sum_end)
-                base = base.filter(occurred_at__date__lt=end)            
-
-            # ✅ 요약 수치
-            total_in, total_out = aggregate_in_out(base, self.IN_TYPES, self.OUT_TYPES)
+            # - 시작만: 시작월부터 "현재"까지 / 끝만: "최초 거래"부터 끝월까지
+            # - 월 단위 [start, end) 는 월별 집계 테이블의 month 키와 그대로 대응
+            start, end = month_bounds(sum_start, sum_end)
+
+            # ✅ 요약 수치 (거래 전체 Sum 대신 월별 집계 테이블에서 합산)
+            total_in, total_out = rollup_totals(self.request.user, start=start, end=end)
             context["total_in"] = total_in
             context["total_out"] = total_out
             context["net_total"] = total_in - total_out
             context["has_summary_data"] = (total_in != 0 or total_out != 0)
 
-            # =========================
-            # 그래프 데이터
-            # =========================
-            if chart_tab == "monthly":
-                monthly = (
-                    base.annotate(m=TruncMonth("occurred_at"))
-                    .values("m")
-                    .annotate(
-                        income=Sum(
-                            Case(
-                                When(tx_type__in=self.IN_TYPES, then="amount"),
-                                default=Value(0),
-                                output_field=DecimalField(),
-                            )
-                        ),
-                        expense=Sum(
-                            Case(
-                                When(tx_type__in=self.OUT_TYPES, then="amount"),
-                                default=Value(0),
-                                output_field=DecimalField(),
-                            )
-                        ),
-                    )
-                    .order_by("m")
-                )
-
-                labels, ins, outs = [], [], []
-                for row in monthly:
-                    if not row["m"]:
-                        continue
-                    labels.append(row["m"].strftime("%Y-%m"))
-                    ins.append(str(row["income"] or 0))
-                    outs.append(str(row["expense"] or 0))
-
-                # 템플릿(txMonthlyChart)이 기대하는 키로 넣기
-                context["chart_labels"] = "|".join(labels)
-                context["chart_in"] = "|".join(ins)
-                context["chart_out"] = "|".join(outs)
-
-            else:
-                # 카테고리별 지출 통계 (기존 유지)
-                base_for_cat = base.filter(tx_type__in=self.OUT_TYPES)
-                if sum_category:
-                    base_for_cat = base_for_cat.filter(category_id=sum_category)
-
-                by_cat = (
-                    base_for_cat.values("category__name")
-                    .annotate(total=Sum("amount"))
-                    .order_by("-total")
-                )
-
-                labels, values = [], []
-                for row in by_cat:
-                    labels.append(row["category__name"] or "미분류")
-                    values.append(str(row["total"] or 0))
-
-                context["has_category_data"] = len(labels) > 0
-                context["cat_chart_labels"] = "|".join(labels)
-                context["cat_chart_values"] = "|".join(values)
+            # 그래프 데이터는 TransactionSummaryView(JSON, ETag)에서 따로 받아 그린다
+            context["summary_api_query"] = urlencode(
+                {"sum_start": sum_start, "sum_end": sum_end, "sum_category": sum_category}
+            )
 
         return context
+
+
+@method_decorator(never_cache, name="dispatch")
+class TransactionExportView(LoginRequiredMixin, View):
+    """
+    /transactions/export/?format=csv|xlsx&tab=&start_date=&end_date=&category=&account=&discounted=
+
+    거래내역 화면과 같은 필터로 전체 거래를 파일 하나로 내려받기 (페이지 구분 없음)
+    - 거래는 iterator()로 나눠 읽고 StreamingHttpResponse로 행 단위 전송 -> 건수와 상관없이 메모리 일정
+    - 상품 / 쿠폰 / 배송지 컬럼 포함
+    """
+
+    def get(self, request):
+        fmt = request.GET.get("format") or "csv"
+        if fmt not in EXPORT_FORMATS:
+            raise Http404("지원하지 않는 형식입니다.")
+
+        filters = history_filters(request.GET)
+        qs = history_queryset(request.user, filters)
+
+        content_type, chunks = iter_history_export(qs, fmt)
+        stamp = timezone.localtime().strftime("%Y%m%d_%H%M%S")
+        resp = StreamingHttpResponse(chunks, content_type=content_type)
+        resp["Content-Disposition"] = f'attachment; filename="transactions_{filters["tab"]}_{stamp}.{fmt}"'
+        return resp
+
+
+class TransactionSummaryView(LoginRequiredMixin, View):
+    """
+    /transactions/summary.json?sum_start=YYYY-MM&sum_end=YYYY-MM&sum_category=
+
+    요약 탭 그래프용 JSON (월별 수익/지출 + 카테고리별 지출)
+    - ETag = 사용자 거래내역 버전(건수/최대 id/최대 updated_at) + 카탈로그 버전(카테고리 이름) + 조건
+    - If-None-Match가 같으면 집계 쿼리 없이 304
+    - 사용자별 데이터라 Cache-Control: private, no-cache (공유 캐시 저장 금지, 브라우저는 매번 재검증)
+    """
+    raise_exception = True  # 비로그인: 로그인 페이지 리다이렉트 대신 403
+
+    def get(self, request):
+        sum_start = (request.GET.get("sum_start") or "").strip()
+        sum_end = (request.GET.get("sum_end") or "").strip()
+        sum_category = (request.GET.get("sum_category") or "").strip()
+        start, end = month_bounds(sum_start, sum_end)
+        category_id = int(sum_category) if sum_category.isdigit() else None
+
+        raw = f"{ledger_version(request.user)}|{catalog_version()}|{start}|{end}|{category_id}"
+        etag = f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            patch_cache_control(not_modified, private=True, no_cache=True)
+            return not_modified
+
+        total_in, total_out = rollup_totals(request.user, start=start, end=end)
+        monthly = monthly_series(request.user, start=start, end=end)
+        by_category = category_series(request.user, start=start, end=end, category_id=category_id)
+
+        resp = JsonResponse(
+            {
+                "range": {
+                    "start": f"{start:%Y-%m}" if start else None,
+                    "end": f"{parse_month(sum_end):%Y-%m}" if end else None,
+                    "category": category_id,
+                },
+                "totals": {
+                    "in": int(total_in),
+                    "out": int(total_out),
+                    "net": int(total_in - total_out),
+                },
+                "monthly": {
+                    "labels": [f"{m:%Y-%m}" for m, _, _ in monthly],
+                    "in": [int(income) for _, income, _ in monthly],
+                    "out": [int(expense) for _, _, expense in monthly],
+                },
+                "category": {
+                    "labels": [name for name, _ in by_category],
+                    "values": [int(total) for _, total in by_category],
+                },
+            },
+            json_dumps_params={"ensure_ascii": False},
+        )
+        resp["ETag"] = etag
+        patch_cache_control(resp, private=True, no_cache=True)
+        return resp